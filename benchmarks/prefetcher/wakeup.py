@@ -0,0 +1,139 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Benchmark the latency and CPU usage of waiting for data in ``prefetch`` and ``QueueWrapper``.
+
+Each pipeline yields the time at which an item becomes ready after a fixed interval
+(simulating I/O), and the consumer records how long it took to receive it. Running many
+pipelines concurrently mimics a node with many idle consumers. The sleep-polling
+implementation used prior to the event-driven buffer is included as the baseline.
+
+Example:
+    python benchmarks/prefetcher/wakeup.py --n-pipelines 32 --n-items 200 --interval 0.005
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from collections import deque
+
+from torchdata.dataloader2 import communication
+from torchdata.datapipes.iter import IterDataPipe
+
+POLLING_SLEEP_INTERVAL = 0.0001  # Interval used by the sleep-polling baseline
+
+
+class _TimedSource(IterDataPipe):
+    def __init__(self, n_items: int, interval: float):
+        self.n_items = n_items
+        self.interval = interval
+
+    def __iter__(self):
+        for _ in range(self.n_items):
+            time.sleep(self.interval)
+            yield time.perf_counter()
+
+
+def polling_prefetch(source_datapipe, buffer_size):
+    """
+    Baseline: producer and consumer poll the buffer with ``time.sleep``.
+    """
+    buffer: deque = deque()
+    state = {"run": True, "stop": False}
+
+    def worker():
+        itr = iter(source_datapipe)
+        while state["run"]:
+            if len(buffer) < buffer_size and not state["stop"]:
+                try:
+                    buffer.append(next(itr))
+                except StopIteration:
+                    state["stop"] = True
+            elif state["stop"] and len(buffer) == 0:
+                state["run"] = False
+            else:
+                time.sleep(POLLING_SLEEP_INTERVAL)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    try:
+        while state["run"]:
+            if len(buffer) > 0:
+                yield buffer.popleft()
+            else:
+                time.sleep(POLLING_SLEEP_INTERVAL)
+    finally:
+        state["run"] = False
+        thread.join()
+
+
+def event_prefetch(source_datapipe, buffer_size):
+    yield from source_datapipe.prefetch(buffer_size)
+
+
+def queue_wrapper(source_datapipe, buffer_size):
+    process, req_queue, res_queue, _ = communication.eventloop.CreateThreadForDataPipeline(source_datapipe)
+    process.start()
+    local_datapipe = communication.iter.QueueWrapper(
+        communication.protocol.IterDataPipeQueueProtocolClient(req_queue, res_queue)
+    )
+    try:
+        yield from local_datapipe
+    finally:
+        req_queue.put(communication.messages.TerminateRequest())
+        res_queue.get()
+        process.join()
+
+
+MODES = {
+    "polling_prefetch": polling_prefetch,
+    "prefetch": event_prefetch,
+    "queue_wrapper": queue_wrapper,
+}
+
+
+def run(mode: str, n_pipelines: int, n_items: int, interval: float, buffer_size: int):
+    latencies = [[] for _ in range(n_pipelines)]
+
+    def consume(idx):
+        for ready_time in MODES[mode](_TimedSource(n_items, interval), buffer_size):
+            latencies[idx].append(time.perf_counter() - ready_time)
+
+    consumers = [threading.Thread(target=consume, args=(i,)) for i in range(n_pipelines)]
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    for t in consumers:
+        t.start()
+    for t in consumers:
+        t.join()
+    wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+
+    all_latencies = sorted(lat for lats in latencies for lat in lats)
+    p50 = statistics.median(all_latencies) * 1e6
+    p99 = all_latencies[int(len(all_latencies) * 0.99) - 1] * 1e6
+    print(
+        f"{mode:>18} | items {len(all_latencies):>7} | wall {wall:6.2f} s | CPU {cpu:6.2f} s "
+        f"({100 * cpu / wall:5.1f}%) | latency p50 {p50:8.1f} us | p99 {p99:8.1f} us"
+    )
+
+
+def main(args):
+    modes = args.modes.split(",") if args.modes else list(MODES)
+    for mode in modes:
+        run(mode, args.n_pipelines, args.n_items, args.interval, args.buffer_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark waiting for data in prefetch and QueueWrapper")
+    parser.add_argument("--n-pipelines", default=32, type=int, help="Number of concurrent pipelines")
+    parser.add_argument("--n-items", default=200, type=int, help="Number of items per pipeline")
+    parser.add_argument("--interval", default=0.005, type=float, help="Seconds to produce each item")
+    parser.add_argument("--buffer-size", default=10, type=int, help="Size of the prefetch buffer")
+    parser.add_argument("--modes", default="", type=str, help=f"Comma-separated subset of {list(MODES)}")
+
+    main(parser.parse_args())
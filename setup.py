@@ -166,6 +166,10 @@ if __name__ == "__main__":
         author_email="packages@pytorch.org",
         license="BSD",
         install_requires=requirements,
+        extras_require={
+            # Native CRC32C for `load_from_tfrecord(verify_crc=True)`
+            "crc32c": ["crc32c"],
+        },
         python_requires=">=3.8",
         classifiers=[
             "Intended Audience :: Developers",
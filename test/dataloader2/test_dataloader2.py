@@ -10,8 +10,11 @@ import pickle
 import queue
 import random
 import socket
+import tempfile
+import time
 import unittest
 
+from functools import partial
 from unittest import TestCase
 
 import numpy as np
@@ -30,10 +33,11 @@ from torchdata.dataloader2 import (
     PrototypeMultiProcessingReadingService,
     ReadingServiceInterface,
     SequentialReadingService,
+    ThreadPoolReadingService,
 )
 from torchdata.dataloader2.dataloader2 import READING_SERVICE_STATE_KEY_NAME, SERIALIZED_DATAPIPE_KEY_NAME
 
-from torchdata.dataloader2.graph import DataPipe, list_dps, replace_dp, set_datapipes_seed, traverse_dps
+from torchdata.dataloader2.graph import DataPipe, find_dps, list_dps, replace_dp, set_datapipes_seed, traverse_dps
 from torchdata.dataloader2.random import SeedGenerator
 from torchdata.datapipes.iter import IterableWrapper, IterDataPipe, ShardingRoundRobinDispatcher
 from torchdata.datapipes.map import SequenceWrapper
@@ -236,6 +240,10 @@ class DataLoader2ConsistencyTest(TestCase):
     def _get_proto_reading_service():
         return PrototypeMultiProcessingReadingService(num_workers=2)
 
+    @staticmethod
+    def _get_thread_reading_service():
+        return ThreadPoolReadingService(num_workers=2)
+
     @staticmethod
     def _get_mp_reading_service_zero_workers():
         return MultiProcessingReadingService(num_workers=0)
@@ -265,6 +273,7 @@ class DataLoader2ConsistencyTest(TestCase):
         reading_service_generators = (
             self._get_mp_reading_service,
             self._get_proto_reading_service,
+            self._get_thread_reading_service,
             self._get_mp_reading_service_zero_workers,
             self._get_proto_reading_service_zero_workers,
         )
@@ -312,27 +321,28 @@ class DataLoader2IntegrationTest(TestCase):
     "fork is not supported. Dying (set die_after_fork=0 to override)",
 )
 class TestDataLoader2EventLoop(TestCase):
+    @skipIfNoDill
+    def test_basic_threading(self):
+        def clean_me(process, req_queue, res_queue):
+            req_queue.put(communication.messages.TerminateRequest())
+            _ = res_queue.get()
+            process.join()
 
-    # TODO: This needs fixing, see issue 624
-    # @skipIfNoDill
-    # def test_basic_threading(self):
-    #     def clean_me(process, req_queue, res_queue):
-    #         req_queue.put(communication.messages.TerminateRequest())
-    #         _ = res_queue.get()
-    #         process.join()
-    #
-    #     it = list(range(100))
-    #     numbers_dp = IterableWrapper(it)
-    #     (process, req_queue, res_queue, _thread_local_datapipe) = communication.eventloop.CreateThreadForDataPipeline(numbers_dp)
-    #
-    #     process.start()
-    #     local_datapipe = communication.iter.QueueWrapper(
-    #         communication.protocol.IterDataPipeQueueProtocolClient(req_queue, res_queue))
-    #
-    #     actual = list(local_datapipe)
-    #     clean_me(process, req_queue, res_queue)
-    #
-    #     self.assertEqual(list(range(100)), actual)
+        it = list(range(100))
+        numbers_dp = IterableWrapper(it)
+        (process, req_queue, res_queue, _thread_local_datapipe) = communication.eventloop.CreateThreadForDataPipeline(
+            numbers_dp
+        )
+
+        process.start()
+        local_datapipe = communication.iter.QueueWrapper(
+            communication.protocol.IterDataPipeQueueProtocolClient(req_queue, res_queue)
+        )
+
+        actual = list(local_datapipe)
+        clean_me(process, req_queue, res_queue)
+
+        self.assertEqual(list(range(100)), actual)
 
     @skipIfNoDill
     def test_basic_mapdatapipe_threading(self):
@@ -377,6 +387,48 @@ def _x_mult_2(d):
     return d * 2
 
 
+def _slow_on_zero(d):
+    if d == 0:
+        time.sleep(1)
+    return d
+
+
+def _slow_map(d):
+    time.sleep(0.01)
+    return d
+
+
+def _touch_and_return(dirname, d):
+    # Leaves a file behind for every element computed, by any process
+    with open(os.path.join(dirname, f"{d}.{os.getpid()}.{time.time_ns()}"), "w"):
+        pass
+    return d
+
+
+class _EpochScaler(IterDataPipe):
+    def __init__(self, datapipe):
+        self.datapipe = datapipe
+        self.epoch = 0
+        self.graph_size = 0
+
+    def __iter__(self):
+        for d in self.datapipe:
+            yield d * 2 ** self.epoch, self.graph_size
+
+
+def _reset_epoch_scaler(datapipe, worker_info, seed_generator):
+    # Update the state of the existing graph in place, and report its size
+    graph = traverse_dps(datapipe)
+    (scaler,) = find_dps(graph, _EpochScaler)
+    scaler.epoch += 1
+    scaler.graph_size = len(list_dps(graph))
+    return datapipe
+
+
+def _make_payload(i):
+    return {"tensor": torch.full((16, 32), i, dtype=torch.float64), "bytes": bytes([i]) * 2048, "id": i}
+
+
 class NonReplicableDataPipe(IterDataPipe):
     def __init__(self, datapipe):
         self.datapipe = datapipe
@@ -651,6 +703,257 @@ class PrototypeMultiProcessingReadingServiceTest(TestCase):
         torch.manual_seed(321)
         self.assertNotEqual(res, list(dl) + list(dl))
 
+    def test_shared_memory_ring(self) -> None:
+        ring = communication.shared_memory.SharedMemoryRing(8192)
+        try:
+            # Payloads are replaced by handles and restored by decode
+            value = _make_payload(1)
+            encoded = ring.encode(value)
+            self.assertIsInstance(encoded["tensor"], communication.shared_memory.SharedMemoryHandle)
+            self.assertIsInstance(encoded["bytes"], communication.shared_memory.SharedMemoryHandle)
+            decoded = ring.decode(encoded)
+            self.assertTrue(torch.equal(decoded["tensor"], value["tensor"]))
+            self.assertEqual(decoded["bytes"], value["bytes"])
+            self.assertEqual(decoded["id"], 1)
+
+            # Small payloads stay in the value
+            small = (torch.ones(2), b"ab")
+            self.assertIs(ring.encode(small)[0], small[0])
+
+            # Fall back to the value when the ring is full, and wrap around after release
+            encoded = [ring.encode(_make_payload(i)) for i in range(3)]
+            self.assertIsInstance(encoded[0]["tensor"], communication.shared_memory.SharedMemoryHandle)
+            self.assertIsInstance(encoded[2]["tensor"], torch.Tensor)
+            for i, v in enumerate(encoded):
+                self.assertEqual(ring.decode(v)["bytes"], bytes([i]) * 2048)
+            encoded = ring.encode(_make_payload(3))
+            self.assertIsInstance(encoded["tensor"], communication.shared_memory.SharedMemoryHandle)
+            self.assertTrue(torch.equal(ring.decode(encoded)["tensor"], _make_payload(3)["tensor"]))
+        finally:
+            ring.close()
+
+    @mp_ctx_parametrize
+    def test_shared_memory_transport(self, ctx) -> None:
+        dp: IterDataPipe = IterableWrapper(range(20)).sharding_filter().map(_make_payload)
+        rs = PrototypeMultiProcessingReadingService(
+            num_workers=2,
+            multiprocessing_context=ctx,
+            shared_memory_size=16384,
+        )
+        dl = DataLoader2(dp, reading_service=rs)
+        tails = [0, 0]
+        for _ in range(2):
+            res = sorted(list(dl), key=lambda d: d["id"])
+            self.assertEqual([d["id"] for d in res], list(range(20)))
+            for d in res:
+                exp = _make_payload(d["id"])
+                self.assertTrue(torch.equal(d["tensor"], exp["tensor"]))
+                self.assertEqual(d["bytes"], exp["bytes"])
+            # Payloads went through the ring of each worker process, whose space has been released by the main process
+            rings = dl.reading_service._worker_shared_memories
+            self.assertEqual(len(rings), 2)
+            for i, ring in enumerate(rings):
+                self.assertGreater(ring._tail(), tails[i])
+                tails[i] = ring._tail()
+        dl.shutdown()
+
+    @mp_ctx_parametrize
+    def test_worker_inflight_requests(self, ctx) -> None:
+        dp: IterDataPipe = IterableWrapper(range(100)).shuffle().sharding_filter().map(_x_mult_2)
+
+        rs = PrototypeMultiProcessingReadingService(num_workers=2, multiprocessing_context=ctx)
+        dl = DataLoader2(dp, reading_service=rs)
+        dl.seed(123)
+        exp = list(dl)
+        dl.shutdown()
+        self.assertEqual(sorted(exp), [i * 2 for i in range(100)])
+
+        # The order of data is the same regardless of the number of in-flight requests
+        rs = PrototypeMultiProcessingReadingService(num_workers=2, multiprocessing_context=ctx, worker_inflight_cnt=4)
+        dl = DataLoader2(dp, reading_service=rs)
+        dl.seed(123)
+        self.assertEqual(list(dl), exp)
+        # Early stop in the middle of an epoch discards the in-flight requests
+        it = iter(dl)
+        for _ in range(10):
+            next(it)
+        dl.seed(123)
+        self.assertEqual(list(dl), exp)
+        dl.shutdown()
+
+    @mp_ctx_parametrize
+    def test_out_of_order(self, ctx) -> None:
+        dp: IterDataPipe = IterableWrapper(range(20)).sharding_filter().map(_slow_on_zero)
+
+        # In-order: the slow sample blocks the other worker
+        rs = PrototypeMultiProcessingReadingService(num_workers=2, multiprocessing_context=ctx)
+        dl = DataLoader2(dp, reading_service=rs)
+        self.assertEqual(list(dl), list(range(20)))
+        dl.shutdown()
+
+        # Out-of-order: data from the other worker is returned first
+        rs = PrototypeMultiProcessingReadingService(num_workers=2, multiprocessing_context=ctx, in_order=False)
+        dl = DataLoader2(dp, reading_service=rs)
+        for _ in range(2):
+            res = list(dl)
+            self.assertEqual(sorted(res), list(range(20)))
+            self.assertEqual(res[0], 1)
+        dl.shutdown()
+
+    @mp_ctx_parametrize
+    def test_persistent_workers(self, ctx) -> None:
+        dp: IterDataPipe = _EpochScaler(IterableWrapper(range(10)).sharding_filter())
+        rs = PrototypeMultiProcessingReadingService(
+            num_workers=2, multiprocessing_context=ctx, worker_reset_fn=_reset_epoch_scaler
+        )
+        dl = DataLoader2(dp, reading_service=rs)
+        self.assertIsNone(dl.reading_service.epoch_start_latency)
+
+        # The state of the DataPipe graph is kept by worker processes across epochs, and the graph doesn't grow
+        pids = None
+        graph_size = None
+        for epoch in range(1, 4):
+            res = sorted(dl)
+            self.assertEqual([d for d, _ in res], [i * 2 ** epoch for i in range(10)])
+            if graph_size is None:
+                graph_size = res[0][1]
+            self.assertEqual({size for _, size in res}, {graph_size})
+            self.assertGreater(dl.reading_service.epoch_start_latency, 0)
+            if pids is None:
+                pids = [p.pid for p, _, _ in dl.reading_service._worker_processes]
+            self.assertEqual([p.pid for p, _, _ in dl.reading_service._worker_processes], pids)
+        dl.shutdown()
+
+    def test_autoscaled_num_workers(self) -> None:
+        rs = PrototypeMultiProcessingReadingService(num_workers=2, min_num_workers=1, max_num_workers=3)
+        # Unknown wait ratio, e.g. the first epoch or an early stopped one
+        self.assertEqual(rs._autoscaled_num_workers(None), 2)
+        self.assertEqual(rs._autoscaled_num_workers(0.5), 3)
+        self.assertEqual(rs._autoscaled_num_workers(0.1), 2)
+        self.assertEqual(rs._autoscaled_num_workers(0.0), 1)
+        # The pool stays within the bounds
+        rs.num_workers = 3
+        self.assertEqual(rs._autoscaled_num_workers(1.0), 3)
+        rs.num_workers = 1
+        self.assertEqual(rs._autoscaled_num_workers(0.0), 1)
+
+    @mp_ctx_parametrize
+    def test_autoscale_workers(self, ctx) -> None:
+        # The wait ratio of each epoch is overridden, so that the scaling decision doesn't depend on timing
+        # The main process keeps waiting for data and the pool grows
+        dp: IterDataPipe = IterableWrapper(range(20)).sharding_filter()
+        rs = PrototypeMultiProcessingReadingService(
+            num_workers=1, multiprocessing_context=ctx, main_prefetch_cnt=0, max_num_workers=3
+        )
+        dl = DataLoader2(dp, reading_service=rs)
+        for epoch in range(1, 5):
+            self.assertEqual(sorted(dl), list(range(20)))
+            self.assertEqual(dl.reading_service.num_workers, min(epoch, 3))
+            self.assertEqual(len(dl.reading_service._worker_processes), min(epoch, 3))
+            dl.reading_service._worker_consumer_datapipe.wait_ratio = lambda: 1.0
+        dl.shutdown()
+
+        # Worker processes are mostly idle and the pool shrinks
+        dp = IterableWrapper(range(30)).sharding_filter()
+        rs = PrototypeMultiProcessingReadingService(
+            num_workers=3, multiprocessing_context=ctx, main_prefetch_cnt=0, min_num_workers=1
+        )
+        dl = DataLoader2(dp, reading_service=rs)
+        for epoch in range(1, 5):
+            self.assertEqual(sorted(dl), list(range(30)))
+            self.assertEqual(dl.reading_service.num_workers, max(4 - epoch, 1))
+            self.assertEqual(len(dl.reading_service._worker_processes), max(4 - epoch, 1))
+            dl.reading_service._worker_consumer_datapipe.wait_ratio = lambda: 0.0
+        dl.shutdown()
+
+        # Autoscaling bounds must contain num_workers
+        with self.assertRaisesRegex(ValueError, "min_num_workers"):
+            PrototypeMultiProcessingReadingService(num_workers=4, max_num_workers=2)
+
+    @mp_ctx_parametrize
+    def test_threads_per_worker(self, ctx) -> None:
+        dp: IterDataPipe = IterableWrapper(range(40)).shuffle().sharding_filter().map(_slow_map)
+        rs = PrototypeMultiProcessingReadingService(num_workers=2, multiprocessing_context=ctx, threads_per_worker=3)
+        dl = DataLoader2(dp, reading_service=rs)
+
+        # Each thread takes an exclusive shard
+        dl.seed(123)
+        res = list(dl)
+        self.assertEqual(sorted(res), list(range(40)))
+
+        dl.seed(123)
+        self.assertEqual(list(dl), res)
+
+        dl.seed(321)
+        res2 = list(dl)
+        self.assertEqual(sorted(res2), list(range(40)))
+        self.assertNotEqual(res2, res)
+        dl.shutdown()
+
+    @mp_ctx_parametrize
+    def test_shared_in_memory_cache(self, ctx) -> None:
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            dp: IterDataPipe = IterableWrapper(range(40)).map(partial(_touch_and_return, tmpdirname))
+            dp = dp.in_memory_cache(shared=True).shuffle().sharding_filter()
+            rs = PrototypeMultiProcessingReadingService(num_workers=2, multiprocessing_context=ctx)
+            dl = DataLoader2(dp, reading_service=rs)
+            for epoch in range(3):
+                dl.seed(epoch)
+                self.assertEqual(sorted(dl), list(range(40)))
+            dl.shutdown()
+            # Every element is computed once for all workers and epochs
+            self.assertEqual(40, len(os.listdir(tmpdirname)))
+
+
+class ThreadPoolReadingServiceTest(TestCase):
+    def test_worker_fns(self) -> None:
+        dp: IterDataPipe = IterableWrapper(range(100)).batch(2).shuffle()
+
+        rs = ThreadPoolReadingService(
+            num_workers=2,
+            worker_init_fn=PrototypeMultiProcessingReadingServiceTest._worker_init_fn,
+            worker_reset_fn=PrototypeMultiProcessingReadingServiceTest._worker_reset_fn,
+        )
+        dl = DataLoader2(dp, reading_service=rs)
+
+        # Test worker_reset_fn to set the same random seed across epoches
+        res1 = list(dl)
+        res2 = list(dl)
+        self.assertEqual(res1, res2)
+        dl.shutdown()
+
+    def test_multi_worker_determinism(self) -> None:
+        dp: IterDataPipe = IterableWrapper(range(100))
+        dp = dp.shuffle().sharding_filter()
+        dp = dp.batch(2)
+
+        dl = DataLoader2(dp, reading_service=ThreadPoolReadingService(num_workers=3))
+
+        dl.seed(123)
+        epoch = list(dl)
+        self.assertEqual(sorted(d for batch in epoch for d in batch), list(range(100)))
+        res = epoch + list(dl)
+
+        dl.seed(123)
+        self.assertEqual(res, list(dl) + list(dl))
+
+        dl.seed(321)
+        self.assertNotEqual(res, list(dl) + list(dl))
+
+        # Worker threads don't reset the global random states of the main thread
+        torch.manual_seed(0)
+        expected = torch.rand(1)
+        torch.manual_seed(0)
+        _ = list(dl)
+        self.assertEqual(torch.rand(1), expected)
+        dl.shutdown()
+
+    def test_non_replicable_datapipe(self) -> None:
+        dp: IterDataPipe = IterableWrapper(range(10)).sharding_round_robin_dispatch(SHARDING_PRIORITIES.MULTIPROCESSING)
+        dl = DataLoader2(dp, reading_service=ThreadPoolReadingService(num_workers=2))
+        with self.assertRaisesRegex(RuntimeError, "non-replicable"):
+            list(dl)
+
 
 TEST_MASTER_ADDR = "127.0.0.1"
 DEFAULT_WORLD_SIZE = 2
@@ -5,6 +5,7 @@
 # LICENSE file in the root directory of this source tree.
 
 import os
+import time
 import unittest
 import warnings
 
@@ -80,6 +81,46 @@ class TestDataPipeFSSpec(expecttest.TestCase):
                 {fsspec.implementations.local.make_path_posix(file) for file in self.temp_sub_files},
             )
 
+    @skipIfNoFSSpec
+    def test_fsspec_file_lister_with_manifest(self):
+        manifest_dir = create_temp_dir()
+        root = "file://" + self.temp_sub_dir.name
+        datapipe: IterDataPipe = FSSpecFileLister(root=root, manifest_dir=manifest_dir.name)
+        expected = sorted(datapipe)
+        self.assertEqual(1, len(os.listdir(manifest_dir.name)))
+        manifest_path = os.path.join(manifest_dir.name, os.listdir(manifest_dir.name)[0])
+        manifest_mtime = os.path.getmtime(manifest_path)
+
+        # The listing is read from the manifest while the root is unchanged
+        self.assertEqual(expected, sorted(datapipe))
+        self.assertEqual(manifest_mtime, os.path.getmtime(manifest_path))
+
+        # Adding a file to the root invalidates the manifest
+        time.sleep(0.01)
+        new_file = os.path.join(self.temp_sub_dir.name, "new_file.txt")
+        with open(new_file, "w") as f:
+            f.write("new")
+        res = list(map(lambda path: path.split("://")[1], datapipe))
+        self.assertIn(fsspec.implementations.local.make_path_posix(new_file), res)
+        self.assertEqual(len(expected) + 1, len(res))
+
+        # A different mask uses its own manifest
+        datapipe = FSSpecFileLister(root=root, masks="*new_*", manifest_dir=manifest_dir.name, manifest_ttl=60)
+        self.assertEqual(["new_file.txt"], [os.path.basename(path) for path in datapipe])
+        self.assertEqual(2, len(os.listdir(manifest_dir.name)))
+
+        # Paths containing tabs and newlines are kept intact by the manifest
+        special_file = os.path.join(self.temp_sub_dir.name, "new_\tspecial\n.txt")
+        with open(special_file, "w") as f:
+            f.write("special")
+        datapipe = FSSpecFileLister(root=root, masks="*special*", manifest_dir=manifest_dir.name, manifest_ttl=60)
+        expected = list(datapipe)
+        self.assertEqual(["new_\tspecial\n.txt"], [os.path.basename(path) for path in expected])
+        self.assertEqual(3, len(os.listdir(manifest_dir.name)))
+        self.assertEqual(expected, list(datapipe))
+        os.remove(special_file)
+        manifest_dir.cleanup()
+
     @skipIfNoFSSpec
     def test_fsspec_file_lister_iterdatapipe_with_list(self):
         datapipe: IterDataPipe = FSSpecFileLister(
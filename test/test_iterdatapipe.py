@@ -6,14 +6,19 @@
 
 import io
 import itertools
+import os
 import pickle
+import tempfile
+import time
 import unittest
 import warnings
 
 from collections import defaultdict
 from typing import Dict
+from unittest.mock import patch
 
 import expecttest
+import numpy as np
 import torch.utils.data.datapipes.iter
 
 import torchdata
@@ -105,6 +110,83 @@ class TestIterDataPipe(expecttest.TestCase):
         list(cache_dp)
         self.assertEqual(10, len(cache_dp))
 
+        # Functional Test: the size of tensors and bytes is accounted for, evicting the oldest by default
+        reads = []
+
+        def _record(x):
+            reads.append(x)
+            return x
+
+        items = [torch.full((300 * 1024,), i, dtype=torch.uint8) for i in range(10)]
+        item_ids = [id(item) for item in items]
+        cache_dp = IterableWrapper(items, deepcopy=False).map(_record).in_memory_cache(size=1)
+        self.assertEqual(item_ids, [id(item) for item in cache_dp])
+        self.assertEqual(3, len(cache_dp.cache))
+        # Only the uncached head is read again, the tail is served from memory
+        reads.clear()
+        self.assertEqual(item_ids, [id(item) for item in cache_dp])
+        self.assertEqual(item_ids[:7], [id(item) for item in reads])
+
+        # Functional Test: `keep_head` keeps the first elements and serves them from memory
+        cache_dp = IterableWrapper([bytes(300 * 1024)] * 10).in_memory_cache(size=1, policy="keep_head")
+        list(cache_dp)
+        self.assertEqual([0, 1, 2], sorted(cache_dp.cache))
+
+        # Functional Test: `random` keeps a sample of the elements and yields them in order
+        cache_dp = IterableWrapper(items, deepcopy=False).in_memory_cache(size=1, policy="random")
+        self.assertEqual(item_ids, [id(item) for item in cache_dp])
+        self.assertEqual(3, len(cache_dp.cache))
+        self.assertEqual(item_ids, [id(item) for item in cache_dp])
+
+        # Functional Test: the sample of `random` follows the seed set by DataLoader2
+        samples = []
+        for _ in range(2):
+            cache_dp = IterableWrapper(items, deepcopy=False).in_memory_cache(size=1, policy="random").set_seed(5)
+            list(cache_dp)
+            samples.append(sorted(cache_dp.cache))
+        self.assertEqual(samples[0], samples[1])
+
+        # Functional Test: custom size function
+        cache_dp = IterableWrapper(range(10)).in_memory_cache(size=1, size_fn=lambda x: 512 * 1024)
+        self.assertEqual(list(range(10)), list(cache_dp))
+        self.assertEqual([8, 9], list(cache_dp.cache.values()))
+
+        with self.assertRaisesRegex(ValueError, "Invalid policy"):
+            IterableWrapper(range(10)).in_memory_cache(policy="lru")
+
+        # Functional Test: a shared cache is read from the source by a single copy, the others read from memory
+        cache_dp = IterableWrapper(range(10)).in_memory_cache(shared=True)
+        cache_dp_copy = pickle.loads(pickle.dumps(cache_dp))
+        it = iter(cache_dp)
+        self.assertEqual([0, 1, 2], [next(it) for _ in range(3)])
+        it_copy = iter(cache_dp_copy)
+        self.assertEqual([0, 1, 2], [next(it_copy) for _ in range(3)])
+        self.assertEqual(list(range(3, 10)), list(it))
+        self.assertEqual(list(range(3, 10)), list(it_copy))
+        cache_dp_copy.source_dp = IterableWrapper([])
+        self.assertEqual(list(range(10)), list(cache_dp_copy))
+
+        # Functional Test: elements beyond the size limit are read from the source
+        cache_dp = IterableWrapper(range(10)).in_memory_cache(size=0, shared=True)
+        self.assertEqual(list(range(10)), list(cache_dp))
+        self.assertEqual(list(range(10)), list(cache_dp))
+
+        # Functional Test: a shared cache keeps the tail within the size limit, only the head is read again
+        blobs = [bytes([i]) * 300 * 1024 for i in range(10)]
+        cache_dp = IterableWrapper(blobs).map(_record).in_memory_cache(size=1, shared=True)
+        # Another process unpickles the store, with a source of its own
+        cache_dp_copy = IterableWrapper(blobs).map(_record).in_memory_cache(shared=True)
+        cache_dp_copy._store = pickle.loads(pickle.dumps(cache_dp._store))
+        reads.clear()
+        self.assertEqual(blobs, list(cache_dp))
+        self.assertEqual(10, len(reads))
+        reads.clear()
+        self.assertEqual(blobs, list(cache_dp))
+        self.assertEqual(blobs[:7], reads)
+        reads.clear()
+        self.assertEqual(blobs, list(cache_dp_copy))
+        self.assertEqual(blobs[:7], reads)
+
     def test_iter_key_zipper_iterdatapipe(self) -> None:
 
         source_dp = IterableWrapper(range(10))
@@ -272,6 +354,24 @@ class TestIterDataPipe(expecttest.TestCase):
         actual = list(prefetched_dp)
         self.assertEqual(expected, actual)
 
+        # check if reset wakes up the child thread waiting on a full buffer
+        it = iter(prefetched_dp)
+        next(it)
+        prefetched_dp.reset()
+        self.assertFalse(prefetched_dp.thread.is_alive())
+
+        # check if an error in the child thread is raised by the consumer after the prefetched elements
+        def _raise_on_5(x):
+            if x == 5:
+                raise ValueError("Error on 5")
+            return x
+
+        prefetched_dp = source_dp.map(_raise_on_5).prefetch(10)
+        it = iter(prefetched_dp)
+        self.assertEqual([next(it) for _ in range(5)], list(range(5)))
+        with self.assertRaisesRegex(ValueError, "Error on 5"):
+            next(it)
+
     def test_repeater_iterdatapipe(self) -> None:
         import itertools
 
@@ -861,6 +961,59 @@ class TestIterDataPipe(expecttest.TestCase):
         with self.assertRaisesRegex(TypeError, "length relies on the output of its function."):
             len(flatmapped_dp)
 
+    def test_parallel_mapper_iterdatapipe(self):
+        source_dp = IterableWrapper(list(range(20)))
+
+        def fn(e):
+            # Later items finish first
+            time.sleep(0.001 * (20 - e))
+            return e * 10
+
+        # Functional Test: ordered by default
+        pmapped_dp = source_dp.pmap(fn, num_workers=4)
+        expected_list = [e * 10 for e in range(20)]
+        self.assertEqual(expected_list, list(pmapped_dp))
+
+        # Functional Test: unordered
+        unordered_dp = source_dp.pmap(fn, num_workers=4, in_order=False)
+        self.assertEqual(expected_list, sorted(unordered_dp))
+
+        # Functional Test: Specify input_col and output_col
+        tuple_source_dp = IterableWrapper([(d - 1, d, d + 1) for d in range(20)])
+        input_col_dp = tuple_source_dp.pmap(fn, num_workers=2, input_col=1, output_col=-1)
+        self.assertEqual([(d - 1, d, d + 1, d * 10) for d in range(20)], list(input_col_dp))
+
+        # Functional Test: Exceptions from ``fn`` are propagated
+        def err_fn(e):
+            if e == 5:
+                raise ValueError("Bad item")
+            return e
+
+        with self.assertRaisesRegex(ValueError, "Bad item"):
+            list(source_dp.pmap(err_fn, num_workers=2))
+
+        def stop_fn(e):
+            raise StopIteration
+
+        with self.assertRaisesRegex(RuntimeError, "raised StopIteration"):
+            list(source_dp.pmap(stop_fn, num_workers=2))
+
+        # Functional Test: Invalid arguments
+        with self.assertRaisesRegex(ValueError, "num_workers"):
+            source_dp.pmap(fn, num_workers=0)
+        with self.assertRaisesRegex(ValueError, "executor"):
+            source_dp.pmap(fn, executor="fiber")
+
+        # Reset Test: reset the DataPipe after reading part of it
+        n_elements_before_reset = 5
+        res_before_reset, res_after_reset = reset_after_n_next_calls(pmapped_dp, n_elements_before_reset)
+
+        self.assertEqual(expected_list[:n_elements_before_reset], res_before_reset)
+        self.assertEqual(expected_list, res_after_reset)
+
+        # __len__ Test: length should be the same as the source DataPipe
+        self.assertEqual(20, len(pmapped_dp))
+
     def test_round_robin_demux_iterdatapipe(self):
         source_dp = IterableWrapper(list(range(23)))
         with self.assertRaisesRegex(ValueError, "Expected `num_instaces`"):
@@ -1030,6 +1183,52 @@ class TestIterDataPipe(expecttest.TestCase):
             self.assertEqual(len(wa), 1)
             self.assertRegex(str(wa[0].message), r"Found duplicate key")
 
+        # Functional Test: map stored in a directory, with int and with other keys
+        with tempfile.TemporaryDirectory() as tmpdir:
+            int_dir, str_dir = os.path.join(tmpdir, "int"), os.path.join(tmpdir, "str")
+            map_dp = IterableWrapper([3, -1, 7, 2 ** 40]).to_map_datapipe(lambda x: (x, str(x)), storage=int_dir)
+            self.assertEqual(["7", "-1", str(2 ** 40)], [map_dp[7], map_dp[-1], map_dp[2 ** 40]])
+            self.assertTrue(map_dp._map._int_keys)
+            with self.assertRaises(IndexError):
+                map_dp[5]
+            with self.assertRaises(IndexError):
+                map_dp["7"]
+            # Integer-like keys are looked up as the equal int, as in a dictionary
+            self.assertEqual("7", map_dp[np.int64(7)])
+
+            # Keys switch to digests once a non-int key appears
+            map_dp = source_dp.to_map_datapipe(lambda d: ("k" + str(d) if d > 4 else d, d + 1), storage=str_dir)
+            self.assertEqual(
+                list(range(1, 11)), [map_dp[d] for d in range(5)] + [map_dp["k" + str(d)] for d in range(5, 10)]
+            )
+            self.assertFalse(map_dp._map._int_keys)
+            with self.assertRaises(IndexError):
+                map_dp["k0"]
+
+            # Only the location is serialized, and a completed map is reused without reading the source
+            reloaded_dp = IterableWrapper([]).to_map_datapipe(storage=str_dir)
+            self.assertEqual(6, reloaded_dp["k5"])
+            self.assertEqual(10, len(reloaded_dp))
+            self.assertLess(len(pickle.dumps(reloaded_dp)), 1024)
+            self.assertEqual(10, pickle.loads(pickle.dumps(reloaded_dp))["k9"])
+
+            # The last value of duplicate keys wins
+            dup_map_dp = source_dp.to_map_datapipe(lambda x: (x % 3, x), storage=os.path.join(tmpdir, "dup"))
+            with warnings.catch_warnings(record=True) as wa:
+                warnings.simplefilter("always")
+                self.assertEqual([9, 7, 8], [dup_map_dp[k] for k in range(3)])
+                self.assertEqual(7, len(wa))
+                self.assertRegex(str(wa[0].message), r"Found duplicate key")
+            self.assertEqual(3, len(dup_map_dp))
+
+            # Distinct keys with the same digest are detected while building
+            with patch("torchdata.datapipes.iter.util.converter._key_digest", return_value=0):
+                collision_dp = IterableWrapper(["a", "b"]).to_map_datapipe(
+                    lambda x: (x, x), storage=os.path.join(tmpdir, "collision")
+                )
+                with self.assertRaisesRegex(RuntimeError, "same 64-bit digest"):
+                    collision_dp["a"]
+
     def test_mux_longest_iterdatapipe(self):
 
         # Functional Test: Elements are yielded one at a time from each DataPipe, until they are all exhausted
@@ -7,17 +7,24 @@
 import bz2
 import functools
 import hashlib
+import http.server
 import io
 import itertools
 import lzma
+import mmap
 import os
+import pickle
+import sqlite3
 import subprocess
+import sys
 import tarfile
 import tempfile
+import threading
 import time
 import unittest
 import warnings
 import zipfile
+from contextlib import closing
 from functools import partial
 
 from json.decoder import JSONDecodeError
@@ -37,12 +44,14 @@ from torchdata.datapipes.iter import (
     FileLister,
     FileOpener,
     HashChecker,
+    HttpReader,
     IoPathFileLister,
     IoPathFileOpener,
     IoPathSaver,
     IterableWrapper,
     IterDataPipe,
     JsonParser,
+    OnlineReader,
     RarArchiveLoader,
     Saver,
     StreamReader,
@@ -51,6 +60,9 @@ from torchdata.datapipes.iter import (
     XzFileLoader,
     ZipArchiveLoader,
 )
+from torchdata.datapipes.map import ArchiveReader
+from torchdata.datapipes.utils import _cache_index
+from torchdata.datapipes.utils._cache_index import CacheIndex
 
 try:
     import iopath
@@ -87,6 +99,11 @@ def _noop(x):
     return x
 
 
+class _QuietHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
 class TestDataPipeLocalIO(expecttest.TestCase):
     def setUp(self):
         self.temp_dir = create_temp_dir()
@@ -403,6 +420,17 @@ class TestDataPipeLocalIO(expecttest.TestCase):
         # Check result accumulated after reset
         self._compressed_files_comparison_helper(self.temp_files, res_after_reset)
 
+        # Functional Test: memoryviews of the mapped tar file, or of the extracted content of compressed ones
+        for dp, is_mapped in [(datapipe2, True), (datapipe_gz_2, False), (decomp_dp, False)]:
+            result = list(dp.load_from_tar(use_mmap=True))
+            self.assertEqual(len(self.temp_files), len(result))
+            for (name, data), expected_file in zip(result, self.temp_files):
+                self.assertEqual(os.path.basename(name), os.path.basename(expected_file))
+                self.assertIsInstance(data, memoryview)
+                self.assertEqual(is_mapped, isinstance(data.obj, mmap.mmap))
+                with open(expected_file, "rb") as f:
+                    self.assertEqual(f.read(), bytes(data))
+
         # __len__ Test: doesn't have valid length
         with self.assertRaisesRegex(TypeError, "instance doesn't have valid length"):
             len(tar_loader_dp)
@@ -436,10 +464,79 @@ class TestDataPipeLocalIO(expecttest.TestCase):
         # Check the results accumulated after reset
         self._compressed_files_comparison_helper(self.temp_files, res_after_reset)
 
+        # Functional Test: memoryviews of the mapped zip file for stored files, or of the extracted content
+        path = os.path.join(self.temp_dir.name, "test_zip.zip")
+        with zipfile.ZipFile(path, "a") as myzip:
+            myzip.write(self.temp_files[0], arcname="deflated.txt", compress_type=zipfile.ZIP_DEFLATED)
+        result = list(datapipe2.load_from_zip(use_mmap=True))
+        self.assertEqual(len(self.temp_files) + 1, len(result))
+        for (name, data), expected_file in zip(result, [*self.temp_files, self.temp_files[0]]):
+            self.assertIsInstance(data, memoryview)
+            self.assertEqual(name.endswith("deflated.txt"), not isinstance(data.obj, mmap.mmap))
+            with open(expected_file, "rb") as f:
+                self.assertEqual(f.read(), bytes(data))
+
         # __len__ Test: doesn't have valid length
         with self.assertRaisesRegex(TypeError, "instance doesn't have valid length"):
             len(zip_loader_dp)
 
+    def test_archive_reader_mapdatapipe(self):
+        self._write_test_tar_files()
+        self._write_test_zip_files()
+        tar_path = os.path.join(self.temp_dir.name, "test_tar.tar")
+        zip_path = os.path.join(self.temp_dir.name, "test_zip.zip")
+        with zipfile.ZipFile(zip_path, "a") as myzip:
+            myzip.write(self.temp_files[0], arcname="deflated.txt", compress_type=zipfile.ZIP_DEFLATED)
+            myzip.write(self.temp_files[1], arcname="bzip2.txt", compress_type=zipfile.ZIP_BZIP2)
+        expected = {name: stream.read() for name, stream in FileOpener([tar_path], mode="b").load_from_tar()}
+        expected.update({name: stream.read() for name, stream in FileOpener([zip_path], mode="b").load_from_zip()})
+
+        # Functional Test: files are read by position and by path name, with the names of the iterable loaders
+        archive_dp = ArchiveReader([tar_path, zip_path], save_index=True)
+        self.assertEqual(len(expected), len(archive_dp))
+        self.assertEqual(expected, dict(archive_dp[i] for i in range(len(archive_dp))))
+        for name, data in expected.items():
+            self.assertEqual((name, data), archive_dp[name])
+        self.assertEqual(archive_dp[len(archive_dp) - 1], archive_dp[-1])
+        with self.assertRaisesRegex(IndexError, "is invalid"):
+            archive_dp[len(archive_dp)]
+        with self.assertRaisesRegex(KeyError, "is not within the archives"):
+            archive_dp[os.path.join(tar_path, "missing")]
+
+        # Functional Test: the content of zip members is checked against their CRC and size
+        deflated_path = os.path.join(zip_path, "deflated.txt")
+        position = archive_dp._keys[deflated_path]
+        archive_id, member = archive_dp._members[position]
+        archive_dp._members[position] = (archive_id, member._replace(crc=member.crc ^ 1))
+        with self.assertRaisesRegex(RuntimeError, "CRC doesn't match"):
+            archive_dp[deflated_path]
+        archive_dp._members[position] = (archive_id, member._replace(file_size=member.file_size + 1))
+        with self.assertRaisesRegex(RuntimeError, "uncompressed size doesn't match"):
+            archive_dp[deflated_path]
+        archive_dp._members[position] = (archive_id, member)
+
+        # Functional Test: saved indices are used until the archive changes
+        self.assertTrue(os.path.exists(tar_path + ".index"))
+        with open(tar_path + ".index", "a") as f:
+            f.write('["fake.txt", 0, 4, 0, 4]\n')
+        self.assertEqual(len(expected) + 1, len(ArchiveReader([tar_path, zip_path])))
+        self.assertEqual(len(expected), len(ArchiveReader([tar_path, zip_path], index_suffix=None)))
+        with tarfile.open(tar_path, "a") as tar:
+            tar.add(self.temp_files[0], arcname="appended.txt")
+        self.assertEqual(len(expected) + 1, len(ArchiveReader(tar_path)) + len(ArchiveReader(zip_path)))
+        self.assertIn(os.path.join(tar_path, "appended.txt"), dict(ArchiveReader(tar_path)[i] for i in range(4)))
+
+        # Serialization Test: the index is carried along, file descriptors are opened again
+        archive_dp[0]
+        loaded_dp = pickle.loads(pickle.dumps(archive_dp))
+        self.assertEqual(archive_dp._members, loaded_dp._members)
+        self.assertEqual(archive_dp[0], loaded_dp[0])
+
+        # Compressed tar archives can't be read by offset
+        self._write_test_tar_gz_files()
+        with self.assertRaisesRegex(ValueError, "uncompressed tar archive"):
+            len(ArchiveReader(os.path.join(self.temp_dir.name, "test_gz.tar.gz")))
+
     def _write_test_xz_files(self):
         for path in self.temp_files:
             fname = os.path.basename(path)
@@ -672,6 +769,229 @@ class TestDataPipeLocalIO(expecttest.TestCase):
             with self.assertRaisesRegex(Exception, "OnDiskCache Exception"):
                 result = list(dl)
 
+    def test_disk_cache_locks_with_index(self):
+        with tempfile.TemporaryDirectory() as tmpdirname, tempfile.TemporaryDirectory() as index_dirname:
+            file_name = os.path.join(tmpdirname, "test.bin")
+            dp = IterableWrapper([file_name])
+            dp = dp.on_disk_cache(filepath_fn=_noop, index_path=os.path.join(index_dirname, "index.db"))
+            dp = dp.map(functools.partial(self._slow_fn, tmpdirname))
+            dp = dp.end_caching(mode="t", filepath_fn=_noop, timeout=120)
+            dp = FileOpener(dp)
+            dp = StreamReader(dp)
+            dl = DataLoader(dp, num_workers=10, multiprocessing_context="spawn", batch_size=1, collate_fn=_unbatch)
+            result = list(dl)
+            # Only the pid file and the 'downloaded' one, without any promise files
+            self.assertEqual(2, len(os.listdir(tmpdirname)))
+            self.assertEqual(10, len(result))
+            self.assertTrue(all(data == "str" for _, data in result))
+
+    def test_disk_cache_with_index(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            index_path = os.path.join(tmpdirname, "index", "index.db")
+            names = ["a", "b", "c"]
+            calls = []
+
+            def _fetch(name):
+                calls.append(name)
+                return name, name.upper()
+
+            def _expand(x):
+                return [(x[0] + f"_{i}", x[1] * i) for i in range(2)]
+
+            def _build(expand=False):
+                dp = IterableWrapper([os.path.join(tmpdirname, name) for name in names])
+                dp = dp.on_disk_cache(filepath_fn=_noop, index_path=index_path)
+                dp = dp.map(_fetch)
+                if expand:
+                    dp = dp.flatmap(_expand)
+                return dp.end_caching(mode="w", skip_read=True)
+
+            # Functional Test: results are written to their final name and no promise or list file is left
+            dp = _build()
+            expected = [os.path.join(tmpdirname, name) for name in names]
+            self.assertEqual(expected, list(dp))
+            self.assertEqual(len(names), len(calls))
+            for name in names:
+                with open(os.path.join(tmpdirname, name)) as f:
+                    self.assertEqual(os.path.join(tmpdirname, name).upper(), f.read())
+            self.assertEqual(sorted(names + ["index"]), sorted(os.listdir(tmpdirname)))
+
+            # Cached items are served from the index
+            def _atimes():
+                with closing(sqlite3.connect(index_path)) as conn:
+                    return conn.execute("SELECT filepath, atime FROM entries ORDER BY filepath").fetchall()
+
+            atimes = _atimes()
+            dp = _build()
+            self.assertEqual(expected, list(dp))
+            self.assertEqual(len(names), len(calls))
+            # Without eviction, hits don't write the access time and are added to the counter in batches
+            self.assertEqual(atimes, _atimes())
+            index, other_index = CacheIndex(index_path), CacheIndex(index_path)
+            hits = other_index.stats()["hits"]
+            for name in names:
+                index.hit(os.path.join(tmpdirname, name))
+            self.assertLess(other_index.stats()["hits"], hits + len(names))
+            self.assertEqual(hits + len(names), index.stats()["hits"])
+            index.close()
+            other_index.close()
+
+            # One-to-many: files are recorded in the index
+            index_path = os.path.join(tmpdirname, "index_many.db")
+            dp = _build(expand=True)
+            expected = [os.path.join(tmpdirname, name + f"_{i}") for name in names for i in range(2)]
+            self.assertEqual(expected, list(dp))
+            self.assertEqual(2 * len(names), len(calls))
+            dp = _build(expand=True)
+            self.assertEqual(expected, list(dp))
+            self.assertEqual(2 * len(names), len(calls))
+
+    def test_disk_cache_index_claims(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            index_path = os.path.join(tmpdirname, "index.db")
+            # Two independently built pipelines share the index
+            index, other_index = CacheIndex(index_path), CacheIndex(index_path)
+            try:
+                # Functional Test: a live claim of another pipeline is waited for instead of being taken over
+                self.assertTrue(other_index.claim("a", "other"))
+                self.assertEqual((_cache_index.PENDING, None, True), index.lookup("a"))
+                self.assertFalse(index.claim("a", "owner"))
+
+                # Functional Test: the claim of a process which died on this host is taken over
+                process = subprocess.Popen([sys.executable, "-c", "pass"])
+                process.wait()
+                other_index._connection().execute("UPDATE entries SET pid = ? WHERE filepath = 'a'", (process.pid,))
+                self.assertEqual((_cache_index.PENDING, None, False), index.lookup("a"))
+                self.assertTrue(index.claim("a", "owner"))
+
+                # Functional Test: an expired lease is taken over
+                self.assertTrue(other_index.claim("b", "other"))
+                other_index._connection().execute("UPDATE entries SET lease = lease - 120 WHERE filepath = 'b'")
+                self.assertTrue(index.claim("b", "owner"))
+
+                # Functional Test: the result of a claim taken over is discarded, members aren't stored twice
+                self.assertFalse(other_index.fulfill("b", "other", ["b_0", "b_1"]))
+                self.assertEqual((_cache_index.PENDING, None, True), other_index.lookup("b"))
+                self.assertTrue(index.fulfill("b", "owner", ["b_0", "b_1"]))
+                self.assertEqual(["b_0", "b_1"], [name for name, *_ in index.locate("b")])
+
+                # Functional Test: leases of pending claims are renewed until they are fulfilled
+                index.close()
+                index = CacheIndex(index_path, lease_timeout=0.2)
+                self.assertTrue(index.claim("c", "owner"))
+                time.sleep(0.5)
+                self.assertFalse(other_index.claim("c", "other"))
+                self.assertTrue(index.fulfill("c", "owner"))
+                self.assertEqual((_cache_index.CACHED_SINGLE_ENTITY, None, False), index.lookup("c"))
+            finally:
+                index.close()
+                other_index.close()
+
+    def test_disk_cache_with_eviction(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            index_path = os.path.join(tmpdirname, "index", "index.db")
+
+            def _build(names, **kwargs):
+                dp = IterableWrapper([os.path.join(tmpdirname, name) for name in names])
+                cache_dp = dp.on_disk_cache(filepath_fn=_noop, index_path=index_path, **kwargs)
+                dp = cache_dp.map(lambda x: (x, "0123456789"))
+                return cache_dp, dp.end_caching(mode="w", skip_read=True)
+
+            def _cached_files():
+                return sorted(f for f in os.listdir(tmpdirname) if f != "index")
+
+            # Functional Test: least recently written items are evicted beyond the capacity
+            cache_dp, dp = _build(["a", "b", "c", "d", "e"], max_cache_files=3, eviction_grace_period=0)
+            self.assertEqual(5, len(list(dp)))
+            self.assertEqual(["c", "d", "e"], _cached_files())
+            self.assertEqual({"hits": 0, "misses": 5, "evictions": 2, "size": 30, "files": 3}, cache_dp.cache_stats())
+
+            # Functional Test: hits refresh the access time, so the least recently used item is evicted
+            cache_dp, dp = _build(["d", "c", "e"], max_cache_size=30, eviction_grace_period=0)
+            self.assertEqual(3, len(list(dp)))
+            cache_dp, dp = _build(["a"], max_cache_size=30, eviction_grace_period=0)
+            self.assertEqual(1, len(list(dp)))
+            self.assertEqual(["a", "c", "e"], _cached_files())
+            self.assertEqual({"hits": 3, "misses": 6, "evictions": 3, "size": 30, "files": 3}, cache_dp.cache_stats())
+
+            # Functional Test: items accessed within the grace period are kept, even beyond the capacity
+            cache_dp, dp = _build(["c", "f"], max_cache_files=3)
+            self.assertEqual(2, len(list(dp)))
+            self.assertEqual(["a", "c", "e", "f"], _cached_files())
+            self.assertEqual(3, cache_dp.cache_stats()["evictions"])
+
+            # Capacity requires the index
+            with self.assertRaisesRegex(ValueError, "require `index_path`"):
+                IterableWrapper([]).on_disk_cache(filepath_fn=_noop, max_cache_files=1)
+
+    def test_disk_cache_with_packing(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            index_path = os.path.join(tmpdirname, "index.db")
+            pack_dir = os.path.join(tmpdirname, "shards")
+            names = ["a", "b", "c", "d", "e"]
+            calls = []
+
+            def _fetch(name):
+                calls.append(name)
+                return name, os.path.basename(name) * 10
+
+            def _expand(x):
+                return [(x[0] + f"_{i}", x[1][:i]) for i in range(2)]
+
+            def _build(expand=False, **kwargs):
+                dp = IterableWrapper([os.path.join(tmpdirname, name) for name in names])
+                cache_dp = dp.on_disk_cache(filepath_fn=_noop, index_path=index_path, **kwargs)
+                dp = cache_dp.map(_fetch)
+                if expand:
+                    dp = dp.flatmap(_expand)
+                return cache_dp, dp.end_caching(mode="wt", skip_read=True, pack_dir=pack_dir, max_shard_size=25)
+
+            # Functional Test: items are packed into shards of up to two items, instead of a file each
+            _, dp = _build()
+            expected = [(os.path.join(tmpdirname, name), name * 10) for name in names]
+            self.assertEqual(expected, list(dp))
+            self.assertEqual(
+                sorted(["index.db", "index.db-shm", "index.db-wal", "shards"]), sorted(os.listdir(tmpdirname))
+            )
+            self.assertEqual(3, len(os.listdir(pack_dir)))
+
+            # Cached items are read back from the shards
+            self.assertEqual(expected, list(dp))
+            self.assertEqual(len(names), len(calls))
+
+            # One-to-many: every file is packed separately
+            index_path = os.path.join(tmpdirname, "index_many.db")
+            _, dp = _build(expand=True)
+            expected = [(os.path.join(tmpdirname, name + f"_{i}"), name * i) for name in names for i in range(2)]
+            self.assertEqual(expected, list(dp))
+            self.assertEqual(expected, list(dp))
+            self.assertEqual(2 * len(names), len(calls))
+
+            # Items cached without packing in the same index are read from their own files
+            index_path = os.path.join(tmpdirname, "index_mixed.db")
+            dp = IterableWrapper([os.path.join(tmpdirname, name) for name in names[:2]])
+            dp = dp.on_disk_cache(filepath_fn=_noop, index_path=index_path).map(_fetch)
+            self.assertEqual(2, len(list(dp.end_caching(mode="wt", skip_read=True))))
+            calls.clear()
+            _, dp = _build()
+            expected = [(os.path.join(tmpdirname, name), name * 10) for name in names]
+            self.assertEqual(expected, sorted(dp))
+            self.assertEqual(names[2:], [os.path.basename(name) for name in calls])
+            self.assertEqual(expected, sorted(dp))
+
+            # Shards are removed once all of their items are evicted
+            index_path = os.path.join(tmpdirname, "index_evict.db")
+            pack_dir = os.path.join(tmpdirname, "shards_evict")
+            cache_dp, dp = _build(max_cache_files=2, eviction_grace_period=0)
+            self.assertEqual(len(names), len(list(dp)))
+            self.assertEqual(2, cache_dp.cache_stats()["files"])
+            self.assertEqual(2, len(os.listdir(pack_dir)))
+
+            # Packing requires the index
+            dp = IterableWrapper([]).on_disk_cache(filepath_fn=_noop)
+            with self.assertRaisesRegex(ValueError, "requires `index_path`"):
+                dp.end_caching(pack_dir=pack_dir)
+
     # TODO(120): this test currently only covers reading from local
     # filesystem. It needs to be modified once test data can be stored on
     # gdrive/onedrive
@@ -688,6 +1008,39 @@ class TestDataPipeLocalIO(expecttest.TestCase):
         for path in datapipe:
             self.assertTrue(path in self.temp_sub_files)
 
+    @skipIfNoIoPath
+    def test_io_path_file_lister_with_manifest(self):
+        manifest_dir = create_temp_dir()
+        datapipe = IoPathFileLister(root=self.temp_sub_dir.name, manifest_dir=manifest_dir.name)
+        self.assertEqual(sorted(self.temp_sub_files), sorted(datapipe))
+
+        self.assertEqual(1, len(os.listdir(manifest_dir.name)))
+        manifest_path = os.path.join(manifest_dir.name, os.listdir(manifest_dir.name)[0])
+        manifest_mtime = os.path.getmtime(manifest_path)
+        self.assertEqual(sorted(self.temp_sub_files), sorted(datapipe))
+        self.assertEqual(manifest_mtime, os.path.getmtime(manifest_path))
+
+        # Without a TTL, the manifest of a local root is rebuilt once the root has changed
+        time.sleep(0.01)
+        new_file = os.path.join(self.temp_sub_dir.name, "new_file.txt")
+        with open(new_file, "w") as f:
+            f.write("new")
+        self.assertEqual(sorted(list(self.temp_sub_files) + [new_file]), sorted(datapipe))
+
+        # With a TTL, the listing is read from the manifest until it expires
+        datapipe = IoPathFileLister(root=self.temp_sub_dir.name, manifest_dir=manifest_dir.name, manifest_ttl=60)
+        list(datapipe)
+        os.remove(new_file)
+        self.assertIn(new_file, list(datapipe))
+        datapipe = IoPathFileLister(root=self.temp_sub_dir.name, manifest_dir=manifest_dir.name, manifest_ttl=0)
+        self.assertEqual(sorted(self.temp_sub_files), sorted(datapipe))
+
+        # Other roots can't be validated without a TTL
+        datapipe = IoPathFileLister(root="https://example.com/folder", manifest_dir=manifest_dir.name)
+        with self.assertRaisesRegex(ValueError, "`manifest_ttl` is required"):
+            list(datapipe)
+        manifest_dir.cleanup()
+
     @skipIfNoIoPath
     def test_io_path_file_lister_iterdatapipe_with_list(self):
         datapipe = IoPathFileLister(root=[self.temp_sub_dir.name, self.temp_sub_dir_2.name])
@@ -909,6 +1262,42 @@ class TestDataPipeLocalIO(expecttest.TestCase):
         assert items[0][".txt"] == "text0"
         assert items[9][".bin"] == "bin9"
 
+    def test_http_reader_with_local_server(self):
+        handler = functools.partial(_QuietHTTPRequestHandler, directory=self.temp_dir.name)
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        try:
+            base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+            urls = [base_url + os.path.basename(f) for f in self.temp_files] * 3
+            expected = []
+            for f in self.temp_files * 3:
+                with open(f, "rb") as fd:
+                    expected.append(fd.read())
+
+            # Functional Test: sequential and concurrent requests yield in order
+            for concurrency in (1, 4):
+                http_reader_dp = HttpReader(IterableWrapper(urls), timeout=10, concurrency=concurrency)
+                res = [(url, stream.read()) for url, stream in http_reader_dp]
+                self.assertEqual(list(zip(urls, expected)), res)
+
+            # Functional Test: unordered concurrent requests
+            online_reader_dp = OnlineReader(IterableWrapper(urls), timeout=10, concurrency=4, in_order=False)
+            res = [(url, stream.read()) for url, stream in online_reader_dp]
+            self.assertEqual(sorted(zip(urls, expected)), sorted(res))
+
+            # Functional Test: HTTP errors are raised
+            error_dp = HttpReader(IterableWrapper([base_url + "missing"]), concurrency=2)
+            with self.assertRaisesRegex(Exception, "404"):
+                list(error_dp)
+
+            with self.assertRaisesRegex(ValueError, "concurrency"):
+                HttpReader(IterableWrapper(urls), concurrency=0)
+        finally:
+            server.shutdown()
+            server.server_close()
+            server_thread.join()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -72,6 +72,43 @@ class TestMapDataPipe(expecttest.TestCase):
         # __len__ Test: inherits length from source_dp
         self.assertEqual(10, len(cache_dp))
 
+        # Functional Test: LRU eviction is bounded by the size of the items
+        source_dp = SequenceWrapper([bytes([i]) * 300 * 1024 for i in range(10)])
+        cache_dp = source_dp.in_memory_cache(size=1)
+        for i in [0, 1, 2, 0, 3]:
+            self.assertEqual(source_dp[i], cache_dp[i])
+        self.assertEqual([2, 0, 3], list(cache_dp.cache))
+
+        # Functional Test: LFU evicts the least frequently used items
+        cache_dp = source_dp.in_memory_cache(size=1, policy="lfu")
+        for i in [0, 0, 1, 1, 2, 3]:
+            self.assertEqual(source_dp[i], cache_dp[i])
+        self.assertEqual([0, 1, 3], sorted(cache_dp.cache))
+
+        with self.assertRaisesRegex(ValueError, "Invalid policy"):
+            source_dp.in_memory_cache(policy="fifo")
+
+        # Functional Test: batches request each missing index once, in a single call
+        class _BatchSource(MapDataPipe):
+            def __init__(self):
+                self.requests = []
+
+            def __getitem__(self, index):
+                raise AssertionError("Expected a batched request")
+
+            def __getitems__(self, indices):
+                self.requests.append(indices)
+                return [i * 2 for i in indices]
+
+            def __len__(self):
+                return 10
+
+        batch_source_dp = _BatchSource()
+        cache_dp = InMemoryCacheHolder(batch_source_dp)  # type: ignore[arg-type]
+        self.assertEqual([2, 4, 2, 6], cache_dp.__getitems__([1, 2, 1, 3]))
+        self.assertEqual([2, 8, 6], cache_dp.__getitems__([1, 4, 3]))
+        self.assertEqual([[1, 2, 3], [4]], batch_source_dp.requests)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,16 +4,60 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import os
+import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import MagicMock, patch
 
 import expecttest
 from torch.testing._internal.common_utils import IS_SANDCASTLE
-from torchdata.datapipes.iter import IterableWrapper, S3FileLister
+from torchdata.datapipes.iter import IterableWrapper, S3FileLister, S3FileLoader
 
 skipIfSandcastle = unittest.skipIf(IS_SANDCASTLE, "Skip for internal testing")
 
 
+class _FakeS3Handler:
+    r"""
+    In-memory stand-in of ``S3Handler`` that records the number of requests in flight.
+    """
+
+    def __init__(self, objects, latency=0.0):
+        self.objects = objects
+        self.latency = latency
+        self.range_requests = []
+        self.size_requests = 0
+        self.inflight = 0
+        self.max_inflight = 0
+        self._lock = threading.Lock()
+
+    def _request(self):
+        with self._lock:
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.inflight -= 1
+
+    def s3_read(self, url):
+        self._request()
+        return self.objects[url]
+
+    def s3_read_range(self, url, offset, length, file_size):
+        self._request()
+        self.range_requests.append((url, offset, length))
+        assert file_size == len(self.objects[url])
+        return self.objects[url][offset : offset + length]
+
+    def get_file_size(self, url):
+        self.size_requests += 1
+        return len(self.objects[url])
+
+    def get_buffer_size(self):
+        return 4
+
+
 @skipIfSandcastle
 @patch("torchdata._torchdata")
 class TestS3FileListerIterDataPipe(expecttest.TestCase):
@@ -36,3 +80,116 @@ class TestS3FileListerIterDataPipe(expecttest.TestCase):
         s3_prefixes = IterableWrapper(["s3://bucket-name/folder/"])
         dp_s3_urls = S3FileLister(s3_prefixes, masks="*.csv")
         assert list(dp_s3_urls) == ["s3://bucket-name/folder/b.csv"]
+
+    def test_list_files_concurrently(self, mock_torchdata):
+        keys = sorted(
+            [f"s3://bucket-name/folder/{i}.txt" for i in range(3)]
+            + [f"s3://bucket-name/folder/sub{j}/{i}.txt" for j in range(3) for i in range(5)]
+            + ["s3://bucket-name/folder/sub1/deep/0.csv"]
+        )
+
+        def list_files_page(prefix, marker, delimiter, page_size=2):
+            # Lists the keys and the sub-prefixes right under ``prefix`` in pages of ``page_size``
+            entries = []
+            for key in keys:
+                if not key.startswith(prefix):
+                    continue
+                sep = key.find(delimiter, len(prefix))
+                entry = key if sep == -1 else key[: sep + 1]
+                if entry > marker and (not entries or entries[-1] != entry):
+                    entries.append(entry)
+            page = entries[:page_size]
+            next_marker = page[-1] if len(entries) > page_size else ""
+            return [e for e in page if not e.endswith("/")], [e for e in page if e.endswith("/")], next_marker
+
+        s3handler_mock = MagicMock()
+        mock_torchdata.S3Handler.return_value = s3handler_mock
+        s3handler_mock.list_files_page = MagicMock(side_effect=list_files_page)
+        s3_prefixes = IterableWrapper(["s3://bucket-name/folder/"])
+
+        dp_s3_urls = S3FileLister(s3_prefixes, concurrency=4)
+        res = list(dp_s3_urls)
+        self.assertEqual(keys, sorted(res))
+        # Files under a prefix come before the files of its sub-prefixes
+        self.assertEqual([f"s3://bucket-name/folder/{i}.txt" for i in range(3)], res[:3])
+        self.assertEqual(res, list(dp_s3_urls))
+
+        dp_s3_urls = S3FileLister(s3_prefixes, masks="*.csv", concurrency=4)
+        self.assertEqual(["s3://bucket-name/folder/sub1/deep/0.csv"], list(dp_s3_urls))
+
+        # Only a few first pages of the sub-prefixes of a wide prefix are requested ahead
+        keys = [f"s3://bucket-name/wide/sub{j:03}/0.txt" for j in range(100)]
+        s3handler_mock.list_files_page = MagicMock(side_effect=lambda *args: list_files_page(*args, page_size=1000))
+        it = iter(S3FileLister(IterableWrapper(["s3://bucket-name/wide/"]), concurrency=2))
+        self.assertEqual(keys[0], next(it))
+        time.sleep(0.1)
+        self.assertLessEqual(s3handler_mock.list_files_page.call_count, 2 + 4 * 2)
+        self.assertEqual(keys[1:], list(it))
+
+    def test_list_files_with_manifest(self, mock_torchdata):
+        s3handler_mock = MagicMock()
+        mock_torchdata.S3Handler.return_value = s3handler_mock
+        s3handler_mock.list_files = MagicMock(
+            side_effect=[["s3://bucket-name/folder/a.txt", "s3://bucket-name/folder/b.csv"], []]
+        )
+        s3_prefixes = IterableWrapper(["s3://bucket-name/folder/"])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest_path = os.path.join(temp_dir, "manifest.txt")
+            dp_s3_urls = S3FileLister(s3_prefixes, manifest_path=manifest_path)
+            expected = ["s3://bucket-name/folder/a.txt", "s3://bucket-name/folder/b.csv"]
+            self.assertEqual(expected, list(dp_s3_urls))
+            self.assertTrue(os.path.exists(manifest_path))
+
+            # The listing is skipped once the manifest exists
+            self.assertEqual(expected, list(dp_s3_urls))
+            self.assertEqual(2, s3handler_mock.list_files.call_count)
+
+
+@skipIfSandcastle
+@patch("torchdata._torchdata")
+class TestS3FileLoaderIterDataPipe(expecttest.TestCase):
+    def setUp(self):
+        self.objects = {f"s3://bucket-name/folder/{i}.txt": f"content of object {i}".encode() for i in range(8)}
+        self.urls = list(self.objects.keys())
+
+    def test_load_files(self, mock_torchdata):
+        mock_torchdata.S3Handler.return_value = _FakeS3Handler(self.objects)
+        dp_s3_files = S3FileLoader(IterableWrapper(self.urls))
+        self.assertEqual([(url, self.objects[url]) for url in self.urls], [(url, fd.read()) for url, fd in dp_s3_files])
+
+    def test_load_files_concurrently(self, mock_torchdata):
+        handler = _FakeS3Handler(self.objects, latency=0.01)
+        mock_torchdata.S3Handler.return_value = handler
+        dp_s3_files = S3FileLoader(IterableWrapper(self.urls), concurrency=4)
+        self.assertEqual([(url, self.objects[url]) for url in self.urls], [(url, fd.read()) for url, fd in dp_s3_files])
+        self.assertGreater(handler.max_inflight, 1)
+        self.assertLessEqual(handler.max_inflight, 4)
+
+        dp_s3_files = S3FileLoader(IterableWrapper(self.urls), concurrency=4, in_order=False)
+        self.assertEqual(
+            sorted((url, self.objects[url]) for url in self.urls), sorted((url, fd.read()) for url, fd in dp_s3_files)
+        )
+
+        with self.assertRaisesRegex(ValueError, "concurrency"):
+            S3FileLoader(IterableWrapper(self.urls), concurrency=0)
+
+    def test_load_files_streaming(self, mock_torchdata):
+        handler = _FakeS3Handler(self.objects)
+        mock_torchdata.S3Handler.return_value = handler
+        dp_s3_files = S3FileLoader(IterableWrapper(self.urls[:1]), streaming=True)
+        url, fd = next(iter(dp_s3_files))
+        # Nothing is downloaded before reading
+        self.assertEqual([], handler.range_requests)
+
+        # Byte-range read
+        fd.seek(8)
+        self.assertEqual(self.objects[url][8:14], fd.read(6))
+        self.assertEqual((url, 8), handler.range_requests[0][:2])
+
+        fd.seek(0)
+        self.assertEqual(self.objects[url], fd.read())
+        # The remaining object is fetched in chunks of the buffer size
+        self.assertTrue(all(length <= 4 for _, _, length in handler.range_requests[1:]))
+        self.assertEqual(b"", fd.read())
+        # The size of the object is requested once, not along with every range
+        self.assertEqual(1, handler.size_requests)
@@ -73,6 +73,10 @@ def _fake_fn_ls(x):
     return [x, x]
 
 
+def _fake_add(x):
+    return x + 1
+
+
 def _filepath_fn(name: str, dir) -> str:
     return os.path.join(dir, os.path.basename(name))
 
@@ -272,6 +276,7 @@ class TestIterDataPipeSerialization(expecttest.TestCase):
                 (),
                 {},
             ),
+            (iterdp.ParallelMapper, None, (_fake_add,), {"num_workers": 2}),
             (iterdp.ParquetDataFrameLoader, None, (), {"dtype": DTYPE}),
             (iterdp.RarArchiveLoader, None, (), {}),
             (
@@ -292,6 +297,7 @@ class TestIterDataPipeSerialization(expecttest.TestCase):
             (iterdp.TarArchiveLoader, None, (), {}),
             # TODO(594): Add serialization tests for optional DataPipe
             #  (iterdp.TFRecordLoader, None, (), {}),
+            (iterdp.TFRecordSplitter, None, (), {}),
             (iterdp.UnZipper, IterableWrapper([(i, i + 10) for i in range(10)]), (), {"sequence_length": 2}),
             (iterdp.WebDataset, IterableWrapper([("foo.txt", b"1"), ("bar.txt", b"2")]), (), {}),
             (iterdp.XzFileLoader, None, (), {}),
@@ -321,6 +327,7 @@ class TestIterDataPipeSerialization(expecttest.TestCase):
             iterdp.RarArchiveLoader,
             iterdp.TarArchiveLoader,
             iterdp.TFRecordLoader,
+            iterdp.TFRecordSplitter,
             iterdp.XzFileLoader,
             iterdp.ZipArchiveLoader,
         }
@@ -361,6 +368,7 @@ class TestIterDataPipeSerialization(expecttest.TestCase):
             (iterdp.MapKeyZipper, (ref_mdp, lambda x: x), {}),
             (iterdp.OnDiskCacheHolder, (lambda x: x,), {}),
             (iterdp.ParagraphAggregator, (lambda x: x,), {}),
+            (iterdp.ParallelMapper, (lambda x: x + 1,), {}),
         ]
         # Skipping value comparison for these DataPipes
         dp_skip_comparison = {iterdp.OnDiskCacheHolder, iterdp.ParagraphAggregator}
@@ -5,9 +5,13 @@
 # LICENSE file in the root directory of this source tree.
 
 import os
+import shutil
+import struct
+import tempfile
 import unittest
 import warnings
 from functools import partial
+from unittest.mock import patch
 
 import expecttest
 
@@ -22,6 +26,20 @@ from torchdata.datapipes.iter import (
     FSSpecSaver,
     IterableWrapper,
     TFRecordLoader,
+    TFRecordSplitter,
+)
+from torchdata.datapipes.iter.util import tfrecordloader
+from torchdata.datapipes.iter.util.tfrecordloader import (
+    _batch_records,
+    _collate_examples,
+    _decode_numeric_examples,
+    _iterate_tfrecord_buffer,
+    _map_tfrecord_stream,
+    _masked_crc,
+    build_tfrecord_index,
+    iterate_tfrecord_file,
+    read_tfrecord_index,
+    write_tfrecord_index,
 )
 
 try:
@@ -33,6 +51,15 @@ except ImportError:
     HAS_PROTOBUF = False
 skipIfNoPROTOBUF = unittest.skipIf(not HAS_PROTOBUF, "no google protobuf")
 
+try:
+    import numpy as _numpy
+
+    del _numpy
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+skipIfNoNumpy = unittest.skipIf(not HAS_NUMPY, "no numpy")
+
 
 class TestDataPipeTFRecord(expecttest.TestCase):
     def setUp(self):
@@ -86,6 +113,17 @@ class TestDataPipeTFRecord(expecttest.TestCase):
             self.assertEqual(len(loaded_data["x_byte"]), 1)
             self.assertEqual(true_data["x_byte"][0], loaded_data["x_byte"][0])
 
+        # Functional Test: records pass CRC verification
+        self.assertEqual(len(list(datapipe2.load_from_tfrecord(verify_crc=True))), 4)
+
+        # Functional Test: records are parsed from the memory-mapped file
+        result = list(datapipe2.load_from_tfrecord(verify_crc=True, use_mmap=True))
+        self.assertEqual(len(result), 4)
+        for true_data, loaded_data in zip(expected_res, result):
+            for key in ["x_float", "x_int"]:
+                self.assertArrayEqual(true_data[key], loaded_data[key])
+            self.assertEqual(true_data["x_byte"][0], loaded_data["x_byte"][0])
+
         # Functional Test: test if the shape of the returned data is correct when using spec
         tfrecord_parser = datapipe2.load_from_tfrecord(
             {
@@ -290,6 +328,188 @@ class TestDataPipeTFRecord(expecttest.TestCase):
         with self.assertRaisesRegex(TypeError, "doesn't have valid length"):
             len(tfrecord_parser)
 
+    @skipIfNoNumpy
+    @torch.no_grad()
+    def test_tfrecord_numeric_decoding(self):
+        spec = {"x_float": ((5, 2), torch.float64), "x_int": ((-1,), torch.int32)}
+        for filename in ["example.tfrecord", "sequence_example.tfrecord"]:
+            with open(f"{self.temp_dir}/{filename}", "rb") as f:
+                (records,) = list(_batch_records(iterate_tfrecord_file(f), 64))
+            self.assertEqual(len(records), 4)
+
+            # Functional Test: features are decoded into batched tensors of the spec's shape and dtype
+            batch = _decode_numeric_examples(records, spec)
+            self.assertEqual(batch["x_float"].shape, (4, 5, 2))
+            self.assertEqual(batch["x_float"].dtype, torch.float64)
+            self.assertEqual(batch["x_int"].shape, (4, 10))
+            self.assertEqual(batch["x_int"].dtype, torch.int32)
+            for i, true_data in enumerate(self._ground_truth_data()):
+                self.assertArrayEqual(true_data["x_float"].reshape(5, 2), batch["x_float"][i])
+                self.assertArrayEqual(true_data["x_int"], batch["x_int"][i])
+
+            # Records are left to protobuf for bytes, missing or mismatching features
+            self.assertIsNone(_decode_numeric_examples(records, {"x_byte": ((1,), torch.int64)}))
+            self.assertIsNone(_decode_numeric_examples(records, {"x_float_seq": ((1,), torch.float32)}))
+            self.assertIsNone(_decode_numeric_examples(records, {"x_float": ((3,), torch.float32)}))
+
+    def _write_ragged_tfrecord(self, filename):
+        from torchdata.datapipes.iter.util.protobuf_template import _tfrecord_example_pb2 as example_pb2
+
+        with open(filename, "wb") as f:
+            for i in range(5):
+                example = example_pb2.Example()
+                example.features.feature["x_float"].float_list.value.extend([float(i)] * (2 * i))
+                example.features.feature["x_int"].int64_list.value.extend(range(-i, i + 2))
+                example.features.feature["x_fixed"].int64_list.value.extend([i, i])
+                data = example.SerializeToString()
+                length = struct.pack("<Q", len(data))
+                f.write(length + struct.pack("<I", _masked_crc(length)) + data + struct.pack("<I", _masked_crc(data)))
+
+    @skipIfNoPROTOBUF
+    @torch.no_grad()
+    def test_tfrecord_loader_batch_iterdatapipe(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "ragged.tfrecord")
+            self._write_ragged_tfrecord(filename)
+            datapipe = FileOpener(IterableWrapper([filename]), mode="b")
+            expected_float = [torch.full((2 * i,), float(i)) for i in range(5)]
+            expected_int = [torch.arange(-i, i + 2) for i in range(5)]
+
+            for spec in [
+                None,
+                {"x_float": ((-1, 2), torch.float64), "x_int": ((-1,), torch.int64), "x_fixed": ((2,), torch.int32)},
+            ]:
+                # Functional Test: ragged features are padded, the last batch holds the remaining records
+                result = list(datapipe.load_from_tfrecord(spec, batch_size=3))
+                self.assertEqual([3, 2], [len(batch["x_fixed"]) for batch in result])
+                self.assertArrayEqual(
+                    torch.tensor([[i, i] for i in range(5)]), torch.cat([b["x_fixed"] for b in result])
+                )
+                self.assertEqual((3, 6), tuple(result[0]["x_int"].shape))
+                for i in range(3):
+                    self.assertArrayEqual(expected_int[i], result[0]["x_int"][i, : 2 * i + 2])
+                    self.assertEqual(0, result[0]["x_int"][i, 2 * i + 2 :].abs().sum())
+                padded_float = result[1]["x_float"].reshape(2, -1)
+                self.assertArrayEqual(expected_float[4], padded_float[1])
+                self.assertArrayEqual(expected_float[3], padded_float[0, :6])
+                self.assertEqual(0, padded_float[0, 6:].abs().sum())
+                if spec is not None:
+                    self.assertEqual((2, 4, 2), tuple(result[1]["x_float"].shape))
+                    self.assertEqual(torch.float64, result[1]["x_float"].dtype)
+                    self.assertEqual(torch.int32, result[1]["x_fixed"].dtype)
+
+                # Functional Test: ragged features are returned as values and offsets
+                result = list(datapipe.load_from_tfrecord(spec, batch_size=5, ragged="offsets"))
+                self.assertEqual(1, len(result))
+                values, offsets = result[0]["x_int"]
+                self.assertArrayEqual(torch.cat(expected_int), values)
+                self.assertEqual([0, 2, 6, 12, 20, 30], offsets.tolist())
+                values, offsets = result[0]["x_float"]
+                self.assertArrayEqual(torch.cat(expected_float), values)
+                self.assertEqual([0, 0, 2, 6, 12, 20], offsets.tolist())
+                self.assertEqual((5, 2), tuple(result[0]["x_fixed"].shape))
+                if spec is not None:
+                    # Features declared with a dynamic dimension keep their type when the shapes of a batch match
+                    result = list(datapipe.load_from_tfrecord(spec, batch_size=1, ragged="offsets"))
+                    values, offsets = result[0]["x_int"]
+                    self.assertArrayEqual(expected_int[0], values)
+                    self.assertEqual([0, 2], offsets.tolist())
+                    self.assertEqual((1, 2), tuple(result[0]["x_fixed"].shape))
+                    collated = _collate_examples([{"x_int": expected_int[1]}] * 2, "offsets", spec)
+                    self.assertEqual([0, 4, 8], collated["x_int"][1].tolist())
+
+            # Features other than tensors are lists with one element per record
+            filename = f"{self.temp_dir}/example.tfrecord"
+            result = list(FileOpener(IterableWrapper([filename]), mode="b").load_from_tfrecord(batch_size=4))
+            self.assertEqual(1, len(result))
+            self.assertEqual([[b"test str"]] * 4, [list(x) for x in result[0]["x_byte"]])
+            self.assertArrayEqual(torch.stack([x["x_int"] for x in self._ground_truth_data()]), result[0]["x_int"])
+
+            with self.assertRaisesRegex(ValueError, "batch_size"):
+                datapipe.load_from_tfrecord(batch_size=0)
+            with self.assertRaisesRegex(ValueError, "Invalid ragged"):
+                datapipe.load_from_tfrecord(batch_size=2, ragged="truncate")
+
+    def test_tfrecord_crc_verification(self):
+        filename = f"{self.temp_dir}/example.tfrecord"
+        with open(filename, "rb") as f:
+            self.assertEqual(4, len([bytes(r) for r in iterate_tfrecord_file(f, verify_crc=True)]))
+        with open(filename, "rb") as f:
+            data = bytearray(f.read())
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Corrupted record
+            corrupted = bytearray(data)
+            corrupted[20] ^= 0xFF
+            corrupted_filename = os.path.join(tmpdir, "corrupted.tfrecord")
+            with open(corrupted_filename, "wb") as f:
+                f.write(corrupted)
+            with open(corrupted_filename, "rb") as f:
+                self.assertEqual(4, len(list(iterate_tfrecord_file(f))))
+            with open(corrupted_filename, "rb") as f:
+                with self.assertRaisesRegex(RuntimeError, "CRC mismatch of the record"):
+                    list(iterate_tfrecord_file(f, verify_crc=True))
+
+            # Corrupted record size
+            corrupted = bytearray(data)
+            corrupted[8] ^= 0xFF
+            with open(corrupted_filename, "wb") as f:
+                f.write(corrupted)
+            with open(corrupted_filename, "rb") as f:
+                with self.assertRaisesRegex(RuntimeError, "CRC mismatch of the record size"):
+                    list(iterate_tfrecord_file(f, verify_crc=True))
+
+        # The pure Python fallback matches and warns once
+        with patch.object(tfrecordloader, "HAS_CRC32C", False), patch.object(tfrecordloader, "_warned_slow_crc", False):
+            with warnings.catch_warnings(record=True) as wa:
+                warnings.simplefilter("always")
+                for _ in range(2):
+                    with open(filename, "rb") as f:
+                        self.assertEqual(4, len(list(iterate_tfrecord_file(f, verify_crc=True))))
+                self.assertEqual(1, len([w for w in wa if "pure Python is slow" in str(w.message)]))
+
+    def test_tfrecord_splitter_iterdatapipe(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "example.tfrecord")
+            shutil.copy(f"{self.temp_dir}/example.tfrecord", filename)
+            with open(filename, "rb") as f:
+                expected_records = [bytes(r) for r in iterate_tfrecord_file(f)]
+                f.seek(0)
+                index = build_tfrecord_index(f)
+            self.assertEqual(4, len(index))
+            self.assertEqual(0, index[0][0])
+            self.assertEqual(os.path.getsize(filename), index[-1][0] + index[-1][1])
+
+            def read_splits(datapipe):
+                return [[bytes(r) for r in iterate_tfrecord_file(stream)] for _, stream in datapipe]
+
+            # Functional Test: the offsets are found without an index, which can be saved
+            datapipe = FileOpener(IterableWrapper([filename]), mode="b").split_tfrecord(3, save_index=True)
+            self.assertEqual([expected_records[:3], expected_records[3:]], read_splits(datapipe))
+            self.assertEqual(index, read_tfrecord_index(filename + ".index"))
+
+            # Functional Test: the splits of a local file are memory-mapped
+            mapped_splits = [[bytes(r) for r in _iterate_tfrecord_buffer(_map_tfrecord_stream(s))] for _, s in datapipe]
+            self.assertEqual([expected_records[:3], expected_records[3:]], mapped_splits)
+
+            # Functional Test: the splits are sharded
+            sharded_dp = FileOpener(IterableWrapper([filename]), mode="b").split_tfrecord(1).sharding_filter()
+            torch.utils.data.graph_settings.apply_sharding(sharded_dp, 2, 1)
+            self.assertEqual([[expected_records[1]], [expected_records[3]]], read_splits(sharded_dp))
+
+            # The index is used when present, and ignored once it's out of date
+            write_tfrecord_index(index[:2], filename + ".index")
+            with warnings.catch_warnings(record=True) as wa:
+                warnings.simplefilter("always")
+                self.assertEqual([expected_records[:3], expected_records[3:]], read_splits(datapipe))
+                self.assertEqual(1, len(wa))
+                self.assertRegex(str(wa[0].message), "doesn't match the size")
+            write_tfrecord_index(index[:2] + [(index[2][0], index[2][1] + index[3][1])], filename + ".index")
+            self.assertEqual(3, len(read_splits(TFRecordSplitter(datapipe.datapipe, 1))))
+
+            with self.assertRaisesRegex(ValueError, "records_per_split"):
+                TFRecordSplitter(datapipe.datapipe, 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -266,6 +266,10 @@ void S3Handler::InitializeExecutor() {
 void S3Handler::InitializeTransferManager() {
   std::shared_ptr<Aws::S3::S3Client> s3_client = GetS3Client();
   std::lock_guard<std::mutex> lock(*initialization_lock_);
+  // Another thread may have initialized it while waiting for the lock
+  if (transfer_manager_.get() != nullptr) {
+    return;
+  }
 
   Aws::Transfer::TransferManagerConfiguration transfer_config(
       GetExecutor().get());
@@ -321,9 +325,18 @@ void S3Handler::ClearMarker() {
   last_marker_ = S3DefaultMarker;
 }
 
-void S3Handler::S3Read(const std::string& file_url, std::string* result) {
+size_t S3Handler::GetFileSize(const std::string& file_url) {
   std::string bucket, object;
   parseS3Path(file_url, &bucket, &object);
+  return GetFileSize(bucket, object);
+}
+
+void S3Handler::ReadRange(
+    const std::string& bucket,
+    const std::string& object,
+    uint64_t offset,
+    size_t length,
+    std::string* result) {
   S3FS s3fs(
       bucket,
       object,
@@ -331,25 +344,21 @@ void S3Handler::S3Read(const std::string& file_url, std::string* result) {
       GetTransferManager(),
       GetS3Client());
 
-  uint64_t offset = 0;
   uint64_t result_size = 0;
-  uint64_t file_size = GetFileSize(bucket, object);
   size_t part_count =
       (std::
-           max)(static_cast<size_t>((file_size + buffer_size_ - 1) / buffer_size_), static_cast<size_t>(1));
-  result->resize(file_size);
+           max)(static_cast<size_t>((length + buffer_size_ - 1) / buffer_size_), static_cast<size_t>(1));
+  result->resize(length);
 
   for (int i = 0; i < part_count; i++) {
-    offset = result_size;
+    size_t buf_len = std::min<size_t>(buffer_size_, length - result_size);
 
-    size_t buf_len = std::min<size_t>(buffer_size_, file_size - result_size);
-
-    size_t read_len =
-        s3fs.Read(offset, buf_len, (char*)(result->data()) + offset);
+    size_t read_len = s3fs.Read(
+        offset + result_size, buf_len, (char*)(result->data()) + result_size);
 
     result_size += read_len;
 
-    if (result_size == file_size) {
+    if (result_size == length) {
       break;
     }
 
@@ -358,6 +367,32 @@ void S3Handler::S3Read(const std::string& file_url, std::string* result) {
       break;
     }
   }
+  result->resize(result_size);
+}
+
+void S3Handler::S3Read(const std::string& file_url, std::string* result) {
+  std::string bucket, object;
+  parseS3Path(file_url, &bucket, &object);
+  uint64_t file_size = GetFileSize(bucket, object);
+  ReadRange(bucket, object, 0, file_size, result);
+}
+
+void S3Handler::S3ReadRange(
+    const std::string& file_url,
+    uint64_t offset,
+    size_t length,
+    uint64_t file_size,
+    std::string* result) {
+  // The size of the object is known by the caller, which saves a HeadObject
+  // request per range
+  std::string bucket, object;
+  parseS3Path(file_url, &bucket, &object);
+  if (offset >= file_size) {
+    result->clear();
+    return;
+  }
+  length = std::min<uint64_t>(length, file_size - offset);
+  ReadRange(bucket, object, offset, length, result);
 }
 
 void S3Handler::ListFiles(
@@ -399,4 +434,64 @@ void S3Handler::ListFiles(
   }
 }
 
+std::string S3Handler::ListFilesPage(
+    const std::string& file_url,
+    const std::string& marker,
+    const std::string& delimiter,
+    std::vector<std::string>* filenames,
+    std::vector<std::string>* prefixes) {
+  // Unlike ListFiles, the marker is passed in and returned rather than kept
+  // in the handler, so that pages of different prefixes can be requested
+  // concurrently
+  Aws::String bucket, prefix;
+  parseS3Path(file_url, &bucket, &prefix);
+
+  Aws::S3::Model::ListObjectsRequest listObjectsRequest;
+  listObjectsRequest.WithBucket(bucket).WithPrefix(prefix).WithMarker(
+      marker.c_str());
+  if (!delimiter.empty()) {
+    listObjectsRequest.SetDelimiter(delimiter.c_str());
+  }
+
+  Aws::S3::Model::ListObjectsOutcome listObjectsOutcome =
+      GetS3Client()->ListObjects(listObjectsRequest);
+  if (!listObjectsOutcome.IsSuccess()) {
+    Aws::String const& error_aws = listObjectsOutcome.GetError().GetMessage();
+    throw std::invalid_argument(error_aws);
+  }
+
+  const Aws::S3::Model::ListObjectsResult& result =
+      listObjectsOutcome.GetResult();
+  const Aws::Vector<Aws::S3::Model::Object>& objects = result.GetContents();
+  for (const Aws::S3::Model::Object& object : objects) {
+    if (object.GetKey().back() == '/') // ignore folders
+    {
+      continue;
+    }
+    Aws::String entry = "s3://" + bucket + "/" + object.GetKey();
+    filenames->push_back(entry.c_str());
+  }
+  const Aws::Vector<Aws::S3::Model::CommonPrefix>& common_prefixes =
+      result.GetCommonPrefixes();
+  for (const Aws::S3::Model::CommonPrefix& common_prefix : common_prefixes) {
+    Aws::String entry = "s3://" + bucket + "/" + common_prefix.GetPrefix();
+    prefixes->push_back(entry.c_str());
+  }
+
+  // An empty marker indicates the last page
+  if (!result.GetIsTruncated()) {
+    return S3DefaultMarker;
+  }
+  if (!result.GetNextMarker().empty()) {
+    return result.GetNextMarker().c_str();
+  }
+  if (!objects.empty()) {
+    return objects.back().GetKey().c_str();
+  }
+  if (!common_prefixes.empty()) {
+    return common_prefixes.back().GetPrefix().c_str();
+  }
+  return S3DefaultMarker;
+}
+
 } // namespace torchdata
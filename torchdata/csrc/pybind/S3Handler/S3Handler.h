@@ -43,6 +43,12 @@ class S3Handler {
   std::shared_ptr<Aws::Utils::Threading::PooledThreadExecutor> GetExecutor();
   std::shared_ptr<Aws::Transfer::TransferManager> GetTransferManager();
   size_t GetFileSize(const std::string& bucket, const std::string& object);
+  void ReadRange(
+      const std::string& bucket,
+      const std::string& object,
+      uint64_t offset,
+      size_t length,
+      std::string* result);
 
  public:
   S3Handler(const long requestTimeoutMs, const std::string region);
@@ -76,9 +82,22 @@ class S3Handler {
   }
 
   void S3Read(const std::string& file_url, std::string* result);
+  void S3ReadRange(
+      const std::string& file_url,
+      uint64_t offset,
+      size_t length,
+      uint64_t file_size,
+      std::string* result);
+  size_t GetFileSize(const std::string& file_url);
   void ListFiles(
       const std::string& file_url,
       std::vector<std::string>* filenames);
+  std::string ListFilesPage(
+      const std::string& file_url,
+      const std::string& marker,
+      const std::string& delimiter,
+      std::vector<std::string>* filenames,
+      std::vector<std::string>* prefixes);
 };
 
 } // namespace torchdata
@@ -24,9 +24,36 @@ PYBIND11_MODULE(_torchdata, m) {
           "s3_read",
           [](S3Handler* self, const std::string& file_url) {
             std::string result;
-            self->S3Read(file_url, &result);
+            {
+              // Allow other Python threads to issue requests concurrently
+              py::gil_scoped_release release;
+              self->S3Read(file_url, &result);
+            }
             return py::bytes(result);
           })
+      .def(
+          "s3_read_range",
+          [](S3Handler* self,
+             const std::string& file_url,
+             const uint64_t offset,
+             const size_t length,
+             const uint64_t file_size) {
+            std::string result;
+            {
+              py::gil_scoped_release release;
+              self->S3ReadRange(file_url, offset, length, file_size, &result);
+            }
+            return py::bytes(result);
+          })
+      .def(
+          "get_file_size",
+          [](S3Handler* self, const std::string& file_url) {
+            py::gil_scoped_release release;
+            return self->GetFileSize(file_url);
+          })
+      .def(
+          "get_buffer_size",
+          [](S3Handler* self) { return self->GetBufferSize(); })
       .def(
           "list_files",
           [](S3Handler* self, const std::string& file_url) {
@@ -34,6 +61,21 @@ PYBIND11_MODULE(_torchdata, m) {
             self->ListFiles(file_url, &filenames);
             return filenames;
           })
+      .def(
+          "list_files_page",
+          [](S3Handler* self,
+             const std::string& file_url,
+             const std::string& marker,
+             const std::string& delimiter) {
+            std::vector<std::string> filenames, prefixes;
+            std::string next_marker;
+            {
+              py::gil_scoped_release release;
+              next_marker = self->ListFilesPage(
+                  file_url, marker, delimiter, &filenames, &prefixes);
+            }
+            return py::make_tuple(filenames, prefixes, next_marker);
+          })
       .def(
           "set_buffer_size",
           [](S3Handler* self, const uint64_t buffer_size) {
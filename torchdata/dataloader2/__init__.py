@@ -14,6 +14,7 @@ from torchdata.dataloader2.reading_service import (
     PrototypeMultiProcessingReadingService,
     ReadingServiceInterface,
     SequentialReadingService,
+    ThreadPoolReadingService,
 )
 from torchdata.dataloader2.shuffle_spec import ShuffleSpec
 
@@ -28,6 +29,7 @@ __all__ = [
     "ReadingServiceInterface",
     "SequentialReadingService",
     "ShuffleSpec",
+    "ThreadPoolReadingService",
 ]
 
 assert __all__ == sorted(__all__)
@@ -4,4 +4,4 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
-from . import eventloop, iter, map, messages, protocol, queue
+from . import eventloop, iter, map, messages, protocol, queue, shared_memory
@@ -63,56 +63,68 @@ def MultipleDataPipesToQueuesLoop(source_datapipes, req_queues, res_queues, call
         time.sleep(0)
 
 
-def DataPipeToQueuesLoop(source_datapipe, req_queue, res_queue, call_on_process_init=None):
+def DataPipeToQueuesLoop(source_datapipe, req_queue, res_queue, call_on_process_init=None, shared_memory=None):
     r"""
     Initialize with the given init function, set the appropriate pipe and protocol server type, and
     create a loop with the protocol server.
     """
     if call_on_process_init is not None:
-        call_on_process_init(source_datapipe)
+        source_datapipe = call_on_process_init(source_datapipe)
 
-    torch.set_num_threads(1)
+    # The number of threads is process-wide, which shouldn't be changed by a thread of the main process
+    if threading.current_thread() is threading.main_thread():
+        torch.set_num_threads(1)
 
-    loop = _create_datapipe_queue_loop(source_datapipe, req_queue, res_queue, blocking_request_get=True)
+    loop = _create_datapipe_queue_loop(
+        source_datapipe, req_queue, res_queue, blocking_request_get=True, shared_memory=shared_memory
+    )
 
     for _ in loop:
         pass
 
+    if shared_memory is not None:
+        shared_memory.close()
 
-def _create_datapipe_queue_loop(source_datapipe, req_queue, res_queue, blocking_request_get=True):
+
+def _create_datapipe_queue_loop(source_datapipe, req_queue, res_queue, blocking_request_get=True, shared_memory=None):
     if isinstance(source_datapipe, IterDataPipe):
         pipe_type = communication.iter
-        protocol_type = communication.protocol.IterDataPipeQueueProtocolServer
+        protocol = communication.protocol.IterDataPipeQueueProtocolServer(
+            req_queue, res_queue, shared_memory=shared_memory
+        )
     elif isinstance(source_datapipe, MapDataPipe):
+        assert shared_memory is None, "Shared memory transport is not supported by MapDataPipe"
         pipe_type = communication.map  # type: ignore[misc]
-        protocol_type = communication.protocol.MapDataPipeQueueProtocolServer  # type: ignore[assignment]
+        protocol = communication.protocol.MapDataPipeQueueProtocolServer(req_queue, res_queue)  # type: ignore
     else:
         raise Exception("Only supports IterDataPipe or MapDataPipe, got", source_datapipe)
 
     return pipe_type.DataPipeBehindQueues(
         source_datapipe,
-        protocol_type(req_queue, res_queue),
+        protocol,
         blocking_request_get=blocking_request_get,
     )
 
 
-def CreateProcessForDataPipeline(multiprocessing_ctx, datapipe, call_on_process_init=None):
+def CreateProcessForDataPipeline(multiprocessing_ctx, datapipe, call_on_process_init=None, shared_memory=None):
     r"""
     Given a DataPipe, creates a new process with ``DataPipeToQueuesLoop`` as target,
     and returns ``(process, req_queue, res_queue)``.
+    If ``shared_memory`` is provided, the process writes the payloads of results into it.
     """
     req_queue = multiprocessing_ctx.Queue()
     res_queue = multiprocessing_ctx.Queue()
     process = multiprocessing_ctx.Process(
-        target=DataPipeToQueuesLoop, args=(datapipe, req_queue, res_queue, call_on_process_init)
+        target=DataPipeToQueuesLoop, args=(datapipe, req_queue, res_queue, call_on_process_init, shared_memory)
     )
     return process, req_queue, res_queue
 
 
-def CreateThreadForDataPipeline(datapipe):
+def CreateThreadForDataPipeline(datapipe, call_on_process_init=None):
     r"""
     Given a DataPipe, creates a copy of the DataPipe, starts a new Thread with ``DataPipeToQueuesLoop`` as target,
     and returns ``(process, req_queue, res_queue, new_copied_datapipe)``.
+    If ``call_on_process_init`` is provided, it's called with the copied DataPipe at the start of the thread.
     """
     req_queue = communication.queue.ThreadingQueue()
     res_queue = communication.queue.ThreadingQueue()
@@ -129,7 +141,9 @@ def CreateThreadForDataPipeline(datapipe):
         else:
             raise Exception("Unable to pickle DataPipe to make thread local copy (consider installing `dill`)", pe)
 
-    process = threading.Thread(target=DataPipeToQueuesLoop, args=(new_datapipe, req_queue, res_queue), daemon=True)
+    process = threading.Thread(
+        target=DataPipeToQueuesLoop, args=(new_datapipe, req_queue, res_queue, call_on_process_init), daemon=True
+    )
     return process, req_queue, res_queue, new_datapipe
 
 
@@ -8,7 +8,8 @@ import time
 import types
 
 from functools import partial
-from typing import Callable
+from multiprocessing.connection import wait
+from typing import Callable, Optional
 
 from torch.utils.data import IterDataPipe
 from torchdata.dataloader2 import communication
@@ -18,6 +19,8 @@ from torchdata.dataloader2.utils import WorkerInfo
 
 
 DEFAULT_NON_BLOCKING_SLEEP = 0.001
+# Maximum time to block on a response queue before checking the state of the iterator again
+DEFAULT_BLOCKING_WAIT = 0.1
 
 __all__ = [
     "DataPipeBehindQueues",
@@ -118,7 +121,7 @@ def DataPipeBehindQueues(source_datapipe, protocol, blocking_request_get=False):
     Indefinitely iterates over ``req_queue`` and passing values from source_datapipe to ``res_queue``.
 
     Request Types:
-        `ResetEpoch` - Call the `reset_epoch_fn` on the protocol's DataPipe
+        `ResetEpoch` - Call the `reset_epoch_fn` on the protocol's DataPipe and reset the iterator
         `ResetIterator` - Reset the iterator by calling `QueueWrapper`'s `reset_iterator` method
         `Terminate` - exits the infinite while loop
         `GetNext` - returns the value from the DataPipe, and handles exceptions such as `StopIteration` as appropriate
@@ -141,7 +144,10 @@ def DataPipeBehindQueues(source_datapipe, protocol, blocking_request_get=False):
             continue
 
         if isinstance(request, communication.messages.ResetEpochRequest):
-            source_datapipe = request.reset_fn(source_datapipe)
+            # `reset_fn` may return a new DataPipe
+            source_datapipe = EnsureNonBlockingDataPipe(request.reset_fn(source_datapipe))
+            # A new epoch always starts from a new iterator, which saves the round trip of `ResetIterator`
+            source_datapipe.reset_iterator()
             protocol.response_reset_epoch()
 
         elif isinstance(request, communication.messages.ResetIteratorRequest):
@@ -180,33 +186,53 @@ class QueueWrapper(NonBlocking):
     The input is a ProtocolClient that contains request queue and response queue.
     """
 
-    def __init__(self, protocol, response_wait_time=0.00001):
+    def __init__(self, protocol, response_wait_time=0.00001, blocking_wait_time=DEFAULT_BLOCKING_WAIT):
         if not isinstance(protocol, communication.protocol.IterDataPipeQueueProtocolClient):
             raise Exception("Got", protocol)
         self.protocol = protocol
         self.counter = 0
         self._stop_iteration = False
         self._response_wait_time = response_wait_time
+        self._blocking_wait_time = blocking_wait_time
+
+    def __next__(self):
+        # Block on the response queue rather than polling it with ``not_available_hook``
+        while True:
+            try:
+                return self.nonblocking_next(timeout=self._blocking_wait_time)
+            except NotAvailable:
+                continue
 
     def reset_iterator(self):
         self._stop_iteration = False
         self.counter = 0
+        # Drop responses of requests sent ahead in the previous iteration
+        self.protocol.discard_existing_request()
+        # The iterator has been reset along with the epoch
+        if self.protocol.iterator_reset:
+            return
         self.protocol.request_reset_iterator()
         while True:
             try:
-                self.protocol.get_response_reset_iterator()
+                self.protocol.get_response_reset_iterator(block=True, timeout=self._blocking_wait_time)
                 break
             except communication.protocol.EmptyQueue:
                 if NonBlocking.not_available_hook is not None:
                     NonBlocking.not_available_hook()
 
-    def nonblocking_next(self):
+    def nonblocking_next(self, timeout=None):
+        r"""
+        Return the next value if it arrives within ``timeout`` seconds (``response_wait_time`` by default),
+        otherwise raise ``NotAvailable``.
+        """
         if self._stop_iteration:
             raise Exception("`next` or `nonblocking_next` called after receiving StopIteration")
-        if self.protocol.can_take_request():
+        while self.protocol.can_take_request():
             self.protocol.request_next()
+        if timeout is None:
+            timeout = self._response_wait_time
         try:
-            response = self.protocol.get_response_next(block=True, timeout=self._response_wait_time)
+            response = self.protocol.get_response_next(block=True, timeout=timeout)
         except communication.protocol.EmptyQueue:
             raise NotAvailable
         if isinstance(response, communication.messages.StopIterationResponse):
@@ -221,29 +247,76 @@ class _IterateQueueDataPipes(IterDataPipe):
     r"""
     Takes in ``QueueWrapper``s and iterates through them in a round-robin manner to get batches one-by-one.
 
-    Typically, each worker has one ``QueueWrapper``.
+    Typically, each worker has one ``QueueWrapper``. As many ``GetNextRequest`` as allowed by
+    the protocol of each ``QueueWrapper`` are kept in flight to hide the latency of the round trip.
+
+    When ``in_order`` is ``False``, values are yielded from whichever ``QueueWrapper`` receives a response
+    first rather than in the round-robin order, so a slow worker doesn't stall the others. This requires
+    the response queues to be ``multiprocessing.Queue``, otherwise the round-robin order is used.
+
+    The time spent waiting for responses from ``QueueWrapper``s is recorded for each epoch, and
+    ``wait_ratio`` reports the fraction of the latest completed epoch during which the consumer
+    was blocked on the workers.
     """
 
-    def __init__(self, datapipes):
+    def __init__(self, datapipes, in_order=True):
         # TODO(VitalyFedyunin): Consider combining _IterateQueueDataPipes and QueueWrapper
         # into one class, which supports any number of queues.
         self.datapipes = datapipes
         for dp in self.datapipes:
             if not isinstance(dp, QueueWrapper):
                 raise Exception("Source datapipes should be an instance of iter.QueueWrapper")
+        self.in_order = in_order
+        self._wait_time = 0.0
+        self._start_time: Optional[float] = None
+        self._end_time: Optional[float] = None
+
+    def wait_ratio(self) -> Optional[float]:
+        r"""
+        Return the fraction of the latest epoch spent waiting for responses from workers,
+        or ``None`` if the epoch hasn't been exhausted.
+        """
+        if self._start_time is None or self._end_time is None:
+            return None
+        total_time = self._end_time - self._start_time
+        if total_time <= 0:
+            return None
+        return min(self._wait_time / total_time, 1.0)
+
+    def _ready_pipes(self, disabled_pipe):
+        enabled_pipes = [idx for idx in range(len(self.datapipes)) if not disabled_pipe[idx]]
+        if self.in_order:
+            return enabled_pipes
+        readers = {}
+        for idx in enabled_pipes:
+            reader = getattr(self.datapipes[idx].protocol.response_queue, "_reader", None)
+            if reader is None:
+                return enabled_pipes
+            readers[reader] = idx
+        # Block until any worker has sent a response
+        start_time = time.perf_counter()
+        ready_readers = wait(list(readers.keys()))
+        self._wait_time += time.perf_counter() - start_time
+        return sorted(readers[reader] for reader in ready_readers)
 
     def __iter__(self):
         total_pipes = len(self.datapipes)
         disabled_pipe = [False] * len(self.datapipes)
         cnt_disabled_pipes = 0
+        self._wait_time = 0.0
+        self._start_time = time.perf_counter()
+        self._end_time = None
 
         for idx in range(total_pipes):
-            self.datapipes[idx].protocol.request_next()
+            while self.datapipes[idx].protocol.can_take_request():
+                self.datapipes[idx].protocol.request_next()
 
         while cnt_disabled_pipes < total_pipes:
-            for idx in range(total_pipes):
+            for idx in self._ready_pipes(disabled_pipe):
                 if not disabled_pipe[idx]:
+                    start_time = time.perf_counter()
                     response = self.datapipes[idx].protocol.get_response_next(block=True)
+                    self._wait_time += time.perf_counter() - start_time
                     if isinstance(response, communication.messages.StopIterationResponse):
                         disabled_pipe[idx] = True
                         cnt_disabled_pipes += 1
@@ -254,6 +327,7 @@ class _IterateQueueDataPipes(IterDataPipe):
                         raise communication.iter.TerminateRequired
                     self.datapipes[idx].protocol.request_next()
                     yield response.value
+        self._end_time = time.perf_counter()
 
     def reset(self):
         # NonBlocking DataPipes do not reset automatically, have to do it manually
@@ -263,6 +337,9 @@ class _IterateQueueDataPipes(IterDataPipe):
     def reset_epoch(
         self, reset_fn: Callable[[WorkerInfo, SeedGenerator, DataPipe], DataPipe], seed_generator: SeedGenerator
     ):
+        # Measurement of the latest epoch is no longer valid
+        self._start_time = None
+        self._end_time = None
         for dp in self.datapipes:
             dp.protocol.discard_existing_request()
         num_workers = len(self.datapipes)
@@ -275,8 +352,16 @@ class _IterateQueueDataPipes(IterDataPipe):
         for dp in self.datapipes:
             while True:
                 try:
-                    dp.protocol.get_response_reset_epoch()
+                    dp.protocol.get_response_reset_epoch(block=True, timeout=DEFAULT_BLOCKING_WAIT)
                     break
                 except communication.protocol.EmptyQueue:
                     if NonBlocking.not_available_hook is not None:
                         NonBlocking.not_available_hook()
+
+
+class _IterateWorkerThreadDataPipes(_IterateQueueDataPipes):
+    r"""
+    Takes in ``QueueWrapper``s of the threads within a worker process, each of which runs a copy
+    of the ``DataPipe`` graph of the worker process. It's distinguished from the consumer of
+    the dispatching process, since the reset of each epoch has to be sent to all threads.
+    """
@@ -4,6 +4,7 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+from collections import deque
 from queue import Empty as EmptyException
 
 from torchdata.dataloader2 import communication
@@ -20,33 +21,39 @@ class Protocol:
 class ProtocolClient(Protocol):
     """
     ProtocolClient takes charge of putting requests into req_queue and returning results from res_queue.
+
+    Up to ``max_requests`` requests can be in the queue while waiting for responses. Responses are
+    expected in the same order as requests have been sent.
     """
 
     _req_sent = None
 
-    def __init__(self, request_queue, response_queue):
+    def __init__(self, request_queue, response_queue, max_requests=1):
+        if max_requests < 1:
+            raise ValueError(f"Expected a positive max_requests, but got {max_requests}")
         self.request_queue = request_queue
         self.response_queue = response_queue
-        self._req_sent = None
+        self.max_requests = max_requests
+        self._req_sent = deque()
 
     def can_take_request(self):
-        return self._req_sent is None
+        return len(self._req_sent) < self.max_requests
 
     def waiting_for_response(self):
-        return self._req_sent is not None
+        return len(self._req_sent) > 0
 
     def request_sent(self, request=True):
         if not self.can_take_request():
-            raise Exception("Protocol only supports one request in the Queue")
-        self._req_sent = request
+            raise Exception(f"Protocol only supports {self.max_requests} request(s) in the Queue")
+        self._req_sent.append(request)
 
     def request_served(self, result=None):
         if not self.waiting_for_response():
             raise Exception("Expected no peding requests, but something got served", result)
-        self._req_sent = None
+        self._req_sent.popleft()
 
     def discard_existing_request(self):
-        if self.waiting_for_response():
+        while self.waiting_for_response():
             response = self.response_queue.get(block=True)
             self.request_served(response)
 
@@ -141,7 +148,7 @@ class MapDataPipeQueueProtocolClient(ProtocolClient):
             raise Exception("Can not expect any response without submitted request")
         try:
             response = self.response_queue.get(block=block, timeout=timeout)
-        except TimeoutError:
+        except (EmptyException, TimeoutError):
             raise EmptyQueue("queue is empty")
         self.request_served(response)
         if not isinstance(response, communication.messages.LenResponse):
@@ -153,7 +160,7 @@ class MapDataPipeQueueProtocolClient(ProtocolClient):
             raise Exception("Can not expect any response without submitted request")
         try:
             response = self.response_queue.get(block=block, timeout=timeout)
-        except TimeoutError:
+        except (EmptyException, TimeoutError):
             raise EmptyQueue("queue is empty")
         self.request_served(response)
         # if not isinstance(response, communication.messages.GetItemResponse):
@@ -166,6 +173,15 @@ class EmptyQueue(Exception):
 
 
 class IterDataPipeQueueProtocolServer(ProtocolServer):
+    r"""
+    If ``shared_memory`` is provided, tensors and bytes within the responded values are
+    written into the ``SharedMemoryRing`` and only their handles are put into ``response_queue``.
+    """
+
+    def __init__(self, request_queue, response_queue, shared_memory=None):
+        super().__init__(request_queue, response_queue)
+        self.shared_memory = shared_memory
+
     def response_reset_iterator(self):
         if not self.have_pending_request():
             raise Exception("Attempting to reply with pending request")
@@ -177,6 +193,8 @@ class IterDataPipeQueueProtocolServer(ProtocolServer):
     def response_next(self, value):
         if not self.have_pending_request():
             raise Exception("Attempting to reply with pending request")
+        if self.shared_memory is not None:
+            value = self.shared_memory.encode(value)
         self.response_queue.put(communication.messages.GetNextResponse(value))
         self._req_received = None
 
@@ -194,15 +212,34 @@ class IterDataPipeQueueProtocolServer(ProtocolServer):
 
 
 class IterDataPipeQueueProtocolClient(ProtocolClient):
+    r"""
+    If ``shared_memory`` is provided, handles within the received values are replaced by
+    the payloads read from the ``SharedMemoryRing`` shared with ``IterDataPipeQueueProtocolServer``.
+    """
+
+    def __init__(self, request_queue, response_queue, shared_memory=None, max_requests=1):
+        super().__init__(request_queue, response_queue, max_requests=max_requests)
+        self.shared_memory = shared_memory
+        # Whether the iterator of the server has been reset and no data has been requested since
+        self.iterator_reset = False
+
+    def discard_existing_request(self):
+        while self.waiting_for_response():
+            response = self.response_queue.get(block=True)
+            self.request_served(response)
+            # Release the space of shared memory taken by the discarded response
+            if self.shared_memory is not None and isinstance(response, communication.messages.GetNextResponse):
+                self.shared_memory.decode(response.value)
+
     def request_reset_iterator(self):
-        if not self.can_take_request():
+        if self.waiting_for_response():
             raise Exception("Can not reset while we are still waiting response for previous request")
         request = communication.messages.ResetIteratorRequest()
         self.request_queue.put(request)
         self.request_sent(request)
 
     def request_reset_epoch(self, reset_fn):
-        if not self.can_take_request():
+        if self.waiting_for_response():
             raise Exception("Can not reset while we are still waiting response for previous request")
         request = communication.messages.ResetEpochRequest(reset_fn)
         self.request_queue.put(request)
@@ -210,30 +247,33 @@ class IterDataPipeQueueProtocolClient(ProtocolClient):
 
     def request_next(self):
         if not self.can_take_request():
-            raise Exception("Can not request next item while we are still waiting response for previous request")
+            raise Exception("Can not request next item while the maximum number of requests are waiting responses")
         request = communication.messages.GetNextRequest()
         self.request_queue.put(request)
         self.request_sent(request)
+        self.iterator_reset = False
 
-    def get_response_reset_iterator(self, block=False):
+    def get_response_reset_iterator(self, block=False, timeout=None):
         try:
-            response = self.response_queue.get(block=block)
+            response = self.response_queue.get(block=block, timeout=timeout)
         except EmptyException:
             raise EmptyQueue("queue is empty")
         self.request_served(response)
 
         if not isinstance(response, communication.messages.ResetIteratorResponse):
             raise Exception("Invalid response received")
+        self.iterator_reset = True
 
-    def get_response_reset_epoch(self, block=False):
+    def get_response_reset_epoch(self, block=False, timeout=None):
         try:
-            response = self.response_queue.get(block=block)
+            response = self.response_queue.get(block=block, timeout=timeout)
         except EmptyException:
             raise EmptyQueue("queue is empty")
         self.request_served(response)
 
         if not isinstance(response, communication.messages.ResetEpochResponse):
             raise Exception("Invalid response received")
+        self.iterator_reset = True
 
     def get_response_next(self, block=False, timeout=None):
         if not self.waiting_for_response():
@@ -244,5 +284,8 @@ class IterDataPipeQueueProtocolClient(ProtocolClient):
             raise EmptyQueue("queue is empty")
         self.request_served(response)
 
+        if self.shared_memory is not None and isinstance(response, communication.messages.GetNextResponse):
+            response.value = self.shared_memory.decode(response.value)
+
         # TODO(629): Add possible response types validation here
         return response
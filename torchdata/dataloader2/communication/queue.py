@@ -5,7 +5,9 @@
 # LICENSE file in the root directory of this source tree.
 
 import threading
-import time
+
+from collections import deque
+from queue import Empty
 
 
 class LocalQueue:
@@ -38,20 +40,21 @@ class LocalQueue:
 class ThreadingQueue:
     def __init__(self, name="unnamed"):
         self.lock = threading.Lock()
-        self.items = []
+        # Consumers wait to be notified by ``put`` rather than polling ``items``
+        self.not_empty = threading.Condition(self.lock)
+        self.items = deque()
         self.name = name
 
     def put(self, item, block=True):
-        with self.lock:
+        with self.not_empty:
             self.items.append(item)
-
-    def get(self, block=True, timeout=0):
-        # TODO(623): Add support of block and timeout arguments
-        while True:
-            with self.lock:
-                if len(self.items) > 0:
-                    return self.items.pop()
-            if not block:
-                raise Exception("Not available")
-            # TODO(624): Figure out what to do if nothing in the queue
-            time.sleep(0.000001)
+            self.not_empty.notify()
+
+    def get(self, block=True, timeout=None):
+        with self.not_empty:
+            if block:
+                if not self.not_empty.wait_for(lambda: len(self.items) > 0, timeout):
+                    raise Empty("ThreadingQueue is empty")
+            elif len(self.items) == 0:
+                raise Empty("ThreadingQueue is empty")
+            return self.items.popleft()
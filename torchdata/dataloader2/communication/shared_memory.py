@@ -0,0 +1,195 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import struct
+
+from multiprocessing import shared_memory
+from typing import Any, Optional, Tuple
+
+import torch
+
+__all__ = [
+    "SharedMemoryHandle",
+    "SharedMemoryRing",
+]
+
+# The first bytes of the segment store the logical position up to which the consumer has read
+_HEADER_SIZE = 64
+_TAIL_FORMAT = "Q"
+# Payloads are aligned to cache lines so that tensors can be viewed without unaligned access
+_ALIGNMENT = 64
+# Payloads smaller than this are cheaper to pickle through the queue than to copy into shared memory
+MIN_SHARED_MEMORY_PAYLOAD = 1024
+
+
+def _align(pos: int) -> int:
+    return (pos + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class SharedMemoryHandle:
+    r"""
+    Small placeholder sent through the queue in place of a tensor or bytes payload,
+    which has been written into a ``SharedMemoryRing``.
+    """
+    __slots__ = ("offset", "nbytes", "end", "dtype", "shape", "kind")
+
+    def __init__(self, offset: int, nbytes: int, end: int, kind: type, dtype=None, shape: Tuple[int, ...] = ()):
+        self.offset = offset
+        self.nbytes = nbytes
+        self.end = end
+        self.kind = kind
+        self.dtype = dtype
+        self.shape = shape
+
+
+class SharedMemoryRing:
+    r"""
+    Single-producer/single-consumer ring buffer in shared memory used to transport
+    tensors and bytes from a worker process to the main process without pickling
+    the payloads through the ``multiprocessing.Queue``.
+
+    The worker process calls ``encode`` on each response value, which copies payloads
+    into the ring and replaces them by ``SharedMemoryHandle``. The main process calls
+    ``decode`` on the received value to copy payloads out of the ring and to release
+    the space to the worker. Responses must be decoded in the order they were encoded.
+    When the ring doesn't have enough free space, payloads are kept in the value and
+    go through the queue as usual, so the worker never blocks on the consumer.
+
+    Args:
+        size: Capacity of the ring in bytes
+        min_payload_size: Payloads smaller than this number of bytes are not moved into shared memory
+    """
+
+    def __init__(self, size: int, min_payload_size: int = MIN_SHARED_MEMORY_PAYLOAD) -> None:
+        if size <= 0:
+            raise ValueError(f"Expected a positive size of shared memory, but got {size}.")
+        self.size = _align(size)
+        self.min_payload_size = min_payload_size
+        self._shm: Optional[shared_memory.SharedMemory] = shared_memory.SharedMemory(
+            create=True, size=_HEADER_SIZE + self.size
+        )
+        # Only the creating process destroys the segment, which also covers the forked workers
+        self._owner_pid: Optional[int] = os.getpid()
+        self._head = 0
+        struct.pack_into(_TAIL_FORMAT, self._shm.buf, 0, 0)
+
+    def __getstate__(self):
+        assert self._shm is not None
+        return {"name": self._shm.name, "size": self.size, "min_payload_size": self.min_payload_size}
+
+    def __setstate__(self, state):
+        self.size = state["size"]
+        self.min_payload_size = state["min_payload_size"]
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._owner_pid = None
+        self._head = 0
+
+    @property
+    def name(self) -> str:
+        assert self._shm is not None
+        return self._shm.name
+
+    def _tail(self) -> int:
+        return struct.unpack_from(_TAIL_FORMAT, self._shm.buf, 0)[0]  # type: ignore[union-attr]
+
+    def _reserve(self, nbytes: int) -> Optional[int]:
+        start = _align(self._head)
+        # Payloads are never split across the end of the ring
+        if start % self.size + nbytes > self.size:
+            start = (start // self.size + 1) * self.size
+        if start + nbytes - self._tail() > self.size:
+            return None
+        self._head = start + nbytes
+        return start
+
+    def _buffer(self, pos: int, nbytes: int) -> torch.Tensor:
+        offset = _HEADER_SIZE + pos % self.size
+        return torch.frombuffer(self._shm.buf, dtype=torch.uint8, count=nbytes, offset=offset)  # type: ignore
+
+    def _is_sharable_tensor(self, value: Any) -> bool:
+        return (
+            type(value) is torch.Tensor
+            and value.device.type == "cpu"
+            and value.layout == torch.strided
+            and not value.is_quantized
+            and not value.requires_grad
+            and value.element_size() * value.numel() >= self.min_payload_size
+        )
+
+    def encode(self, value: Any) -> Any:
+        r"""
+        Copy tensors and bytes within ``value`` into the ring and replace them by handles.
+        ``list``, ``tuple`` (including ``NamedTuple``) and ``dict`` are traversed recursively.
+        """
+        if self._is_sharable_tensor(value):
+            src = value.contiguous().reshape(-1).view(torch.uint8)
+            nbytes = src.numel()
+            start = self._reserve(nbytes)
+            if start is None:
+                return value
+            self._buffer(start, nbytes).copy_(src)
+            return SharedMemoryHandle(start, nbytes, self._head, torch.Tensor, value.dtype, tuple(value.shape))
+        if isinstance(value, (bytes, bytearray)) and len(value) >= self.min_payload_size:
+            nbytes = len(value)
+            start = self._reserve(nbytes)
+            if start is None:
+                return value
+            offset = _HEADER_SIZE + start % self.size
+            self._shm.buf[offset : offset + nbytes] = value  # type: ignore[union-attr]
+            return SharedMemoryHandle(start, nbytes, self._head, type(value))
+        if type(value) is dict:
+            return {k: self.encode(v) for k, v in value.items()}
+        if type(value) is list:
+            return [self.encode(v) for v in value]
+        if isinstance(value, tuple):
+            items = [self.encode(v) for v in value]
+            # NamedTuple
+            if hasattr(value, "_fields"):
+                return type(value)(*items)
+            return type(value)(items)
+        return value
+
+    def decode(self, value: Any) -> Any:
+        r"""
+        Replace handles within ``value`` by the payloads copied out of the ring
+        and release the space back to the producer.
+        """
+        end = [0]
+        res = self._decode(value, end)
+        if end[0] > 0:
+            struct.pack_into(_TAIL_FORMAT, self._shm.buf, 0, end[0])  # type: ignore[union-attr]
+        return res
+
+    def _decode(self, value: Any, end):
+        if isinstance(value, SharedMemoryHandle):
+            end[0] = max(end[0], value.end)
+            if value.kind is torch.Tensor:
+                data = self._buffer(value.offset, value.nbytes).clone()
+                return data.view(value.dtype).reshape(value.shape)
+            offset = _HEADER_SIZE + value.offset % self.size
+            return value.kind(self._shm.buf[offset : offset + value.nbytes])  # type: ignore[union-attr]
+        if type(value) is dict:
+            return {k: self._decode(v, end) for k, v in value.items()}
+        if type(value) is list:
+            return [self._decode(v, end) for v in value]
+        if isinstance(value, tuple):
+            items = [self._decode(v, end) for v in value]
+            if hasattr(value, "_fields"):
+                return type(value)(*items)
+            return type(value)(items)
+        return value
+
+    def close(self) -> None:
+        r"""
+        Close the shared memory segment, and destroy it if this process created it.
+        """
+        if self._shm is None:
+            return
+        self._shm.close()
+        if self._owner_pid == os.getpid():
+            self._shm.unlink()
+        self._shm = None
@@ -6,6 +6,8 @@
 
 import multiprocessing as py_mp
 import queue
+import threading
+import time
 
 from abc import ABC, abstractmethod
 from datetime import timedelta
@@ -29,6 +31,11 @@ from torchdata.dataloader2.utils import process_init_fn, process_reset_fn, Worke
 from torchdata.dataloader2.utils.dispatch import _DummyIterDataPipe, find_lca_round_robin_sharding_dp
 from torchdata.datapipes.iter import FullSync, IterableWrapper
 
+# Fractions of an epoch spent by the main process waiting for worker processes,
+# above which a worker process is added and below which a worker process is removed
+_AUTOSCALE_UP_WAIT_RATIO = 0.2
+_AUTOSCALE_DOWN_WAIT_RATIO = 0.05
+
 
 class ReadingServiceInterface(ABC):
     r"""
@@ -129,6 +136,17 @@ def _collate_no_op(batch):
     return batch[0]
 
 
+def _clean_worker_process(process, req_queue, res_queue) -> None:
+    # TODO(619): Can send terminations simultaneously
+    # TODO(620): Make termination a function of QueueWrapperDataPipe (similar to reset)
+    req_queue.put(communication.messages.TerminateRequest())
+    try:
+        _ = res_queue.get(timeout=default_dl2_worker_join_timeout_in_s)
+    except queue.Empty:
+        pass
+    process.join(default_dl2_worker_join_timeout_in_s)
+
+
 class PrototypeMultiProcessingReadingService(ReadingServiceInterface):
     r"""
     Spawns multiple worker processes to load data from the ``DataPipe`` graph.
@@ -153,8 +171,43 @@ class PrototypeMultiProcessingReadingService(ReadingServiceInterface):
         worker_reset_fn: (Callable, optional): Function to be called at the beginning
             of each epoch in each worker process with ``DataPipe``, ``WorkerInfo``
             and ``SeedGenerator`` as the expected arguments.
+        shared_memory_size: (int, 0 by default): Size in bytes of the shared-memory ring
+            allocated per worker process. When it's greater than 0, tensors and bytes within
+            the results of worker processes are written into the ring and only small handles
+            are pickled through the queue. Payloads that don't fit into the free space of the ring
+            fall back to the queue.
+        worker_inflight_cnt: (int, 1 by default): Number of requests of data that can be sent
+            to each worker process ahead of receiving the responses. Values greater than 1 overlap
+            the round trip between the main process and worker processes with data loading, which
+            amortizes the overhead of the queues when the samples are small.
+        in_order: (bool, True by default): Whether to return data from worker processes in
+            the round-robin order. When ``False``, data is returned as soon as any worker process
+            delivers it, which prevents a slow sample from stalling the whole pipeline at the
+            cost of the deterministic order of data.
+        min_num_workers: (int, optional): Lower bound of the number of worker processes when
+            the worker pool is autoscaled. Defaults to ``num_workers``.
+        max_num_workers: (int, optional): Upper bound of the number of worker processes when
+            the worker pool is autoscaled. Defaults to ``num_workers``.
+        threads_per_worker: (int, 1 by default): Number of threads running copies of the ``DataPipe``
+            graph within each worker process. Each thread is sharded as an individual worker, so that
+            a thread blocked on I/O (e.g. a remote read) doesn't stall the others in the same process.
 
     Note:
+        - Worker processes are persistent across epochs. At the beginning of each epoch, only
+          random seeds, ``worker_reset_fn`` and iterators are reset in worker processes, so any
+          state held by the ``DataPipe`` graph (e.g. open file handles or loaded indices) is retained.
+          The ``DataPipe`` returned by ``worker_reset_fn`` is kept for the next epochs, so it should reset
+          the state of the given graph rather than append new ``DataPipes`` to it.
+          The time spent to reset worker processes for the latest epoch is recorded
+          as ``epoch_start_latency`` in seconds.
+        - When ``min_num_workers`` or ``max_num_workers`` differs from ``num_workers``, the worker pool
+          is autoscaled between epochs. After each exhausted epoch, a worker process is added if the
+          main process has spent a large fraction of the epoch waiting for data, or removed if it has
+          barely waited, and the ``DataPipe`` graph is resharded across the new number of worker processes.
+          The order of data depends on the number of worker processes, which is available as ``num_workers``.
+          Autoscaling is not supported with non-replicable ``DataPipes`` or ``threads_per_worker``.
+        - Worker threads share the global random states of the worker process. Non-replicable ``DataPipes``
+          are not supported when ``threads_per_worker`` is greater than 1.
         - This ``ReadingService`` is still in prototype mode and will replace
           :class:`MultiProcessingReadingService`.
         - It currently does both distributed and multiprocessing sharding over the pipeline.
@@ -168,10 +221,20 @@ class PrototypeMultiProcessingReadingService(ReadingServiceInterface):
     main_prefetch_cnt: int
     worker_init_fn: Optional[Callable[[DataPipe, WorkerInfo], DataPipe]]
     worker_reset_fn: Optional[Callable[[DataPipe, WorkerInfo, SeedGenerator], DataPipe]]
+    shared_memory_size: int
+    worker_inflight_cnt: int
+    in_order: bool
+    min_num_workers: int
+    max_num_workers: int
+    threads_per_worker: int
+    epoch_start_latency: Optional[float]
     _worker_processes: List[Tuple[py_mp.process.BaseProcess, Queue, Queue]]
     _dispatch_process: Optional[Tuple[py_mp.process.BaseProcess, List[Queue], List[Queue]]]
     _worker_datapipes: List[DataPipe]
     _worker_consumer_datapipe: Optional[DataPipe]
+    _worker_replicable_datapipe: Optional[DataPipe]
+    _mp_context: Optional[py_mp.context.BaseContext]
+    _worker_shared_memories: List[communication.shared_memory.SharedMemoryRing]
     _main_prefetch_datapipe: Optional[DataPipe]
     _end_datapipe: Optional[DataPipe]
     _mp: bool
@@ -184,6 +247,12 @@ class PrototypeMultiProcessingReadingService(ReadingServiceInterface):
         main_prefetch_cnt: int = 10,
         worker_init_fn: Optional[Callable[[DataPipe, WorkerInfo], DataPipe]] = None,
         worker_reset_fn: Optional[Callable[[DataPipe, WorkerInfo, SeedGenerator], DataPipe]] = None,
+        shared_memory_size: int = 0,
+        worker_inflight_cnt: int = 1,
+        in_order: bool = True,
+        min_num_workers: Optional[int] = None,
+        max_num_workers: Optional[int] = None,
+        threads_per_worker: int = 1,
     ) -> None:
         self.num_workers = num_workers
         if multiprocessing_context is not None:
@@ -196,10 +265,35 @@ class PrototypeMultiProcessingReadingService(ReadingServiceInterface):
         self.main_prefetch_cnt = main_prefetch_cnt
         self.worker_init_fn = worker_init_fn
         self.worker_reset_fn = worker_reset_fn
+        if shared_memory_size < 0:
+            raise ValueError(f"Expected a non-negative shared_memory_size, but got {shared_memory_size}.")
+        self.shared_memory_size = shared_memory_size
+        if worker_inflight_cnt < 1:
+            raise ValueError(f"Expected a positive worker_inflight_cnt, but got {worker_inflight_cnt}.")
+        self.worker_inflight_cnt = worker_inflight_cnt
+        self.in_order = in_order
+        self.min_num_workers = num_workers if min_num_workers is None else min_num_workers
+        self.max_num_workers = num_workers if max_num_workers is None else max_num_workers
+        if not (self.min_num_workers <= num_workers <= self.max_num_workers):
+            raise ValueError(
+                f"Expected min_num_workers <= num_workers <= max_num_workers, but got "
+                f"{self.min_num_workers}, {num_workers} and {self.max_num_workers}."
+            )
+        if self.min_num_workers < 1 and self.min_num_workers != self.max_num_workers:
+            raise ValueError(f"Expected a positive min_num_workers for autoscaling, but got {self.min_num_workers}.")
+        if threads_per_worker < 1:
+            raise ValueError(f"Expected a positive threads_per_worker, but got {threads_per_worker}.")
+        if threads_per_worker > 1 and self._autoscale:
+            raise ValueError("Autoscaling the worker pool is not supported with threads_per_worker")
+        self.threads_per_worker = threads_per_worker
+        self.epoch_start_latency = None
         self._worker_processes = []
         self._dispatch_process = None
         self._worker_datapipes = []
         self._worker_consumer_datapipe = None
+        self._worker_replicable_datapipe = None
+        self._mp_context = None
+        self._worker_shared_memories = []
         self._main_prefetch_datapipe = None
         self._end_datapipe = None
         self._mp = num_workers > 0
@@ -220,11 +314,22 @@ class PrototypeMultiProcessingReadingService(ReadingServiceInterface):
         graph = traverse_dps(datapipe)
 
         ctx = mp.get_context(self.multiprocessing_context)
+        self._mp_context = ctx
 
         # Launch dispatching process for the lowest common ancestor of non-replicable DataPipes
         graph = traverse_dps(datapipe)
         dispatching_dp = find_lca_round_robin_sharding_dp(graph)
         if dispatching_dp is not None:
+            if self._autoscale:
+                raise RuntimeError(
+                    "PrototypeMultiProcessingReadingService doesn't support autoscaling the worker pool "
+                    "with non-replicable DataPipes"
+                )
+            if self.threads_per_worker > 1:
+                raise RuntimeError(
+                    "PrototypeMultiProcessingReadingService doesn't support threads_per_worker "
+                    "with non-replicable DataPipes"
+                )
             dummy_dp = _DummyIterDataPipe()
             graph = replace_dp(graph, dispatching_dp, dummy_dp)  # type: ignore[arg-type]
             datapipe = list(graph.values())[0][0]
@@ -254,33 +359,14 @@ class PrototypeMultiProcessingReadingService(ReadingServiceInterface):
 
         if self.worker_prefetch_cnt > 0:
             replicable_dp = replicable_dp.prefetch(self.worker_prefetch_cnt)
+        self._worker_replicable_datapipe = replicable_dp
 
         for worker_id in range(self.num_workers):
-            worker_info = WorkerInfo(self.num_workers, worker_id)
-            # Dispatching process for non-replicable DataPipes exists
-            dispatching_req_queue = self._dispatch_process[1][worker_id] if self._dispatch_process is not None else None
-            dispatching_res_queue = self._dispatch_process[2][worker_id] if self._dispatch_process is not None else None
-            call_on_process_init = partial(
-                process_init_fn,
-                worker_info=worker_info,
-                custom_init_fn=self.worker_init_fn,
-                dispatching_req_queue=dispatching_req_queue,
-                dispatching_res_queue=dispatching_res_queue,
-            )
-            (process, req_queue, res_queue) = communication.eventloop.CreateProcessForDataPipeline(
-                ctx,
-                replicable_dp,
-                call_on_process_init,
-            )
-            process.daemon = True
-            process.start()
-            self._worker_processes.append((process, req_queue, res_queue))  # These queues are independent
-            local_datapipe = communication.iter.QueueWrapper(
-                communication.protocol.IterDataPipeQueueProtocolClient(req_queue, res_queue)
-            )
-            self._worker_datapipes.append(local_datapipe)
+            self._create_worker(worker_id)
 
-        end_datapipe = communication.iter._IterateQueueDataPipes(self._worker_datapipes)  # type: ignore[assignment]
+        end_datapipe = communication.iter._IterateQueueDataPipes(  # type: ignore[assignment]
+            self._worker_datapipes, in_order=self.in_order
+        )
         self._worker_consumer_datapipe = end_datapipe
 
         if self.main_prefetch_cnt > 0:
@@ -297,20 +383,103 @@ class PrototypeMultiProcessingReadingService(ReadingServiceInterface):
 
         return self._end_datapipe  # type: ignore[return-value]
 
+    @property
+    def _autoscale(self) -> bool:
+        return self.min_num_workers != self.max_num_workers
+
+    def _create_worker(self, worker_id: int) -> None:
+        worker_info = WorkerInfo(self.num_workers, worker_id)
+        # Dispatching process for non-replicable DataPipes exists
+        dispatching_req_queue = self._dispatch_process[1][worker_id] if self._dispatch_process is not None else None
+        dispatching_res_queue = self._dispatch_process[2][worker_id] if self._dispatch_process is not None else None
+        call_on_process_init = partial(
+            process_init_fn,
+            worker_info=worker_info,
+            custom_init_fn=self.worker_init_fn,
+            dispatching_req_queue=dispatching_req_queue,
+            dispatching_res_queue=dispatching_res_queue,
+            threads_per_worker=self.threads_per_worker,
+        )
+        shared_memory = None
+        if self.shared_memory_size > 0:
+            shared_memory = communication.shared_memory.SharedMemoryRing(self.shared_memory_size)
+            self._worker_shared_memories.append(shared_memory)
+        (process, req_queue, res_queue) = communication.eventloop.CreateProcessForDataPipeline(
+            self._mp_context,
+            self._worker_replicable_datapipe,
+            call_on_process_init,
+            shared_memory,
+        )
+        process.daemon = True
+        process.start()
+        self._worker_processes.append((process, req_queue, res_queue))  # These queues are independent
+        local_datapipe = communication.iter.QueueWrapper(
+            communication.protocol.IterDataPipeQueueProtocolClient(
+                req_queue, res_queue, shared_memory=shared_memory, max_requests=self.worker_inflight_cnt
+            )
+        )
+        # `_worker_consumer_datapipe` shares this list and picks up the new worker in the next epoch
+        self._worker_datapipes.append(local_datapipe)
+
+    def _remove_worker(self) -> None:
+        process, req_queue, res_queue = self._worker_processes.pop()
+        self._worker_datapipes.pop()
+        _clean_worker_process(process, req_queue, res_queue)
+        if self.shared_memory_size > 0:
+            self._worker_shared_memories.pop().close()
+
+    def _autoscaled_num_workers(self, wait_ratio: Optional[float]) -> int:
+        r"""
+        Return the number of worker processes for the next epoch, given the fraction of the latest epoch
+        spent by the main process waiting for data, or ``None`` if it's unknown.
+        """
+        if wait_ratio is None:
+            return self.num_workers
+        if wait_ratio > _AUTOSCALE_UP_WAIT_RATIO and self.num_workers < self.max_num_workers:
+            return self.num_workers + 1
+        if wait_ratio < _AUTOSCALE_DOWN_WAIT_RATIO and self.num_workers > self.min_num_workers:
+            return self.num_workers - 1
+        return self.num_workers
+
+    def _autoscale_workers(self) -> bool:
+        r"""
+        Resize the worker pool based on the time spent by the main process waiting
+        for data in the latest epoch. Return whether the pool has been resized.
+        """
+        assert self._worker_consumer_datapipe is not None
+        num_workers = self._autoscaled_num_workers(self._worker_consumer_datapipe.wait_ratio())
+        if num_workers == self.num_workers:
+            return False
+
+        # Drain requests in flight before any worker process is added or removed
+        for dp in self._worker_datapipes:
+            dp.protocol.discard_existing_request()
+        while self.num_workers > num_workers:
+            self._remove_worker()
+            self.num_workers -= 1
+        while self.num_workers < num_workers:
+            self.num_workers += 1
+            self._create_worker(self.num_workers - 1)
+        return True
+
     def initialize_iteration(
         self, seed_generator: SeedGenerator, iter_reset_fn: Optional[Callable[[DataPipe], DataPipe]] = None
     ) -> Optional[Callable[[DataPipe], DataPipe]]:
         assert self._end_datapipe is not None
 
+        start_time = time.perf_counter()
+
         set_graph_random_seed(self._end_datapipe, seed_generator)
 
         if self._mp:
             if self.main_prefetch_cnt > 0:
                 # Stop prefetching first
                 self._main_prefetch_datapipe.reset()  # type: ignore[union-attr]
+            # Reshard all worker processes when the pool has been resized
+            reshard = self._autoscale and self._autoscale_workers()
             # Send the shared seed to subprocesses
             call_on_epoch_reset = partial(
-                process_reset_fn, iter_reset_fn=iter_reset_fn, custom_reset_fn=self.worker_reset_fn
+                process_reset_fn, iter_reset_fn=iter_reset_fn, custom_reset_fn=self.worker_reset_fn, reshard=reshard
             )
             assert self._worker_consumer_datapipe is not None
             self._worker_consumer_datapipe.reset_epoch(call_on_epoch_reset, seed_generator)
@@ -321,6 +490,8 @@ class PrototypeMultiProcessingReadingService(ReadingServiceInterface):
             # (random, torch and numpy), if users have already seeded them in the main process
             # TODO(ejguan): This should be fixed by adding a method to isolate global RNGs
             pass
+
+        self.epoch_start_latency = time.perf_counter() - start_time
         return None
 
     def __del__(self):
@@ -331,20 +502,10 @@ class PrototypeMultiProcessingReadingService(ReadingServiceInterface):
         ``PrototypeMultiProcessingReadingService`` invalidate states & properly exits all subprocesses.
         """
         # TODO(618): Check if anyone stuck with messages
-        def clean_me(process, req_queue, res_queue):
-            # TODO(619): Can send terminations simultaneously
-            # TODO(620): Make termination a function of QueueWrapperDataPipe (similar to reset)
-            req_queue.put(communication.messages.TerminateRequest())
-            try:
-                _ = res_queue.get(timeout=default_dl2_worker_join_timeout_in_s)
-            except queue.Empty:
-                pass
-            process.join(default_dl2_worker_join_timeout_in_s)
-
         # Clean up worker processes
         for process, req_queue, res_queue in self._worker_processes:
             try:
-                clean_me(process, req_queue, res_queue)
+                _clean_worker_process(process, req_queue, res_queue)
             except AttributeError:
                 # Due to non-deterministic order of destruction, by the time `finalize` is called,
                 # some objects may already be `None`.
@@ -371,8 +532,171 @@ class PrototypeMultiProcessingReadingService(ReadingServiceInterface):
             except TimeoutError:
                 pass
 
+        # Destroy shared memory after worker processes exit
+        for shared_memory in self._worker_shared_memories:
+            try:
+                shared_memory.close()
+            except AttributeError:
+                pass
+
         self._worker_processes = []
         self._dispatch_process = None
+        self._worker_shared_memories = []
+
+
+class ThreadPoolReadingService(ReadingServiceInterface):
+    r"""
+    Spawns multiple worker threads to load data from the ``DataPipe`` graph. Each worker thread
+    runs a copy of the replicable branch of the graph and returns the result to the main thread
+    via thread-safe queues, which avoids the cost of launching processes and pickling data.
+    It's suitable for I/O-bound pipelines and operations that release the GIL.
+
+    Sharding and random seeds follow the same rules as :class:`PrototypeMultiProcessingReadingService`.
+
+    Args:
+        num_workers (int, optional): How many threads to use for data loading.
+        worker_prefetch_cnt: (int, 10 by default): Number of data will be prefetched at
+            the end of each worker thread.
+        main_prefetch_cnt: (int, 10 by default): Number of data will be prefetched
+            at the end of the whole pipeline in the main thread.
+        worker_init_fn: (Callable, optional): Function to be called when each worker
+            thread launches with ``DataPipe`` and ``WorkerInfo`` as the expected arguments.
+        worker_reset_fn: (Callable, optional): Function to be called at the beginning
+            of each epoch in each worker thread with ``DataPipe``, ``WorkerInfo``
+            and ``SeedGenerator`` as the expected arguments.
+        worker_inflight_cnt: (int, 1 by default): Number of requests of data that can be sent
+            to each worker thread ahead of receiving the responses.
+
+    Note:
+        - Global random states of ``torch``, ``random`` and ``numpy`` are shared with the main thread,
+          so they are not reset by worker threads. Random ``DataPipes`` are still seeded per worker.
+        - Non-replicable ``DataPipes`` (``sharding_round_robin_dispatch``) are not supported.
+    """
+    num_workers: int
+    worker_prefetch_cnt: int
+    main_prefetch_cnt: int
+    worker_init_fn: Optional[Callable[[DataPipe, WorkerInfo], DataPipe]]
+    worker_reset_fn: Optional[Callable[[DataPipe, WorkerInfo, SeedGenerator], DataPipe]]
+    worker_inflight_cnt: int
+    _worker_threads: List[
+        Tuple[threading.Thread, communication.queue.ThreadingQueue, communication.queue.ThreadingQueue]
+    ]
+    _worker_datapipes: List[DataPipe]
+    _worker_consumer_datapipe: Optional[DataPipe]
+    _main_prefetch_datapipe: Optional[DataPipe]
+    _end_datapipe: Optional[DataPipe]
+
+    def __init__(
+        self,
+        num_workers: int = 0,
+        worker_prefetch_cnt: int = 10,
+        main_prefetch_cnt: int = 10,
+        worker_init_fn: Optional[Callable[[DataPipe, WorkerInfo], DataPipe]] = None,
+        worker_reset_fn: Optional[Callable[[DataPipe, WorkerInfo, SeedGenerator], DataPipe]] = None,
+        worker_inflight_cnt: int = 1,
+    ) -> None:
+        self.num_workers = num_workers
+        self.worker_prefetch_cnt = worker_prefetch_cnt
+        self.main_prefetch_cnt = main_prefetch_cnt
+        self.worker_init_fn = worker_init_fn
+        self.worker_reset_fn = worker_reset_fn
+        if worker_inflight_cnt < 1:
+            raise ValueError(f"Expected a positive worker_inflight_cnt, but got {worker_inflight_cnt}.")
+        self.worker_inflight_cnt = worker_inflight_cnt
+        self._worker_threads = []
+        self._worker_datapipes = []
+        self._worker_consumer_datapipe = None
+        self._main_prefetch_datapipe = None
+        self._end_datapipe = None
+
+    def initialize(self, datapipe: DataPipe) -> DataPipe:
+        r"""
+        ``ThreadPoolReadingService`` finds the replicable branch of the graph, and replaces it by
+        the ``DataPipe`` that iterates over copies of the branch running in worker threads.
+        """
+        if self.num_workers == 0:
+            process_init_fn(datapipe, WorkerInfo(1, 0), self.worker_init_fn)
+            self._end_datapipe = datapipe
+            return datapipe
+
+        graph = traverse_dps(datapipe)
+        if find_lca_round_robin_sharding_dp(graph) is not None:
+            raise RuntimeError("ThreadPoolReadingService doesn't support non-replicable DataPipes")
+
+        replicable_dps = _find_replicable_branches(graph)
+        assert len(replicable_dps) == 1, "ThreadPoolReadingService only supports single replicable branch currently"
+        replicable_dp = replicable_dps[0]
+
+        if self.worker_prefetch_cnt > 0:
+            replicable_dp = replicable_dp.prefetch(self.worker_prefetch_cnt)
+
+        for worker_id in range(self.num_workers):
+            call_on_thread_init = partial(
+                process_init_fn,
+                worker_info=WorkerInfo(self.num_workers, worker_id),
+                custom_init_fn=self.worker_init_fn,
+            )
+            (thread, req_queue, res_queue, _) = communication.eventloop.CreateThreadForDataPipeline(
+                replicable_dp, call_on_thread_init
+            )
+            thread.start()
+            self._worker_threads.append((thread, req_queue, res_queue))
+            local_datapipe = communication.iter.QueueWrapper(
+                communication.protocol.IterDataPipeQueueProtocolClient(
+                    req_queue, res_queue, max_requests=self.worker_inflight_cnt
+                )
+            )
+            self._worker_datapipes.append(local_datapipe)
+
+        end_datapipe = communication.iter._IterateQueueDataPipes(self._worker_datapipes)  # type: ignore[assignment]
+        self._worker_consumer_datapipe = end_datapipe
+
+        if self.main_prefetch_cnt > 0:
+            end_datapipe = self._worker_consumer_datapipe.prefetch(self.main_prefetch_cnt)  # type: ignore[union-attr]
+            self._main_prefetch_datapipe = end_datapipe
+
+        # Attach non-replicable DataPipes
+        if replicable_dps[0] is not datapipe:
+            graph = replace_dp(graph, replicable_dps[0], end_datapipe)
+            end_datapipe = datapipe  # type: ignore[assignment]
+
+        self._end_datapipe = end_datapipe
+        return self._end_datapipe  # type: ignore[return-value]
+
+    def initialize_iteration(
+        self, seed_generator: SeedGenerator, iter_reset_fn: Optional[Callable[[DataPipe], DataPipe]] = None
+    ) -> Optional[Callable[[DataPipe], DataPipe]]:
+        assert self._end_datapipe is not None
+
+        set_graph_random_seed(self._end_datapipe, seed_generator)
+
+        if self.num_workers > 0:
+            if self.main_prefetch_cnt > 0:
+                # Stop prefetching first
+                self._main_prefetch_datapipe.reset()  # type: ignore[union-attr]
+            call_on_epoch_reset = partial(
+                process_reset_fn,
+                iter_reset_fn=iter_reset_fn,
+                custom_reset_fn=self.worker_reset_fn,
+                set_global_random_state=False,
+            )
+            assert self._worker_consumer_datapipe is not None
+            self._worker_consumer_datapipe.reset_epoch(call_on_epoch_reset, seed_generator)
+        return None
+
+    def __del__(self):
+        self.finalize()
+
+    def finalize(self) -> None:
+        r"""
+        ``ThreadPoolReadingService`` invalidate states & properly exits all worker threads.
+        """
+        for thread, req_queue, res_queue in self._worker_threads:
+            try:
+                _clean_worker_process(thread, req_queue, res_queue)
+            except AttributeError:
+                pass
+        self._worker_threads = []
 
 
 class MultiProcessingReadingService(ReadingServiceInterface):
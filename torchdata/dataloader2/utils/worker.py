@@ -57,9 +57,12 @@ def process_init_fn(
     custom_init_fn: Optional[Callable[[DataPipe, WorkerInfo], DataPipe]] = None,
     dispatching_req_queue: Optional[Queue] = None,
     dispatching_res_queue: Optional[Queue] = None,
+    threads_per_worker: int = 1,
 ) -> DataPipe:
     r"""
     Based on the worker information, shard the ``DataPipe`` graph dynamically.
+    When ``threads_per_worker`` is greater than 1, copies of the ``DataPipe`` graph run
+    in that number of threads, and each copy is sharded as an individual worker.
     """
     # Find if there is non-replicable DataPipe
     graph = traverse_dps(datapipe)
@@ -68,9 +71,12 @@ def process_init_fn(
     # There are two cases for DataPipe graph in terms of mp sharding:
     # 1) All DataPipes are replicable, apply mp sharding to the whole graph
     if len(non_replicable_dp) == 0:
-        torch.utils.data.graph_settings.apply_sharding(
-            datapipe, worker_info.num_workers, worker_info.worker_id, SHARDING_PRIORITIES.MULTIPROCESSING
-        )
+        if threads_per_worker > 1:
+            datapipe = _create_worker_threads(datapipe, worker_info, threads_per_worker)
+        else:
+            torch.utils.data.graph_settings.apply_sharding(
+                datapipe, worker_info.num_workers, worker_info.worker_id, SHARDING_PRIORITIES.MULTIPROCESSING
+            )
         assert dispatching_req_queue is None and dispatching_res_queue is None
     # 2) There is non-replicable DataPipe. Since we have replaced the lowest common
     #    ancestor by a `_DummyIterDataPipe`, we would only apply mp sharding
@@ -78,6 +84,7 @@ def process_init_fn(
     else:
         assert len(non_replicable_dp) == 1
         assert not (dispatching_req_queue is None and dispatching_res_queue is None)
+        assert threads_per_worker == 1
         non_dispatching_branches = find_non_dispatching_branches(graph)
         for dp in non_dispatching_branches:
             torch.utils.data.graph_settings.apply_sharding(
@@ -98,6 +105,38 @@ def process_init_fn(
     return datapipe
 
 
+def _apply_thread_sharding(datapipe: DataPipe, num_instances: int, instance_id: int) -> DataPipe:
+    torch.utils.data.graph_settings.apply_sharding(
+        datapipe, num_instances, instance_id, SHARDING_PRIORITIES.MULTIPROCESSING
+    )
+    return datapipe
+
+
+def _create_worker_threads(datapipe: DataPipe, worker_info: WorkerInfo, num_threads: int) -> DataPipe:
+    r"""
+    Run copies of the ``DataPipe`` graph in threads of the current worker process and return the ``DataPipe``
+    iterating over them in the round-robin manner. Thread ``t`` of worker ``w`` takes the shard
+    ``w * num_threads + t`` of ``num_workers * num_threads``.
+    """
+    queue_wrappers = []
+    for thread_id in range(num_threads):
+        call_on_thread_init = partial(
+            _apply_thread_sharding,
+            num_instances=worker_info.num_workers * num_threads,
+            instance_id=worker_info.worker_id * num_threads + thread_id,
+        )
+        thread, req_queue, res_queue, _ = communication.eventloop.CreateThreadForDataPipeline(
+            datapipe, call_on_thread_init
+        )
+        thread.start()
+        queue_wrappers.append(
+            communication.iter.QueueWrapper(
+                communication.protocol.IterDataPipeQueueProtocolClient(req_queue, res_queue)
+            )
+        )
+    return communication.iter._IterateWorkerThreadDataPipes(queue_wrappers)
+
+
 def _set_global_random_state(seed_generator: SeedGenerator, distributed_shared: bool = False) -> None:
     py_seed = seed_generator.generate_shared_seed() if distributed_shared else seed_generator.generate_seed()
     random.seed(py_seed)
@@ -149,16 +188,29 @@ def process_reset_fn(
     seed_generator: SeedGenerator,
     iter_reset_fn: Optional[Callable[[DataPipe], DataPipe]] = None,
     custom_reset_fn: Optional[Callable[[DataPipe, WorkerInfo, SeedGenerator], DataPipe]] = None,
+    reshard: bool = False,
+    set_global_random_state: bool = True,
 ) -> DataPipe:
     r"""
     Based on the distributed shared random seed and worker id, this function is used to
     reset the random state of the ``DataPipe`` graph and the global random states for ``torch``,
-    ``random`` and ``numpy``.
+    ``random`` and ``numpy``. When ``reshard`` is ``True``, multiprocessing sharding is applied
+    to the graph again based on the worker information, which is required after the number
+    of workers has changed. Global random states are left untouched when ``set_global_random_state``
+    is ``False``, e.g. for workers running as threads of the main process.
     """
     # Reset non-sharding process first
     graph = traverse_dps(datapipe)
     dispatch_process_consumer_dps = find_dps(graph, communication.iter._IterateQueueDataPipes)
 
+    if reshard:
+        # Resharding is only supported when all DataPipes are replicable, since the number of
+        # instances from the dispatching process can't be changed
+        assert len(dispatch_process_consumer_dps) == 0
+        torch.utils.data.graph_settings.apply_sharding(
+            datapipe, worker_info.num_workers, worker_info.worker_id, SHARDING_PRIORITIES.MULTIPROCESSING
+        )
+
     if len(dispatch_process_consumer_dps) > 0:
         assert len(dispatch_process_consumer_dps) == 1
         dispatch_process_consumer_dp = dispatch_process_consumer_dps[0]
@@ -170,8 +222,14 @@ def process_reset_fn(
             )
             dispatch_process_consumer_dp.reset_epoch(dispatch_reset_fn, seed_generator)
 
+    # Reset threads within the worker process, which share the global random states of the process
+    worker_thread_dps = find_dps(graph, communication.iter._IterateWorkerThreadDataPipes)
+    for worker_thread_dp in worker_thread_dps:
+        worker_thread_dp.reset_epoch(partial(process_reset_fn, set_global_random_state=False), seed_generator)
+
     # Set global random states
-    _set_global_random_state(seed_generator)
+    if set_global_random_state:
+        _set_global_random_state(seed_generator)
 
     set_graph_random_seed(datapipe, seed_generator)
 
@@ -70,6 +70,7 @@ from torchdata.datapipes.iter.transform.callable import (
     DropperIterDataPipe as Dropper,
     FlatMapperIterDataPipe as FlatMapper,
     FlattenIterDataPipe as Flattener,
+    ParallelMapperIterDataPipe as ParallelMapper,
     SliceIterDataPipe as Slicer,
 )
 from torchdata.datapipes.iter.util.bz2fileloader import Bz2FileLoaderIterDataPipe as Bz2FileLoader
@@ -123,6 +124,7 @@ from torchdata.datapipes.iter.util.tfrecordloader import (
     TFRecordExample,
     TFRecordExampleSpec,
     TFRecordLoaderIterDataPipe as TFRecordLoader,
+    TFRecordSplitterIterDataPipe as TFRecordSplitter,
 )
 from torchdata.datapipes.iter.util.webdataset import WebDatasetIterDataPipe as WebDataset
 from torchdata.datapipes.iter.util.xzfileloader import XzFileLoaderIterDataPipe as XzFileLoader
@@ -186,6 +188,7 @@ __all__ = [
     "OnDiskCacheHolder",
     "OnlineReader",
     "ParagraphAggregator",
+    "ParallelMapper",
     "ParquetDataFrameLoader",
     "Prefetcher",
     "RandomSplitter",
@@ -206,6 +209,7 @@ __all__ = [
     "Slicer",
     "StreamReader",
     "TFRecordLoader",
+    "TFRecordSplitter",
     "TarArchiveLoader",
     "UnBatcher",
     "UnZipper",
@@ -7,6 +7,7 @@
 import os
 import posixpath
 
+from functools import partial
 from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 from torch.utils.data.datapipes.utils.common import match_masks
@@ -14,6 +15,7 @@ from torch.utils.data.datapipes.utils.common import match_masks
 from torchdata.datapipes import functional_datapipe
 from torchdata.datapipes.iter import IterableWrapper, IterDataPipe
 from torchdata.datapipes.utils import StreamWrapper
+from torchdata.datapipes.utils._manifest import get_manifest_path, iterate_with_manifest
 
 try:
     import fsspec
@@ -43,18 +45,32 @@ class FSSpecFileListerIterDataPipe(IterDataPipe[str]):
     Args:
         root: The root `fsspec` path directory or list of path directories to list files from
         masks: Unix style filter string or string list for filtering file name(s)
+        manifest_dir: Directory of the manifest files caching the listing of each root, e.g. on a file
+            system shared by all nodes of a job (disabled by default)
+        manifest_ttl: Number of seconds a manifest stays valid. If not specified, a manifest is
+            valid as long as the modification time of its root is unchanged
         kwargs: Extra options that make sense to a particular storage connection,
             e.g. host, port, username, password, etc.
 
+    Note:
+        The modification time of a directory only reflects files added to or removed from the directory
+        itself. When the root has no modification time (e.g. an object store prefix) and ``manifest_ttl``
+        is not specified, the manifest is valid until it's removed.
+
     Example:
         >>> from torchdata.datapipes.iter import FSSpecFileLister
         >>> datapipe = FSSpecFileLister(root=dir_path)
+        >>> # Listed once, later iterations and jobs read the listing from the manifest
+        >>> datapipe = FSSpecFileLister(root=dir_path, manifest_dir=shared_dir)
     """
 
     def __init__(
         self,
         root: Union[str, Sequence[str], IterDataPipe],
         masks: Union[str, List[str]] = "",
+        *,
+        manifest_dir: Optional[str] = None,
+        manifest_ttl: Optional[float] = None,
         **kwargs,
     ) -> None:
         _assert_fsspec()
@@ -68,49 +84,71 @@ class FSSpecFileListerIterDataPipe(IterDataPipe[str]):
         else:
             self.datapipe = root
         self.masks = masks
+        self.manifest_dir = manifest_dir
+        self.manifest_ttl = manifest_ttl
         self.kwargs_for_connection = kwargs
 
+    def _list_root(
+        self, fs, root: str, path: str, detail: bool = False
+    ) -> Iterator[Tuple[str, Optional[Any], Optional[Any]]]:
+        if isinstance(fs.protocol, str):
+            protocol_list = [fs.protocol]
+        else:
+            protocol_list = fs.protocol
+
+        # fspec.core.url_to_fs will return "abfs" for both, "az://" and "abfs://" urls
+        if "abfs" in protocol_list:
+            protocol_list.append("az")
+
+        is_local = fs.protocol == "file" or not any(root.startswith(protocol) for protocol in protocol_list)
+        if fs.isfile(path):
+            yield root, None, None
+        else:
+            # Sizes and mtimes are only requested for the manifest, since they may cost a stat per file
+            for file_info in fs.ls(path, detail=detail):
+                if detail:
+                    file_name, size, mtime = file_info["name"], file_info.get("size"), file_info.get("mtime")
+                else:
+                    file_name, size, mtime = file_info, None, None
+                if not match_masks(file_name, self.masks):
+                    continue
+
+                # ensure the file name has the full fsspec protocol path
+                if any(file_name.startswith(protocol) for protocol in protocol_list):
+                    yield file_name, size, mtime
+                else:
+                    if is_local:
+                        abs_path = os.path.join(path, file_name)
+                    elif not file_name.startswith(path):
+                        abs_path = posixpath.join(path, file_name)
+                    else:
+                        abs_path = file_name
+
+                    starts_with = False
+                    for protocol in protocol_list:
+                        if root.startswith(protocol):
+                            starts_with = True
+                            yield protocol + "://" + abs_path, size, mtime
+                            break
+
+                    if not starts_with:
+                        yield abs_path, size, mtime
+
     def __iter__(self) -> Iterator[str]:
         for root in self.datapipe:
             fs, path = fsspec.core.url_to_fs(root, **self.kwargs_for_connection)
-
-            if isinstance(fs.protocol, str):
-                protocol_list = [fs.protocol]
-            else:
-                protocol_list = fs.protocol
-
-            # fspec.core.url_to_fs will return "abfs" for both, "az://" and "abfs://" urls
-            if "abfs" in protocol_list:
-                protocol_list.append("az")
-
-            is_local = fs.protocol == "file" or not any(root.startswith(protocol) for protocol in protocol_list)
-            if fs.isfile(path):
-                yield root
-            else:
-                for file_name in fs.ls(path, detail=False):  # Ensure it returns List[str], not List[Dict]
-                    if not match_masks(file_name, self.masks):
-                        continue
-
-                    # ensure the file name has the full fsspec protocol path
-                    if any(file_name.startswith(protocol) for protocol in protocol_list):
-                        yield file_name
-                    else:
-                        if is_local:
-                            abs_path = os.path.join(path, file_name)
-                        elif not file_name.startswith(path):
-                            abs_path = posixpath.join(path, file_name)
-                        else:
-                            abs_path = file_name
-
-                        starts_with = False
-                        for protocol in protocol_list:
-                            if root.startswith(protocol):
-                                starts_with = True
-                                yield protocol + "://" + abs_path
-                                break
-
-                        if not starts_with:
-                            yield abs_path
+            manifest_path, root_mtime = None, None
+            if self.manifest_dir is not None:
+                manifest_path = get_manifest_path(self.manifest_dir, root, self.masks)
+                if self.manifest_ttl is None:
+                    mtime = fs.info(path).get("mtime")
+                    root_mtime = None if mtime is None else str(mtime)
+            yield from iterate_with_manifest(
+                manifest_path,
+                partial(self._list_root, fs, root, path, detail=manifest_path is not None),
+                root_mtime=root_mtime,
+                ttl=self.manifest_ttl,
+            )
 
 
 @functional_datapipe("open_files_by_fsspec")
@@ -6,6 +6,7 @@
 
 import os
 
+from functools import partial
 from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple, Union
 
 from torch.utils.data.datapipes.utils.common import match_masks
@@ -13,6 +14,7 @@ from torch.utils.data.datapipes.utils.common import match_masks
 from torchdata.datapipes import functional_datapipe
 from torchdata.datapipes.iter import IterableWrapper, IterDataPipe
 from torchdata.datapipes.utils import StreamWrapper
+from torchdata.datapipes.utils._manifest import get_manifest_path, iterate_with_manifest
 
 try:
     import iopath
@@ -49,6 +51,11 @@ class IoPathFileListerIterDataPipe(IterDataPipe[str]):
         root: The root local filepath or URL directory or list of roots to list files from
         masks: Unix style filter string or string list for filtering file name(s)
         pathmgr: Custom ``iopath.PathManager``. If not specified, a default ``PathManager`` is created.
+        manifest_dir: Directory of the manifest files caching the listing of each root, e.g. on a file
+            system shared by all nodes of a job (disabled by default)
+        manifest_ttl: Number of seconds a manifest stays valid. If not specified, the manifest of a local
+            root is rebuilt once the modification time of the root changes. Other roots require it, since
+            ``PathManager`` doesn't provide modification times.
 
     Note:
         Default ``PathManager`` currently supports local file path, normal HTTP URL and OneDrive URL.
@@ -65,6 +72,8 @@ class IoPathFileListerIterDataPipe(IterDataPipe[str]):
         masks: Union[str, List[str]] = "",
         *,
         pathmgr=None,
+        manifest_dir: Optional[str] = None,
+        manifest_ttl: Optional[float] = None,
     ) -> None:
         if iopath is None:
             raise ModuleNotFoundError(
@@ -83,18 +92,35 @@ class IoPathFileListerIterDataPipe(IterDataPipe[str]):
             self.datapipe = root
         self.pathmgr = _create_default_pathmanager() if pathmgr is None else pathmgr
         self.masks = masks
+        self.manifest_dir = manifest_dir
+        self.manifest_ttl = manifest_ttl
 
     def register_handler(self, handler, allow_override=False):
         self.pathmgr.register_handler(handler, allow_override=allow_override)
 
+    def _list_root(self, path: str) -> Iterator[str]:
+        if self.pathmgr.isfile(path):
+            yield path
+        else:
+            for file_name in self.pathmgr.ls(path):
+                if match_masks(file_name, self.masks):
+                    yield os.path.join(path, file_name)
+
     def __iter__(self) -> Iterator[str]:
         for path in self.datapipe:
-            if self.pathmgr.isfile(path):
-                yield path
-            else:
-                for file_name in self.pathmgr.ls(path):
-                    if match_masks(file_name, self.masks):
-                        yield os.path.join(path, file_name)
+            manifest_path, root_mtime = None, None
+            if self.manifest_dir is not None:
+                manifest_path = get_manifest_path(self.manifest_dir, path, self.masks)
+                if self.manifest_ttl is None:
+                    if "://" in path:
+                        raise ValueError(
+                            f"`manifest_ttl` is required to use a manifest for {path}, "
+                            "as only local roots are validated by their modification time"
+                        )
+                    root_mtime = str(os.path.getmtime(self.pathmgr.get_local_path(path)))
+            yield from iterate_with_manifest(
+                manifest_path, partial(self._list_root, path), root_mtime=root_mtime, ttl=self.manifest_ttl
+            )
 
 
 @functional_datapipe("open_files_by_iopath")
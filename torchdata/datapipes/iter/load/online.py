@@ -7,14 +7,17 @@
 import re
 import urllib
 
-from typing import Any, Dict, Iterator, Optional, Tuple
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 
 import requests
 
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError, RequestException
 
 from torchdata.datapipes import functional_datapipe
 from torchdata.datapipes.iter import IterDataPipe
+from torchdata.datapipes.iter.transform.callable import ParallelMapperIterDataPipe
 from torchdata.datapipes.utils import StreamWrapper
 
 
@@ -33,16 +36,41 @@ def _get_proxies() -> Optional[Dict[str, str]]:
     return None
 
 
+def _create_pooled_session(pool_size: int) -> requests.Session:
+    r"""
+    Creates a ``requests.Session`` whose connections are kept alive and reused across URLs.
+    ``pool_size`` connections per host are kept in the pool, which should be at least
+    the number of concurrent requests.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _session_get(
+    session: requests.Session, url: str, *, timeout: Optional[float], proxies, **query_params
+) -> requests.Response:
+    if timeout is None:
+        return session.get(url, stream=True, proxies=proxies, **query_params)  # type: ignore[arg-type]
+    return session.get(url, timeout=timeout, stream=True, proxies=proxies, **query_params)  # type: ignore[arg-type]
+
+
 def _get_response_from_http(
-    url: str, *, timeout: Optional[float], **query_params: Optional[Dict[str, Any]]
+    url: str,
+    *,
+    timeout: Optional[float],
+    session: Optional[requests.Session] = None,
+    **query_params: Optional[Dict[str, Any]],
 ) -> Tuple[str, StreamWrapper]:
     try:
-        with requests.Session() as session:
-            proxies = _get_proxies()
-            if timeout is None:
-                r = session.get(url, stream=True, proxies=proxies, **query_params)  # type: ignore[arg-type]
-            else:
-                r = session.get(url, timeout=timeout, stream=True, proxies=proxies, **query_params)  # type: ignore[arg-type]
+        proxies = _get_proxies()
+        if session is None:
+            with requests.Session() as session:
+                r = _session_get(session, url, timeout=timeout, proxies=proxies, **query_params)
+        else:
+            r = _session_get(session, url, timeout=timeout, proxies=proxies, **query_params)
         r.raise_for_status()
         return url, StreamWrapper(r.raw)
     except HTTPError as e:
@@ -53,6 +81,18 @@ def _get_response_from_http(
         raise
 
 
+def _fetch_concurrently(
+    source_datapipe: IterDataPipe[str], get_fn: Callable, concurrency: int, in_order: bool
+) -> Iterator[Tuple[str, StreamWrapper]]:
+    if concurrency == 1:
+        for url in source_datapipe:
+            yield get_fn(url)
+    else:
+        yield from ParallelMapperIterDataPipe(
+            source_datapipe, get_fn, num_workers=concurrency, max_inflight=concurrency, in_order=in_order
+        )
+
+
 @functional_datapipe("read_from_http")
 class HTTPReaderIterDataPipe(IterDataPipe[Tuple[str, StreamWrapper]]):
     r"""
@@ -62,8 +102,14 @@ class HTTPReaderIterDataPipe(IterDataPipe[Tuple[str, StreamWrapper]]):
     Args:
         source_datapipe: a DataPipe that contains URLs
         timeout: timeout in seconds for HTTP request
+        concurrency: the number of HTTP requests in flight at the same time
+        in_order: if ``True`` (default), yields in the order of URLs. Otherwise, yields the
+            responses as soon as they are received when ``concurrency`` is greater than 1
         **kwargs: a Dictionary to pass optional arguments that requests takes. For the full list check out https://docs.python-requests.org/en/master/api/
 
+    Note:
+        Connections are kept alive and reused across URLs within an iteration.
+
     Example:
         >>> from torchdata.datapipes.iter import IterableWrapper, HttpReader
         >>> file_url = "https://raw.githubusercontent.com/pytorch/data/main/LICENSE"
@@ -80,18 +126,25 @@ class HTTPReaderIterDataPipe(IterDataPipe[Tuple[str, StreamWrapper]]):
     """
 
     def __init__(
-        self, source_datapipe: IterDataPipe[str], timeout: Optional[float] = None, **kwargs: Optional[Dict[str, Any]]
+        self,
+        source_datapipe: IterDataPipe[str],
+        timeout: Optional[float] = None,
+        concurrency: int = 1,
+        in_order: bool = True,
+        **kwargs: Optional[Dict[str, Any]],
     ) -> None:
         self.source_datapipe: IterDataPipe[str] = source_datapipe
         self.timeout = timeout
+        if concurrency < 1:
+            raise ValueError(f"Expected a positive concurrency, but got {concurrency}.")
+        self.concurrency = concurrency
+        self.in_order = in_order
         self.query_params = kwargs
 
     def __iter__(self) -> Iterator[Tuple[str, StreamWrapper]]:
-        for url in self.source_datapipe:
-            if self.query_params:
-                yield _get_response_from_http(url, timeout=self.timeout, **self.query_params)
-            else:
-                yield _get_response_from_http(url, timeout=self.timeout)
+        with _create_pooled_session(self.concurrency) as session:
+            get_fn = partial(_get_response_from_http, timeout=self.timeout, session=session, **self.query_params)
+            yield from _fetch_concurrently(self.source_datapipe, get_fn, self.concurrency, self.in_order)
 
     def __len__(self) -> int:
         return len(self.source_datapipe)
@@ -181,6 +234,17 @@ class GDriveReaderDataPipe(IterDataPipe[Tuple[str, StreamWrapper]]):
         return len(self.source_datapipe)
 
 
+def _get_response_from_remote(
+    url: str, *, timeout: Optional[float], session: requests.Session
+) -> Tuple[str, StreamWrapper]:
+    parts = urllib.parse.urlparse(url)
+
+    if re.match(r"(drive|docs)[.]google[.]com", parts.netloc):
+        return _get_response_from_google_drive(url, timeout=timeout)
+    else:
+        return _get_response_from_http(url, timeout=timeout, session=session)
+
+
 @functional_datapipe("read_from_remote")
 class OnlineReaderIterDataPipe(IterDataPipe[Tuple[str, StreamWrapper]]):
     r"""
@@ -190,6 +254,9 @@ class OnlineReaderIterDataPipe(IterDataPipe[Tuple[str, StreamWrapper]]):
     Args:
         source_datapipe: a DataPipe that contains URLs
         timeout: timeout in seconds for HTTP request
+        concurrency: the number of requests in flight at the same time
+        in_order: if ``True`` (default), yields in the order of URLs. Otherwise, yields the
+            responses as soon as they are received when ``concurrency`` is greater than 1
 
     Example:
         >>> from torchdata.datapipes.iter import IterableWrapper, OnlineReader
@@ -205,18 +272,25 @@ class OnlineReaderIterDataPipe(IterDataPipe[Tuple[str, StreamWrapper]]):
     """
     source_datapipe: IterDataPipe[str]
 
-    def __init__(self, source_datapipe: IterDataPipe[str], *, timeout: Optional[float] = None) -> None:
+    def __init__(
+        self,
+        source_datapipe: IterDataPipe[str],
+        *,
+        timeout: Optional[float] = None,
+        concurrency: int = 1,
+        in_order: bool = True,
+    ) -> None:
         self.source_datapipe = source_datapipe
         self.timeout = timeout
+        if concurrency < 1:
+            raise ValueError(f"Expected a positive concurrency, but got {concurrency}.")
+        self.concurrency = concurrency
+        self.in_order = in_order
 
     def __iter__(self) -> Iterator[Tuple[str, StreamWrapper]]:
-        for url in self.source_datapipe:
-            parts = urllib.parse.urlparse(url)
-
-            if re.match(r"(drive|docs)[.]google[.]com", parts.netloc):
-                yield _get_response_from_google_drive(url, timeout=self.timeout)
-            else:
-                yield _get_response_from_http(url, timeout=self.timeout)
+        with _create_pooled_session(self.concurrency) as session:
+            get_fn = partial(_get_response_from_remote, timeout=self.timeout, session=session)
+            yield from _fetch_concurrently(self.source_datapipe, get_fn, self.concurrency, self.in_order)
 
     def __len__(self) -> int:
         return len(self.source_datapipe)
@@ -4,15 +4,93 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
-from io import BytesIO
-from typing import Iterator, List, Tuple, Union
+import io
+import weakref
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Deque, Iterator, List, Optional, Tuple, Union
 
 import torchdata
 
 from torch.utils.data.datapipes.utils.common import match_masks
 from torchdata.datapipes import functional_datapipe
 from torchdata.datapipes.iter import IterDataPipe
+from torchdata.datapipes.iter.transform.callable import ParallelMapperIterDataPipe
 from torchdata.datapipes.utils import StreamWrapper
+from torchdata.datapipes.utils._manifest import iterate_with_manifest
+
+# Small reads (e.g. ``readline``) of streamed S3 objects are served from a read-ahead buffer of this size
+_S3_STREAM_READ_AHEAD = 1024 * 1024
+
+# Sub-prefixes whose first listing page is requested ahead of the one being yielded, per concurrent request
+_S3_LIST_PAGES_AHEAD = 4
+
+
+class _S3ObjectStream(io.RawIOBase):
+    r"""
+    Read-only, seekable stream over an S3 object. Data is fetched lazily by byte-range
+    requests of at most ``chunk_size`` bytes, so that the object is never buffered whole.
+    """
+
+    def __init__(self, handler, url: str, size: int, chunk_size: int) -> None:
+        super().__init__()
+        self.handler = handler
+        self.url = url
+        self.size = size
+        self.chunk_size = chunk_size
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}")
+        self._pos = pos
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        n = min(len(buffer), self.chunk_size, max(self.size - self._pos, 0))
+        if n == 0:
+            return 0
+        data = self.handler.s3_read_range(self.url, self._pos, n, self.size)
+        buffer[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = max(self.size - self._pos, 0)
+        chunks = []
+        while size > 0:
+            n = min(size, self.chunk_size, max(self.size - self._pos, 0))
+            if n == 0:
+                break
+            data = self.handler.s3_read_range(self.url, self._pos, n, self.size)
+            if not data:
+                break
+            self._pos += len(data)
+            size -= len(data)
+            chunks.append(data)
+        return b"".join(chunks)
+
+    def readall(self) -> bytes:
+        return self.read()
 
 
 @functional_datapipe("list_files_by_s3")
@@ -29,6 +107,12 @@ class S3FileListerIterDataPipe(IterDataPipe[str]):
            environment variables.
         4. The lack of AWS proper configuration can lead empty response. For more details related to S3 IO DataPipe
            setup and AWS config, please see the `README file`_.
+        5. When ``concurrency`` is greater than 1, each prefix is listed with the ``"/"`` delimiter, and the derived
+           sub-prefixes are listed concurrently. URLs are yielded as soon as their pages arrive, in a deterministic
+           order: the files directly under a prefix followed by the files of each of its sub-prefixes. The first
+           pages of at most ``4 * concurrency`` upcoming sub-prefixes are requested ahead.
+        6. When ``manifest_path`` points to an existing file, URLs are read from it instead of S3. Otherwise,
+           the manifest is written once all URLs have been listed. The manifest has to be removed to list again.
 
     .. _README file:
         https://github.com/pytorch/data/tree/main/torchdata/datapipes/iter/load#s3-io-datapipe-documentation
@@ -38,6 +122,9 @@ class S3FileListerIterDataPipe(IterDataPipe[str]):
         length: Nominal length of the datapipe
         request_timeout_ms: timeout setting for each reqeust (3,000ms by default)
         region: region for access files (inferred from credentials by default)
+        masks: Unix style filter string or string list for filtering file name(s)
+        concurrency: the number of listing requests in flight at the same time (1 by default)
+        manifest_path: path of the file caching the listed URLs across epochs and jobs (disabled by default)
 
     Example:
         >>> from torchdata.datapipes.iter import IterableWrapper, S3FileLister
@@ -58,6 +145,8 @@ class S3FileListerIterDataPipe(IterDataPipe[str]):
         request_timeout_ms=-1,
         region="",
         masks: Union[str, List[str]] = "",
+        concurrency: int = 1,
+        manifest_path: Optional[str] = None,
     ) -> None:
         if not hasattr(torchdata, "_torchdata") or not hasattr(torchdata._torchdata, "S3Handler"):
             raise ModuleNotFoundError("TorchData must be built with BUILD_S3=1 to use this datapipe.")
@@ -66,17 +155,85 @@ class S3FileListerIterDataPipe(IterDataPipe[str]):
         self.length: int = length
         self.handler = torchdata._torchdata.S3Handler(request_timeout_ms, region)
         self.masks = masks
+        if concurrency < 1:
+            raise ValueError(f"Expected a positive concurrency, but got {concurrency}.")
+        self.concurrency = concurrency
+        self.manifest_path = manifest_path
 
-    def __iter__(self) -> Iterator[str]:
-        for prefix in self.source_datapipe:
-            while True:
-                urls = self.handler.list_files(prefix)
+    def _list_prefix_serially(self, prefix: str) -> Iterator[str]:
+        while True:
+            urls = self.handler.list_files(prefix)
+            for url in urls:
+                if match_masks(url, self.masks):
+                    yield url
+            if not urls:
+                break
+        self.handler.clear_marker()
+
+    def _list_prefix_concurrently(self, request_page: Callable, prefix: str) -> Iterator[str]:
+        window = _S3_LIST_PAGES_AHEAD * self.concurrency
+        # Prefixes left to list in depth-first order: a stack of the sub-prefixes of each prefix being listed,
+        # the innermost last. Each is paired with the request of its first page once submitted, and at most
+        # `window` of them are requested ahead, so that wide prefixes don't hold all of their pages at once.
+        frames: List[Deque[List]] = [deque([[prefix, None]])]
+        requested = 0
+
+        def request_ahead() -> None:
+            nonlocal requested
+            for frame in reversed(frames):
+                for entry in frame:
+                    if requested >= window:
+                        return
+                    if entry[1] is None:
+                        entry[1] = request_page(entry[0], "")
+                        requested += 1
+
+        while frames:
+            if not frames[-1]:
+                frames.pop()
+                continue
+            prefix, page = frames[-1].popleft()
+            if page is None:
+                page = request_page(prefix, "")
+            else:
+                requested -= 1
+            sub_prefixes: Deque[List] = deque()
+            frames.append(sub_prefixes)
+            while page is not None:
+                urls, prefixes, next_marker = page.result()
+                # Request the following page and the first pages of upcoming prefixes before yielding
+                page = request_page(prefix, next_marker) if next_marker else None
+                sub_prefixes.extend([p, None] for p in prefixes)
+                request_ahead()
                 for url in urls:
                     if match_masks(url, self.masks):
                         yield url
-                if not urls:
-                    break
-            self.handler.clear_marker()
+
+    def _list(self) -> Iterator[str]:
+        if self.concurrency == 1:
+            for prefix in self.source_datapipe:
+                yield from self._list_prefix_serially(prefix)
+            return
+
+        pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        # Weakly referenced to drop the pages that have been yielded
+        pending_pages: "weakref.WeakSet[Future]" = weakref.WeakSet()
+
+        def request_page(prefix: str, marker: str) -> Future:
+            future = pool.submit(self.handler.list_files_page, prefix, marker, "/")
+            pending_pages.add(future)
+            return future
+
+        try:
+            for prefix in self.source_datapipe:
+                yield from self._list_prefix_concurrently(request_page, prefix)
+        finally:
+            for future in list(pending_pages):
+                future.cancel()
+            pool.shutdown(wait=True)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from iterate_with_manifest(self.manifest_path, self._list)
 
     def __len__(self) -> int:
         if self.length == -1:
@@ -96,6 +253,9 @@ class S3FileLoaderIterDataPipe(IterDataPipe[Tuple[str, StreamWrapper]]):
            configuration file or environment variables.
         3. The lack of AWS proper configuration can lead empty response. For more details related to S3 IO DataPipe
            setup and AWS config, please see the `README file`_.
+        4. With ``streaming=True``, each object is yielded as a seekable stream that issues byte-range
+           requests of at most ``buffer_size`` bytes on ``read``, so ``seek`` followed by ``read``
+           fetches only the requested range.
 
     .. _README file:
         https://github.com/pytorch/data/tree/main/torchdata/datapipes/iter/load#s3-io-datapipe-documentation
@@ -106,6 +266,10 @@ class S3FileLoaderIterDataPipe(IterDataPipe[Tuple[str, StreamWrapper]]):
         region: region for access files (inferred from credentials by default)
         buffer_size: buffer size of each chunk to download large files progressively (128Mb by default)
         multi_part_download: flag to split each chunk into small packets and download those packets in parallel (enabled by default)
+        concurrency: the number of objects being requested at the same time (1 by default)
+        in_order: if ``True`` (default), yields in the order of URLs. Otherwise, yields the
+            objects as soon as they are loaded when ``concurrency`` is greater than 1
+        streaming: flag to yield lazily-read streams instead of fully downloaded objects (disabled by default)
 
     Example:
         >>> from torchdata.datapipes.iter import IterableWrapper, S3FileLoader
@@ -131,6 +295,9 @@ class S3FileLoaderIterDataPipe(IterDataPipe[Tuple[str, StreamWrapper]]):
         region="",
         buffer_size=None,
         multi_part_download=None,
+        concurrency: int = 1,
+        in_order: bool = True,
+        streaming: bool = False,
     ) -> None:
         if not hasattr(torchdata, "_torchdata") or not hasattr(torchdata._torchdata, "S3Handler"):
             raise ModuleNotFoundError("TorchData must be built with BUILD_S3=1 to use this datapipe.")
@@ -141,10 +308,35 @@ class S3FileLoaderIterDataPipe(IterDataPipe[Tuple[str, StreamWrapper]]):
             self.handler.set_buffer_size(buffer_size)
         if multi_part_download:
             self.handler.set_multi_part_download(multi_part_download)
+        if concurrency < 1:
+            raise ValueError(f"Expected a positive concurrency, but got {concurrency}.")
+        self.concurrency = concurrency
+        self.in_order = in_order
+        self.streaming = streaming
+
+    def _load(self, url: str, chunk_size: Optional[int] = None) -> Tuple[str, StreamWrapper]:
+        if chunk_size is None:
+            return url, StreamWrapper(io.BytesIO(self.handler.s3_read(url)))
+        # Only the size is requested ahead, the content is read on demand
+        size = self.handler.get_file_size(url)
+        return url, StreamWrapper(
+            io.BufferedReader(_S3ObjectStream(self.handler, url, size, chunk_size), buffer_size=_S3_STREAM_READ_AHEAD)
+        )
 
     def __iter__(self) -> Iterator[Tuple[str, StreamWrapper]]:
-        for url in self.source_datapipe:
-            yield url, StreamWrapper(BytesIO(self.handler.s3_read(url)))
+        load_fn = partial(self._load, chunk_size=self.handler.get_buffer_size() if self.streaming else None)
+        if self.concurrency == 1:
+            for url in self.source_datapipe:
+                yield load_fn(url)
+        else:
+            # ``S3Handler`` releases the GIL while requests are in flight
+            yield from ParallelMapperIterDataPipe(
+                self.source_datapipe,
+                load_fn,
+                num_workers=self.concurrency,
+                max_inflight=self.concurrency,
+                in_order=self.in_order,
+            )
 
     def __len__(self) -> int:
         return len(self.source_datapipe)
@@ -5,9 +5,12 @@
 # LICENSE file in the root directory of this source tree.
 
 import warnings
-from typing import Callable, Hashable, Iterator, List, Optional, Set, Sized, TypeVar, Union
+from collections import deque
+from concurrent.futures import Executor, FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Hashable, Iterator, List, Optional, Set, Sized, TypeVar, Union
 
 from torch.utils.data import functional_datapipe, IterDataPipe
+from torch.utils.data.datapipes.iter import Mapper as MapperIterDataPipe
 from torch.utils.data.datapipes.utils.common import _check_unpickable_fn, validate_input_col
 
 T_co = TypeVar("T_co", covariant=True)
@@ -162,6 +165,134 @@ class FlatMapperIterDataPipe(IterDataPipe[T_co]):
         raise TypeError(f"{type(self).__name__}'s length relies on the output of its function.")
 
 
+class _MapFn:
+    r"""
+    Applies ``fn`` to an item with the implementation of ``Mapper``. Unlike a ``Mapper``, it can be
+    sent to the worker processes of ``ParallelMapper`` without the source DataPipe.
+    """
+    _apply_fn = MapperIterDataPipe._apply_fn
+
+    def __init__(self, fn: Callable, input_col, output_col) -> None:
+        self.fn = fn
+        self.input_col = input_col
+        self.output_col = output_col
+
+    def __call__(self, data):
+        return self._apply_fn(data)
+
+
+@functional_datapipe("pmap")
+class ParallelMapperIterDataPipe(MapperIterDataPipe):
+    r"""
+    Applies a function over each item from the source DataPipe concurrently on a pool of
+    threads or processes (functional name: ``pmap``). At most ``max_inflight`` items are
+    being processed at any time, so the source DataPipe is never read far ahead of the consumer.
+
+    Args:
+        datapipe: Source IterDataPipe
+        fn: Function being applied over each item
+        num_workers: Number of threads or processes running ``fn``
+        input_col: Index or indices of data which ``fn`` is applied, such as:
+            - ``None`` as default to apply ``fn`` to the data directly.
+            - Integer(s) is used for list/tuple.
+            - Key(s) is used for dict.
+        output_col: Index of data where result of ``fn`` is placed. ``output_col`` can be specified
+            only when ``input_col`` is not ``None``. It has the same semantics as ``Mapper``.
+        executor: ``"thread"`` (default) to run ``fn`` on a thread pool, or ``"process"`` to run it
+            on a process pool, in which case ``fn`` and the items must be picklable
+        max_inflight: Maximum number of items submitted to the pool but not yet yielded.
+            Defaults to ``2 * num_workers``
+        in_order: If ``True`` (default), items are yielded in the order of the source DataPipe.
+            Otherwise, items are yielded as soon as ``fn`` finishes with them
+
+    Example:
+        >>> from torchdata.datapipes.iter import IterableWrapper
+        >>> def add_one(x):
+        ...     return x + 1
+        >>> dp = IterableWrapper(range(10))
+        >>> pmap_dp = dp.pmap(add_one, num_workers=4)
+        >>> list(pmap_dp)
+        [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+
+    Note:
+        Exceptions raised by ``fn`` are re-raised when the corresponding item would be yielded.
+        A ``StopIteration`` raised by ``fn`` is re-raised as ``RuntimeError`` rather than silently
+        ending the iteration.
+    """
+    datapipe: IterDataPipe
+    fn: Callable
+
+    def __init__(
+        self,
+        datapipe: IterDataPipe,
+        fn: Callable,
+        num_workers: int = 4,
+        input_col=None,
+        output_col=None,
+        executor: str = "thread",
+        max_inflight: Optional[int] = None,
+        in_order: bool = True,
+    ) -> None:
+        super().__init__(datapipe, fn, input_col=input_col, output_col=output_col)
+        if num_workers < 1:
+            raise ValueError(f"Expected a positive num_workers, but got {num_workers}.")
+        self.num_workers = num_workers
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Expected executor to be 'thread' or 'process', but got {executor}.")
+        self.executor = executor
+        if max_inflight is None:
+            max_inflight = 2 * num_workers
+        if max_inflight < 1:
+            raise ValueError(f"Expected a positive max_inflight, but got {max_inflight}.")
+        self.max_inflight = max_inflight
+        self.in_order = in_order
+
+    def _result(self, future: Future):
+        try:
+            return future.result()
+        except StopIteration as e:
+            raise RuntimeError(f"The function of {type(self).__name__} raised StopIteration") from e
+
+    def __iter__(self) -> Iterator[T_co]:
+        pool: Executor
+        if self.executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=self.num_workers)
+        else:
+            pool = ProcessPoolExecutor(max_workers=self.num_workers)
+        apply_fn: Callable
+        if self.executor == "thread":
+            apply_fn = self._apply_fn
+        else:
+            # Only the function and the columns are sent to the worker processes
+            apply_fn = _MapFn(self.fn, self.input_col, self.output_col)
+        futures: Deque[Future] = deque()
+        try:
+            source_it = iter(self.datapipe)
+            exhausted = False
+            while True:
+                while not exhausted and len(futures) < self.max_inflight:
+                    try:
+                        data = next(source_it)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    futures.append(pool.submit(apply_fn, data))
+                if not futures:
+                    break
+                if self.in_order:
+                    future = futures.popleft()
+                else:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    # Yield the earliest submitted one among the completed futures
+                    future = next(f for f in futures if f in done)
+                    futures.remove(future)
+                yield self._result(future)
+        finally:
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=True)
+
+
 @functional_datapipe("drop")
 class DropperIterDataPipe(IterDataPipe[T_co]):
     r"""
@@ -6,15 +6,19 @@
 
 import hashlib
 import inspect
+import itertools
+import mmap
 import os.path
+import pickle
+import random
 import sys
 import time
 import uuid
 import warnings
 
-from collections import deque
+from collections import OrderedDict
 from functools import partial
-from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
 
 try:
     import portalocker
@@ -26,12 +30,16 @@ except ImportError as e:
         )
     raise
 
+import torch
 
 from torch.utils.data.datapipes.utils.common import _check_unpickable_fn, DILL_AVAILABLE
 
 from torch.utils.data.graph import traverse_dps
 from torchdata.datapipes import functional_datapipe
 from torchdata.datapipes.iter import IterableWrapper, IterDataPipe
+from torchdata.datapipes.utils import _cache_index
+from torchdata.datapipes.utils._cache_index import CacheIndex
+from torchdata.datapipes.utils._shared_cache import SharedStore
 
 if DILL_AVAILABLE:
     import dill
@@ -42,6 +50,8 @@ T_co = TypeVar("T_co", covariant=True)
 
 PROMISE_FILE_DELETE_TIMEOUT = 30
 PROMISE_FILE_DELETE_RETRY_INTERVAL = 0.005
+PENDING_ITEM_MIN_INTERVAL = 0.001
+PENDING_ITEM_MAX_INTERVAL = 0.1
 
 from enum import IntEnum
 
@@ -52,16 +62,62 @@ class CacheState(IntEnum):
     CACHED_MULTIPLE_ENTITIES = 2
 
 
+def _payload_size(data: Any) -> int:
+    r"""
+    Estimates the number of bytes held by ``data``, counting the buffers of tensors, arrays and bytes
+    rather than the size of the Python objects referring to them.
+    """
+    if isinstance(data, torch.Tensor):
+        return data.element_size() * data.nelement()
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if isinstance(data, memoryview):
+        return data.nbytes
+    if isinstance(data, str):
+        return sys.getsizeof(data)
+    nbytes = getattr(data, "nbytes", None)  # e.g. numpy arrays
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(data, dict):
+        return sys.getsizeof(data) + sum(_payload_size(k) + _payload_size(v) for k, v in data.items())
+    if isinstance(data, (list, tuple, set, frozenset)):
+        return sys.getsizeof(data) + sum(_payload_size(d) for d in data)
+    return sys.getsizeof(data)
+
+
 @functional_datapipe("in_memory_cache")
 class InMemoryCacheHolderIterDataPipe(IterDataPipe[T_co]):
     r"""
     Stores elements from the source DataPipe in memory, up to a size limit
-    if specified (functional name: ``in_memory_cache``). This cache is FIFO - once the cache is full,
-    further elements will not be added to the cache until the previous ones are yielded and popped off from the cache.
+    if specified (functional name: ``in_memory_cache``). Once the cache is full, elements are evicted
+    or left out according to ``policy``.
+
+    When iterated again, cached elements are served from memory and the source DataPipe is only read
+    up to the last element missing from the cache. Only the ``"fifo"`` policy keeps the missing elements
+    at the start of the source, the other policies leave out elements up to its end, so the source is still
+    read in full on every epoch.
 
     Args:
         source_dp: source DataPipe from which elements are read and stored in memory
         size: The maximum size (in megabytes) that this DataPipe can hold in memory. This defaults to unlimited.
+        size_fn: Function returning the size in bytes of an element. By default, the bytes held by tensors,
+            arrays, bytes and strings are counted, recursing into lists, tuples and dictionaries.
+        policy: What to do with new elements once the cache is full:
+
+            - ``"fifo"`` (default): evict the oldest elements, keeping the tail of the source in memory.
+              Only the uncached head is read from the source again.
+            - ``"keep_head"``: keep the elements already cached and leave out new ones. This doesn't save any
+              reads of the source once the cache is full.
+            - ``"random"``: keep a uniformly random sample of the elements, seeded like ``shuffle`` by
+              ``DataLoader2``. This doesn't save any reads of the source either once the cache is full.
+
+        shared: Set to ``True`` to share the cache between all processes of a node, e.g. the worker processes
+            of ``PrototypeMultiProcessingReadingService``. The source DataPipe is read by a single process
+            while the others read the serialized elements from shared memory, so this should be placed
+            before ``sharding_filter`` for every worker to reuse all of them. Once ``size`` is reached, the oldest
+            elements are evicted as with the ``"fifo"`` policy, so that each process only reads the uncached head
+            from the source again. ``policy`` and ``size_fn`` don't apply as the serialized size is used.
+        timeout: Seconds to wait for the process reading the source DataPipe to make progress when ``shared``
 
     Example:
         >>> from torchdata.datapipes.iter import IterableWrapper
@@ -71,44 +127,186 @@ class InMemoryCacheHolderIterDataPipe(IterDataPipe[T_co]):
         [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
     """
     size: Optional[int] = None
-    idx: int
 
-    def __init__(self, source_dp: IterDataPipe[T_co], size: Optional[int] = None) -> None:
+    def __init__(
+        self,
+        source_dp: IterDataPipe[T_co],
+        size: Optional[int] = None,
+        size_fn: Optional[Callable[[Any], int]] = None,
+        policy: str = "fifo",
+        shared: bool = False,
+        timeout: float = 300,
+    ) -> None:
         self.source_dp: IterDataPipe[T_co] = source_dp
         # cache size in MB
         if size is not None:
             self.size = size * 1024 * 1024
-        self.cache: Optional[Deque] = None
-        self.idx: int = 0
+        if size_fn is not None:
+            _check_unpickable_fn(size_fn)
+        self.size_fn = size_fn
+        if policy not in ("fifo", "keep_head", "random"):
+            raise ValueError(f"Invalid policy {policy}, should be one of {('fifo', 'keep_head', 'random')}")
+        self.policy = policy
+        # Maps the position of each cached element in the source to the element
+        self.cache: Optional[Dict[int, T_co]] = None
+        self._length: int = 0
+        self._last_uncached: int = -1
+        self._seed: Optional[int] = None
+        self._rng = random.Random()
+        self.timeout = timeout
+        self._store: Optional[SharedStore] = None
+        if shared:
+            self._store = SharedStore.create("torchdata_in_memory_cache", max_size=self.size)
+
+    def set_seed(self, seed: int):
+        self._seed = seed
+        return self
+
+    def reset(self) -> None:
+        if self.policy == "random" and self.cache is None:
+            if self._seed is None:
+                self._seed = int(torch.empty((), dtype=torch.int64).random_().item())
+            self._rng.seed(self._seed)
+            self._seed = None
+
+    def _fill(self) -> Iterator[T_co]:
+        size_fn = _payload_size if self.size_fn is None else self.size_fn
+        cache: Dict[int, T_co] = OrderedDict()
+        sizes: Dict[int, int] = {}
+        # Positions of the cached elements, to pick random ones in constant time
+        positions: List[int] = []
+        total = 0
+        length = 0
+        full = False
+        for idx, data in enumerate(self.source_dp):
+            length = idx + 1
+            if full:
+                yield data
+                continue
+            data_size = 0 if self.size is None else size_fn(data)
+            if self.size is not None and total + data_size > self.size:
+                if self.policy == "keep_head":
+                    full = True
+                    yield data
+                    continue
+                if self.policy == "random":
+                    # Reservoir sampling, the new element replaces random ones with probability k / n
+                    if data_size > self.size or self._rng.random() >= len(cache) / length:
+                        yield data
+                        continue
+                    while positions and total + data_size > self.size:
+                        i = self._rng.randrange(len(positions))
+                        positions[i], positions[-1] = positions[-1], positions[i]
+                        evicted = positions.pop()
+                        del cache[evicted]
+                        total -= sizes.pop(evicted)
+                    positions.append(idx)
+            elif self.policy == "random":
+                positions.append(idx)
+            cache[idx] = data
+            sizes[idx] = data_size
+            total += data_size
+            if self.policy == "fifo":
+                while self.size is not None and total > self.size:
+                    evicted, _ = cache.popitem(last=False)  # type: ignore[call-arg]
+                    total -= sizes.pop(evicted)
+            yield data
+        self.cache = cache
+        self._length = length
+        self._last_uncached = max((idx for idx in range(length) if idx not in cache), default=-1)
+
+    def _iter_shared(self, store: SharedStore) -> Iterator[T_co]:
+        idx = 0
+        start = time.time()
+        interval = PENDING_ITEM_MIN_INTERVAL
+        while True:
+            published = store.published()
+            if idx < published:
+                start, interval = time.time(), PENDING_ITEM_MIN_INTERVAL
+            while idx < published:
+                payload = store.read(idx)
+                if payload is None:
+                    for data in self._iter_evicted(store, idx):
+                        yield data
+                        idx += 1
+                    continue
+                yield pickle.loads(payload)
+                idx += 1
+            completed = store.completed()
+            if completed is not None:
+                if idx < completed[0]:
+                    continue
+                return
+            if store.acquire():
+                if store.completed() is not None:
+                    # The previous writer completed the store before releasing the lock
+                    store.release()
+                    continue
+                try:
+                    yield from self._fill_shared(store, idx)
+                finally:
+                    store.release()
+                return
+            # Another process is reading the source
+            if time.time() - start > self.timeout:
+                raise TimeoutError(
+                    f"Shared in-memory cache made no progress in {self.timeout} seconds, "
+                    "while expecting the source DataPipe to be read by another process."
+                )
+            time.sleep(interval)
+            interval = min(interval * 2, PENDING_ITEM_MAX_INTERVAL)
+
+    def _iter_evicted(self, store: SharedStore, idx: int) -> Iterator[T_co]:
+        # Evicted elements are read from the source, which stops at the oldest element kept.
+        # Only a process falling behind the writer by more than the size limit skips elements to get there.
+        first = store.first()
+        for data in itertools.islice(self.source_dp, idx, None):
+            yield data
+            idx += 1
+            if idx >= first:
+                first = store.first()
+                if idx >= first:
+                    return
+
+    def _fill_shared(self, store: SharedStore, idx: int) -> Iterator[T_co]:
+        it = iter(self.source_dp)
+        # Elements published by a previous writer which stopped early aren't appended again
+        published = store.published()
+        for position, data in zip(range(published), it):
+            if position >= idx:
+                yield data
+        idx = max(idx, published)
+        for data in it:
+            store.append(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+            idx += 1
+            yield data
+        store.complete(idx)
 
     def __iter__(self) -> Iterator[T_co]:
-        if self.cache:
+        if self._store is not None:
+            yield from self._iter_shared(self._store)
+            return
+        if self.cache is None:
+            yield from self._fill()
+            return
+        cache = self.cache
+        if self._last_uncached >= 0:
             for idx, data in enumerate(self.source_dp):
-                if idx < self.idx:
-                    yield data
-                else:
+                yield cache[idx] if idx in cache else data
+                if idx == self._last_uncached:
                     break
-            yield from self.cache
-        else:
-            # Local cache
-            cache: Deque = deque()
-            idx = 0
-            for data in self.source_dp:
-                cache.append(data)
-                # Cache reaches limit
-                if self.size is not None and sys.getsizeof(cache) > self.size:
-                    cache.popleft()
-                    idx += 1
-                yield data
-            self.cache = cache
-            self.idx = idx
+        for idx in range(self._last_uncached + 1, self._length):
+            yield cache[idx]
 
     def __len__(self) -> int:
         try:
             return len(self.source_dp)
         except TypeError:
-            if self.cache:
-                return self.idx + len(self.cache)
+            completed = self._store.completed() if self._store is not None else None
+            if completed is not None:
+                return completed[0]
+            if self.cache is not None:
+                return self._length
             else:
                 raise TypeError(f"{type(self).__name__} instance doesn't have valid length until the cache is loaded.")
 
@@ -167,6 +365,19 @@ class OnDiskCacheHolderIterDataPipe(IterDataPipe):
         hash_type: The type of hash function to apply
         extra_check_fn: Optional function to carry out extra validation on
             the given file path from ``filepath_fn``.
+        index_path: Optional path of an SQLite database used as the index of the cache. When specified,
+            the state of every item is tracked in this single index instead of promise and list files
+            next to the cached files, so checking and claiming an item doesn't touch the cached files.
+            The index is authoritative: files removed from the cache have to be removed from it as well.
+            Results are written to temporary files and renamed once complete. Items being written by
+            other processes, including other pipelines sharing the index, are waited for as long as
+            the process writing them is alive.
+        max_cache_size: Optional capacity of the cache in bytes. When the cache grows beyond it, the least
+            recently used items are evicted and their files removed. Requires ``index_path``.
+        max_cache_files: Optional capacity of the cache in number of files, evicted like ``max_cache_size``.
+            Requires ``index_path``.
+        eviction_grace_period: Items accessed within this number of seconds are not evicted, so that files
+            just served from the cache can still be opened. The cache may exceed its capacity in the meantime.
 
     Example:
         >>> from torchdata.datapipes.iter import IterableWrapper, HttpReader
@@ -189,6 +400,10 @@ class OnDiskCacheHolderIterDataPipe(IterDataPipe):
         hash_dict: Dict[str, str] = None,
         hash_type: str = "sha256",
         extra_check_fn: Optional[Callable[[str], bool]] = None,
+        index_path: Optional[str] = None,
+        max_cache_size: Optional[int] = None,
+        max_cache_files: Optional[int] = None,
+        eviction_grace_period: float = 10.0,
     ):
         self.source_datapipe = source_datapipe
 
@@ -203,7 +418,27 @@ class OnDiskCacheHolderIterDataPipe(IterDataPipe):
         # same graph but different nodes of distributed system
         self._uuid = uuid.uuid4()
 
-        OnDiskCacheHolderIterDataPipe._temp_dict[self] = (filepath_fn, hash_dict, hash_type, extra_check_fn, self._uuid)
+        if index_path is None and (max_cache_size is not None or max_cache_files is not None):
+            raise ValueError("`max_cache_size` and `max_cache_files` require `index_path` to be specified")
+        if index_path is not None:
+            self._index: Optional[CacheIndex] = CacheIndex(
+                index_path,
+                max_size=max_cache_size,
+                max_files=max_cache_files,
+                eviction_grace_period=eviction_grace_period,
+            )
+        else:
+            self._index = None
+        index = self._index
+
+        OnDiskCacheHolderIterDataPipe._temp_dict[self] = (
+            filepath_fn,
+            hash_dict,
+            hash_type,
+            extra_check_fn,
+            self._uuid,
+            index,
+        )
 
         self._end_caching_flag: bool = False
         self._download_everything = False  # This is internal field used for load testing only
@@ -218,13 +453,27 @@ class OnDiskCacheHolderIterDataPipe(IterDataPipe):
     def __add__(self, other_datapipe):
         raise RuntimeError("`OnDiskCacheHolder` doesn't support add operation")
 
+    def cache_stats(self) -> Dict[str, int]:
+        r"""
+        Returns the ``hits``, ``misses`` and ``evictions`` of the cache across all processes, along with
+        its current ``size`` in bytes and number of ``files``. Only available with ``index_path``.
+        """
+        if self._index is None:
+            raise RuntimeError("`cache_stats` requires `index_path` to be specified")
+        return self._index.stats()
+
     # Since Demux is using this function, we should not attach it to OnDiskCacheHolder instance.
     # Otherwise, it would cause infinite recursion in graph traversal
     @staticmethod
-    def _cache_check_fn(data, filepath_fn, hash_dict, hash_type, extra_check_fn, cache_uuid):
+    def _cache_check_fn(data, filepath_fn, hash_dict, hash_type, extra_check_fn, cache_uuid, index=None):
         filepath = data if filepath_fn is None else filepath_fn(data)
         assert not isinstance(filepath, (list, tuple))  # BC breaking, now only str is accepted as return
 
+        if index is not None:
+            return OnDiskCacheHolderIterDataPipe._index_cache_check_fn(
+                filepath, hash_dict, hash_type, extra_check_fn, cache_uuid, index
+            )
+
         result = CacheState.CACHED_SINGLE_ENTITY
         cached_file_exists = True
         if os.path.exists(_get_list_filename(filepath)):
@@ -266,10 +515,41 @@ class OnDiskCacheHolderIterDataPipe(IterDataPipe):
 
         return int(result)
 
-    def _end_caching(self):
-        filepath_fn, hash_dict, hash_type, extra_check_fn, cache_uuid = OnDiskCacheHolderIterDataPipe._temp_dict.pop(
-            self
-        )
+    @staticmethod
+    def _index_cache_check_fn(filepath, hash_dict, hash_type, extra_check_fn, cache_uuid, index):
+        owner = str(cache_uuid)
+        # Lookups only read the index, the write lock is taken when an item has to be claimed,
+        # or when a hit has to refresh the access time used for eviction
+        row = index.lookup(filepath)
+        if row is not None:
+            state, shard, claimed = row
+            if state == _cache_index.CACHED_MULTIPLE_ENTITIES:
+                index.hit(filepath)
+                return int(CacheState.CACHED_MULTIPLE_ENTITIES)
+            if claimed:
+                # Being written by another worker, of this pipeline or of another one
+                return int(CacheState.CACHED_SINGLE_ENTITY)
+            if state == _cache_index.CACHED_SINGLE_ENTITY:
+                # Packed items have been checked before being written and have no file of their own
+                if shard is not None or (
+                    (hash_dict is None or _hash_check(filepath, hash_dict, hash_type))
+                    and (extra_check_fn is None or extra_check_fn(filepath))
+                ):
+                    index.hit(filepath)
+                    return int(CacheState.CACHED_SINGLE_ENTITY)
+        if index.claim(filepath, owner):
+            return int(CacheState.UNCACHED)
+        return int(CacheState.CACHED_SINGLE_ENTITY)
+
+    def _end_caching(self, packed=False):
+        (
+            filepath_fn,
+            hash_dict,
+            hash_type,
+            extra_check_fn,
+            cache_uuid,
+            index,
+        ) = OnDiskCacheHolderIterDataPipe._temp_dict.pop(self)
 
         todo_dp: Any
         cached_dp: Any
@@ -292,13 +572,15 @@ class OnDiskCacheHolderIterDataPipe(IterDataPipe):
                     hash_type=hash_type,
                     extra_check_fn=extra_check_fn,
                     cache_uuid=cache_uuid,
+                    index=index,
                 ),
             )
         # Cached: keep filepath(s)
         cached_dp = cached_dp.map(fn=filepath_fn)
 
         one_many_cached_dp = one_many_cached_dp.map(fn=filepath_fn)
-        one_many_cached_dp = _ExtractFilesFromList(one_many_cached_dp)
+        if not packed:
+            one_many_cached_dp = _ExtractFilesFromList(one_many_cached_dp, index=index)
 
         self.source_datapipe = todo_dp.memory_cell()
         self._end_caching_flag = True
@@ -317,12 +599,25 @@ def _is_promise_pending(promise_filename):
     return os.path.exists(promise_filename)
 
 
+def _file_size(filename):
+    try:
+        return os.path.getsize(filename)
+    except OSError:
+        return 0
+
+
+def _is_index_entry_pending(index, filename):
+    row = index.lookup(filename)
+    return row is not None and row[0] == _cache_index.PENDING
+
+
 class _WaitPendingCacheItemIterDataPipe(IterDataPipe):
-    def __init__(self, source_datapipe, timeout=300, input_col=None, cache_uuid=None):
+    def __init__(self, source_datapipe, timeout=300, input_col=None, cache_uuid=None, index=None):
         self.source_datapipe = source_datapipe
         self.timeout = timeout
         self.input_col = input_col
         self._cache_uuid = cache_uuid
+        self._index = index
 
     def set_timeout(self, timeout):
         self.timeout = timeout
@@ -333,10 +628,16 @@ class _WaitPendingCacheItemIterDataPipe(IterDataPipe):
                 filename = data[self.input_col]
             else:
                 filename = data
-            promise_filename = _promise_filename(filename, self._cache_uuid)
+            if self._index is not None:
+                is_pending = partial(_is_index_entry_pending, self._index, filename)
+            else:
+                is_pending = partial(_is_promise_pending, _promise_filename(filename, self._cache_uuid))
             start = time.time()
-            while _is_promise_pending(promise_filename):
-                time.sleep(0.01)
+            interval = PENDING_ITEM_MIN_INTERVAL
+            while is_pending():
+                time.sleep(interval)
+                # Back off, so that waiting on items that take long to be written stays cheap
+                interval = min(interval * 2, PENDING_ITEM_MAX_INTERVAL)
                 if time.time() - start > self.timeout:
                     raise Exception(
                         f"OnDiskCache Exception: {filename} expected to be written by different process, "
@@ -380,11 +681,16 @@ def _get_list_filename(file_name):
 
 
 class _ExtractFilesFromList(IterDataPipe):
-    def __init__(self, source_datapipe):
+    def __init__(self, source_datapipe, index=None):
         self.source_datapipe = source_datapipe
+        self._index = index
 
     def __iter__(self):
         for filename in self.source_datapipe:
+            if self._index is not None:
+                for inner_file_name in self._index.members(filename):
+                    yield filename, inner_file_name
+                continue
             with open(_get_list_filename(filename)) as fh:
                 for line in fh:
                     inner_file_name = line.rstrip()
@@ -392,11 +698,13 @@ class _ExtractFilesFromList(IterDataPipe):
 
 
 class _FulfilledPromisesIterDataPipe(IterDataPipe):
-    def __init__(self, source_datapipe, memory_cell_dp, first_filepath_fn, cache_uuid):
+    def __init__(self, source_datapipe, memory_cell_dp, first_filepath_fn, cache_uuid, index=None, pack_dp=None):
         self.source_datapipe = source_datapipe
         self.memory_cell_dp = memory_cell_dp
         self.first_filepath_fn = first_filepath_fn
         self._cache_uuid = cache_uuid
+        self._index = index
+        self._pack_dp = pack_dp
 
     @staticmethod
     def _del_promise_file(promise_filename, filename):
@@ -422,12 +730,34 @@ class _FulfilledPromisesIterDataPipe(IterDataPipe):
         last_record_uuid = None
         one_to_many_detected = False
         one_to_one_detected = False
+        # Files yielded for each pending record, only used with the index
+        pending_members: Dict[str, List[str]] = {}
 
         def fulfill_old_promises(buffer, last_record_uuid, first_filepath_fn, cache_uuid):
+            owner = str(cache_uuid)
             for old_rec_uuid, old_rec in buffer:
                 original_file_name = first_filepath_fn(old_rec)
-                old_promise_filename = _promise_filename(original_file_name, cache_uuid)
-                self._del_promise_file(old_promise_filename, original_file_name)
+                if self._pack_dp is not None:
+                    members = pending_members.pop(original_file_name, [])
+                    if one_to_many_detected:
+                        locations = [self._pack_dp.locations.pop(member) for member in members]
+                        size = sum(location[2] for location in locations)
+                        self._index.fulfill(original_file_name, owner, members, size=size, locations=locations)
+                    else:
+                        location = self._pack_dp.locations.pop(original_file_name, None)
+                        if location is None:
+                            self._index.fulfill(original_file_name, owner)
+                        else:
+                            self._index.fulfill(original_file_name, owner, size=location[2], locations=[location])
+                elif self._index is not None:
+                    members = pending_members.pop(original_file_name, [])
+                    if one_to_many_detected:
+                        self._index.fulfill(original_file_name, owner, members, size=sum(map(_file_size, members)))
+                    else:
+                        self._index.fulfill(original_file_name, owner, size=_file_size(original_file_name))
+                else:
+                    old_promise_filename = _promise_filename(original_file_name, cache_uuid)
+                    self._del_promise_file(old_promise_filename, original_file_name)
                 if old_rec_uuid == last_record_uuid:
                     break
                 # TODO(VitalyFedyunin): If no match found, that means we exceeded length of memory_cell
@@ -435,7 +765,8 @@ class _FulfilledPromisesIterDataPipe(IterDataPipe):
 
         try:
 
-            for filename in self.source_datapipe:
+            for data in self.source_datapipe:
+                filename = data if self._pack_dp is None else data[0]
                 rec_uuid, record = self.memory_cell_dp.get_last()
                 original_file_name = self.first_filepath_fn(record)
                 # TODO(VitalyFedyunin): For debug mode we can detect duplicate keys situations here and warn user
@@ -445,8 +776,11 @@ class _FulfilledPromisesIterDataPipe(IterDataPipe):
                     if one_to_one_detected:
                         raise Exception("Disovered different keys when one-to-one mode previously assumed")
                     # We are dealing with one-to-many situation now
-                    with open(_get_list_filename(original_file_name), "a") as fh:
-                        fh.write(f"{filename}\n")
+                    if self._index is not None:
+                        pending_members.setdefault(original_file_name, []).append(filename)
+                    else:
+                        with open(_get_list_filename(original_file_name), "a") as fh:
+                            fh.write(f"{filename}\n")
                 else:
                     one_to_one_detected = True
                     if one_to_many_detected:
@@ -457,18 +791,123 @@ class _FulfilledPromisesIterDataPipe(IterDataPipe):
                         self.memory_cell_dp.get_buffer()[1:], last_record_uuid, self.first_filepath_fn, self._cache_uuid
                     )
                     last_record_uuid = rec_uuid
-                yield filename
+                    if self._pack_dp is not None:
+                        self._pack_dp.seal(current=False)
+                yield data
         finally:
             if last_record_uuid is not None:
                 fulfill_old_promises(
                     self.memory_cell_dp.get_buffer(), last_record_uuid, self.first_filepath_fn, self._cache_uuid
                 )
+            if self._pack_dp is not None:
+                self._pack_dp.seal(current=True)
 
 
 def _leave_second(x):
     return x[1]
 
 
+class _PackIntoShardsIterDataPipe(IterDataPipe):
+    r"""
+    Appends the data of each ``(filename, data)`` pair to shard files within ``pack_dir`` instead of
+    writing a file per item, and keeps the location of each of them until its promise is fulfilled.
+    """
+
+    def __init__(self, source_datapipe, pack_dir, max_shard_size, index):
+        self.source_datapipe = source_datapipe
+        self.pack_dir = pack_dir
+        self.max_shard_size = max_shard_size
+        self._index = index
+        self.locations: Dict[str, Tuple[str, int, int]] = {}
+        self._shard: Optional[str] = None
+        self._rolled_over: List[str] = []
+
+    def _roll_over(self):
+        if self._shard is not None:
+            self._rolled_over.append(self._shard)
+        os.makedirs(self.pack_dir, exist_ok=True)
+        self._shard = os.path.join(self.pack_dir, f"{uuid.uuid4().hex}.shard")
+        self._index.register_shard(self._shard)
+
+    def seal(self, current):
+        # Shards are sealed once all their items are fulfilled, so eviction may remove them afterwards
+        shards = self._rolled_over
+        if current and self._shard is not None:
+            shards.append(self._shard)
+            self._shard = None
+        if shards:
+            self._index.seal_shards(shards)
+        self._rolled_over = []
+
+    def __iter__(self):
+        fh = None
+        try:
+            for filename, data in self.source_datapipe:
+                payload = data.encode() if isinstance(data, str) else data
+                if fh is not None and fh.tell() > 0 and fh.tell() + len(payload) > self.max_shard_size:
+                    fh.close()
+                    fh = None
+                    self._roll_over()
+                if fh is None:
+                    if self._shard is None:
+                        self._roll_over()
+                    fh = open(self._shard, "ab")
+                offset = fh.tell()
+                fh.write(payload)
+                # Items have to be readable by other processes as soon as they are fulfilled
+                fh.flush()
+                self.locations[filename] = (self._shard, offset, len(payload))
+                yield filename, data
+        finally:
+            if fh is not None:
+                fh.close()
+
+
+class _ReadFromShardsIterDataPipe(IterDataPipe):
+    def __init__(self, source_datapipe, index, mode):
+        self.source_datapipe = source_datapipe
+        self._index = index
+        self.mode = mode
+
+    def __iter__(self):
+        shards: Dict[str, mmap.mmap] = {}
+        try:
+            for filename in self.source_datapipe:
+                locations = self._index.locate(filename)
+                if not locations:
+                    raise RuntimeError(
+                        f"Cached item {filename} was evicted before being read, "
+                        "please increase `eviction_grace_period` of `on_disk_cache`"
+                    )
+                for name, shard, offset, size in locations:
+                    if shard is None:
+                        # Fulfilled by an `end_caching` without packing sharing the same index
+                        with open(name, "rt" if "t" in self.mode else "rb") as f:
+                            yield name, f.read()
+                        continue
+                    if size == 0:
+                        data = b""
+                    else:
+                        if shard not in shards:
+                            with open(shard, "rb") as f:
+                                shards[shard] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                        data = shards[shard][offset : offset + size]
+                    yield name, data.decode() if "t" in self.mode else data
+        finally:
+            for m in shards.values():
+                m.close()
+
+
+def _temp_filename(filename, cache_uuid):
+    return f"{filename}.{cache_uuid}.tmp"
+
+
+def _rename_temp_file(temp_filename):
+    filename = temp_filename.rsplit(".", 2)[0]
+    os.replace(temp_filename, filename)
+    return filename
+
+
 @functional_datapipe("end_caching")
 class EndOnDiskCacheHolderIterDataPipe(IterDataPipe):
     """
@@ -486,6 +925,11 @@ class EndOnDiskCacheHolderIterDataPipe(IterDataPipe):
         skip_read: Boolean value to skip reading the file handle from ``datapipe``.
             By default, reading is enabled and reading function is created based on the ``mode``.
         timeout: Integer value of seconds to wait for uncached item to be written to disk
+        pack_dir: Optional directory to pack the results into, appending them to shard files of up to
+            ``max_shard_size`` bytes instead of writing a file per item. Requires ``index_path`` to be
+            specified in ``on_disk_cache``, which stores the location of every item. The results are
+            then yielded as tuples of file path and data read back from the shard files, rather than file paths.
+        max_shard_size: Size in bytes at which a new shard file is started when packing
 
     Example:
         >>> from torchdata.datapipes.iter import IterableWrapper, HttpReader
@@ -500,7 +944,18 @@ class EndOnDiskCacheHolderIterDataPipe(IterDataPipe):
         >>> cache_dp = HttpReader(cache_dp).end_caching(mode="wb", filepath_fn=_filepath_fn)
     """
 
-    def __new__(cls, datapipe, mode="wb", filepath_fn=None, *, same_filepath_fn=False, skip_read=False, timeout=300):
+    def __new__(
+        cls,
+        datapipe,
+        mode="wb",
+        filepath_fn=None,
+        *,
+        same_filepath_fn=False,
+        skip_read=False,
+        timeout=300,
+        pack_dir=None,
+        max_shard_size=256 * 1024 * 1024,
+    ):
         if filepath_fn is not None and same_filepath_fn:
             raise ValueError("`filepath_fn` is mutually exclusive with `same_filepath_fn`")
 
@@ -512,15 +967,27 @@ class EndOnDiskCacheHolderIterDataPipe(IterDataPipe):
         if cache_holder._end_caching_flag:
             raise RuntimeError("`end_caching` can only be invoked once per `OnDiskCacheHolder`")
 
-        first_filepath_fn, _hash_dict, _hash_type, _, cache_uuid = OnDiskCacheHolderIterDataPipe._temp_dict[
+        first_filepath_fn, _hash_dict, _hash_type, _, cache_uuid, index = OnDiskCacheHolderIterDataPipe._temp_dict[
             cache_holder
         ]
-        cached_dp, one_many_cached_dp = cache_holder._end_caching()
-        cached_dp = _WaitPendingCacheItemIterDataPipe(cached_dp, timeout=timeout, cache_uuid=cache_uuid)
-        one_many_cached_dp = _WaitPendingCacheItemIterDataPipe(
-            one_many_cached_dp, timeout=timeout, cache_uuid=cache_uuid, input_col=0
-        )
-        one_many_cached_dp = one_many_cached_dp.map(_leave_second)
+        if pack_dir is not None and index is None:
+            raise ValueError("`pack_dir` requires `index_path` to be specified in `on_disk_cache`")
+        if max_shard_size <= 0:
+            raise ValueError(f"'max_shard_size' is required to be a positive integer, but {max_shard_size} is found.")
+        cached_dp, one_many_cached_dp = cache_holder._end_caching(packed=pack_dir is not None)
+        cached_dp = _WaitPendingCacheItemIterDataPipe(cached_dp, timeout=timeout, cache_uuid=cache_uuid, index=index)
+        if pack_dir is not None:
+            # Members of one-to-many items are read together from the index of their original item
+            one_many_cached_dp = _WaitPendingCacheItemIterDataPipe(
+                one_many_cached_dp, timeout=timeout, cache_uuid=cache_uuid, index=index
+            )
+            cached_dp = _ReadFromShardsIterDataPipe(cached_dp, index, mode)
+            one_many_cached_dp = _ReadFromShardsIterDataPipe(one_many_cached_dp, index, mode)
+        else:
+            one_many_cached_dp = _WaitPendingCacheItemIterDataPipe(
+                one_many_cached_dp, timeout=timeout, cache_uuid=cache_uuid, input_col=0, index=index
+            )
+            one_many_cached_dp = one_many_cached_dp.map(_leave_second)
         memory_cell_dp = cache_holder.source_datapipe
 
         if same_filepath_fn:
@@ -541,8 +1008,19 @@ class EndOnDiskCacheHolderIterDataPipe(IterDataPipe):
         if _hash_dict is not None:
             todo_dp = todo_dp.check_hash(_hash_dict, _hash_type)
 
-        todo_dp = todo_dp.save_to_disk(mode=mode)
-        todo_dp = _FulfilledPromisesIterDataPipe(todo_dp, memory_cell_dp, first_filepath_fn, cache_uuid=cache_uuid)
+        pack_dp = None
+        if pack_dir is not None:
+            todo_dp = pack_dp = _PackIntoShardsIterDataPipe(todo_dp, pack_dir, max_shard_size, index)
+        elif index is not None:
+            # Readers trust the index, so files only appear under their final name once fully written
+            todo_dp = todo_dp.map(fn=partial(_temp_filename, cache_uuid=cache_uuid), input_col=0)
+            todo_dp = todo_dp.save_to_disk(mode=mode)
+            todo_dp = todo_dp.map(fn=_rename_temp_file)
+        else:
+            todo_dp = todo_dp.save_to_disk(mode=mode)
+        todo_dp = _FulfilledPromisesIterDataPipe(
+            todo_dp, memory_cell_dp, first_filepath_fn, cache_uuid=cache_uuid, index=index, pack_dp=pack_dp
+        )
 
         # TODO(VitalyFedyunin): This impacts determinism for partial cache situations
         return todo_dp.concat(cached_dp).concat(one_many_cached_dp)
@@ -4,9 +4,18 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import array
+import hashlib
+import json
+import mmap
+import operator
+import os
+import pickle
 import warnings
 
-from typing import Callable, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+
+import portalocker
 
 from torch.utils.data import IterDataPipe, MapDataPipe
 from torch.utils.data.datapipes.utils.common import _check_unpickable_fn, DILL_AVAILABLE
@@ -16,6 +25,154 @@ if DILL_AVAILABLE:
 
     dill.extend(use_dill=False)
 
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ModuleNotFoundError:
+    HAS_NUMPY = False
+
+
+def _int_key(key) -> Optional[int]:
+    # Integer-like keys, e.g. NumPy integers, are the same key as the equal `int`, as in a dictionary
+    try:
+        return operator.index(key)
+    except TypeError:
+        return None
+
+
+def _key_digest(key) -> int:
+    # Stable across processes, unlike `hash`
+    int_key = _int_key(key)
+    data = pickle.dumps(key if int_key is None else int_key, protocol=4)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def _read_key(f, start: int, end: int):
+    f.seek(start)
+    key, _ = pickle.loads(f.read(end - start))
+    return key
+
+
+class _ArrayMap:
+    r"""
+    Read-only mapping stored in the directory ``path``. Keys are kept in a sorted NumPy array, which is
+    binary searched on lookup. Integer keys are stored as they are, other keys as a 64-bit digest.
+    Keys and values are pickled together into a values file, so that a lookup with a colliding digest
+    is detected. Distinct keys with the same digest can't be stored together, which raises while building.
+    All files are memory-mapped, so processes using the same ``path`` share their pages.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._keys = None
+        self._starts = None
+        self._lengths = None
+        self._values: Optional[mmap.mmap] = None
+        self._int_keys = True
+        self._length = 0
+
+    def __getstate__(self):
+        # Only the location is sent to other processes, the files are mapped again there
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+        self._open()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _open(self) -> None:
+        with open(self._file("complete")) as f:
+            state = json.load(f)
+        self._int_keys, self._length = state["int_keys"], state["length"]
+        self._keys = np.load(self._file("keys.npy"), mmap_mode="r")
+        self._starts = np.load(self._file("starts.npy"), mmap_mode="r")
+        self._lengths = np.load(self._file("lengths.npy"), mmap_mode="r")
+        if os.path.getsize(self._file("values.bin")) > 0:
+            with open(self._file("values.bin"), "rb") as f:
+                self._values = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def load_or_build(cls, path: str, key_values: Callable[[], Iterator[Tuple[Any, Any]]]) -> "_ArrayMap":
+        r"""
+        Opens the mapping in ``path``, after building it from the pairs of ``key_values`` unless a previous
+        build has completed. Concurrent processes wait for the one building it.
+        """
+        os.makedirs(path, exist_ok=True)
+        array_map = cls(path)
+        with portalocker.Lock(array_map._file("lock"), "a", flags=portalocker.LockFlags.EXCLUSIVE, timeout=None):
+            if not os.path.exists(array_map._file("complete")):
+                array_map._build(key_values())
+        array_map._open()
+        return array_map
+
+    def _build(self, key_values: Iterator[Tuple[Any, Any]]) -> None:
+        # Accumulated in typed arrays, 8 bytes per entry
+        int_keys = array.array("q")
+        digests = array.array("Q")
+        offsets = array.array("q", [0])
+        is_int = True
+        with open(self._file("values.bin"), "wb") as f:
+            for key, value in key_values:
+                int_key = _int_key(key)
+                if is_int and (int_key is None or not -(2 ** 63) <= int_key < 2 ** 63):
+                    is_int = False
+                    digests.extend(_key_digest(k) for k in int_keys)
+                if is_int:
+                    int_keys.append(int_key)
+                else:
+                    digests.append(_key_digest(key))
+                payload = pickle.dumps((key, value), protocol=pickle.HIGHEST_PROTOCOL)
+                f.write(payload)
+                offsets.append(offsets[-1] + len(payload))
+        keys = np.frombuffer(int_keys, dtype=np.int64) if is_int else np.frombuffer(digests, dtype=np.uint64)
+        ends = np.frombuffer(offsets, dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        # The last of duplicate keys wins, as with a dictionary
+        last = np.ones(len(sorted_keys), dtype=bool)
+        last[:-1] = sorted_keys[1:] != sorted_keys[:-1]
+        if not last.all():
+            with open(self._file("values.bin"), "rb") as f:
+                for pos in np.flatnonzero(~last):
+                    # An equal digest comes from either a duplicate key or distinct keys colliding
+                    key, next_key = (_read_key(f, ends[i], ends[i + 1]) for i in order[pos : pos + 2])
+                    if not is_int and key != next_key:
+                        raise RuntimeError(
+                            f"Keys {key!r} and {next_key!r} have the same 64-bit digest and can't be stored together "
+                            "in `storage`. Please use the in-memory map instead."
+                        )
+                    warnings.warn(f"Found duplicate key {key}. Please check your `key_value_fn`")
+        order = order[last]
+        np.save(self._file("keys.npy"), sorted_keys[last])
+        np.save(self._file("starts.npy"), ends[:-1][order])
+        np.save(self._file("lengths.npy"), (ends[1:] - ends[:-1])[order])
+        tmp_path = self._file(f"complete.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"int_keys": is_int, "length": len(order)}, f)
+        os.replace(tmp_path, self._file("complete"))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, key):
+        if self._int_keys:
+            probe: Union[int, Any] = _int_key(key)
+            if probe is None or not -(2 ** 63) <= probe < 2 ** 63:
+                raise KeyError(key)
+        else:
+            probe = np.uint64(_key_digest(key))
+        i = int(np.searchsorted(self._keys, probe))
+        if i == len(self._keys) or self._keys[i] != probe:
+            raise KeyError(key)
+        start, length = int(self._starts[i]), int(self._lengths[i])
+        stored_key, value = pickle.loads(self._values[start : start + length])  # type: ignore[index]
+        if stored_key != key:
+            raise KeyError(key)
+        return value
+
 
 # @functional_datapipe("to_map_datapipe")  # This line must be kept for .pyi signature parser
 class IterToMapConverterMapDataPipe(MapDataPipe):
@@ -31,6 +188,10 @@ class IterToMapConverterMapDataPipe(MapDataPipe):
     Args:
         datapipe: Source IterDataPipe
         key_value_fn: Function being applied over each data to generate key-value pair
+        storage: Optional directory to store the map in, instead of a dictionary in memory. Keys are kept in
+            sorted NumPy arrays and values in a file, all of them memory-mapped, so the map takes little memory
+            and is shared by every process using it. The map is built once, the first time it's needed,
+            and later reused from ``storage`` without reading ``datapipe``. Requires ``numpy``.
 
     Note:
         If a key being added is already present, the corresponding value
@@ -57,20 +218,26 @@ class IterToMapConverterMapDataPipe(MapDataPipe):
     """
     datapipe: IterDataPipe
     key_value_fn: Optional[Callable]
-    _map: Optional[Dict]
+    storage: Optional[str]
+    _map: Optional[Union[Dict, _ArrayMap]]
     _length: int
 
-    def __init__(self, datapipe: IterDataPipe, key_value_fn: Optional[Callable] = None):
+    def __init__(self, datapipe: IterDataPipe, key_value_fn: Optional[Callable] = None, storage: Optional[str] = None):
         if not isinstance(datapipe, IterDataPipe):
             raise TypeError(f"IterToMapConverter can only apply on IterDataPipe, but found {type(datapipe)}")
         self.datapipe = datapipe
         if key_value_fn is not None:
             _check_unpickable_fn(key_value_fn)
         self.key_value_fn = key_value_fn  # type: ignore[assignment]
+        if storage is not None and not HAS_NUMPY:
+            raise ModuleNotFoundError(
+                "Package `numpy` is required to be installed to use `storage` of IterToMapConverter."
+                "Please use `pip install numpy` or `conda install numpy` to install the package"
+            )
+        self.storage = storage
         self._map = None
 
-    def _load_map(self):
-        self._map = {}
+    def _key_values(self):
         for d in self.datapipe:
             inp = d if self.key_value_fn is None else self.key_value_fn(d)
             try:
@@ -80,6 +247,14 @@ class IterToMapConverterMapDataPipe(MapDataPipe):
             if length != 2:
                 raise ValueError(f"dictionary update sequence element has length {length}, 2 is required")
             key, value = inp
+            yield key, value
+
+    def _load_map(self):
+        if self.storage is not None:
+            self._map = _ArrayMap.load_or_build(self.storage, self._key_values)
+            return
+        self._map = {}
+        for key, value in self._key_values():
             if key in self._map:
                 warnings.warn(f"Found duplicate key {key}. Please check your `key_value_fn`")
             self._map[key] = value
@@ -115,11 +290,12 @@ class IterToMapConverterMapDataPipe(MapDataPipe):
         return (
             self.datapipe,
             dill_key_value_fn,
+            self.storage,
             self._map,
         )
 
     def __setstate__(self, state):
-        (self.datapipe, dill_key_value_fn, self._map) = state
+        (self.datapipe, dill_key_value_fn, self.storage, self._map) = state
         if DILL_AVAILABLE:
             self.key_value_fn = dill.loads(dill_key_value_fn)  # type: ignore[assignment]
         else:
@@ -5,7 +5,6 @@
 # LICENSE file in the root directory of this source tree.
 
 import threading
-import time
 
 from collections import deque
 from typing import Deque, Optional
@@ -13,16 +12,23 @@ from typing import Deque, Optional
 from torchdata.datapipes import functional_datapipe
 from torchdata.datapipes.iter import IterDataPipe
 
-PRODUCER_SLEEP_INTERVAL = 0.0001  # Interval between buffer fullfilment checks
-CONSUMER_SLEEP_INTERVAL = 0.0001  # Interval between checking items availablitity in buffer
-
 
 class _PrefetchData:
     def __init__(self, source_datapipe, buffer_size: int):
         self.run_prefetcher = True
+        self.stop_iteration = False
+        # Exception raised by the source DataPipe in the producer thread, re-raised by the consumer
+        self.exception: Optional[BaseException] = None
         self.prefetch_buffer: Deque = deque()
         self.buffer_size: int = buffer_size
         self.source_datapipe = source_datapipe
+        # Producer and consumer wait on the same condition instead of polling the buffer
+        self.cv = threading.Condition()
+
+    def stop(self):
+        with self.cv:
+            self.run_prefetcher = False
+            self.cv.notify_all()
 
 
 @functional_datapipe("prefetch")
@@ -62,23 +68,36 @@ class PrefetcherIterDataPipe(IterDataPipe):
         from torchdata.dataloader2 import communication
 
         itr = iter(prefetch_data.source_datapipe)
-        stop_iteration = False
-        while prefetch_data.run_prefetcher:
-            if len(prefetch_data.prefetch_buffer) < prefetch_data.buffer_size and not stop_iteration:
-                try:
-                    item = next(itr)
-                    prefetch_data.prefetch_buffer.append(item)
-                except StopIteration:
-                    stop_iteration = True
-                except communication.iter.InvalidStateResetRequired:
-                    stop_iteration = True
-                except communication.iter.TerminateRequired:
-                    prefetch_data.run_prefetcher = False
-            elif stop_iteration and len(prefetch_data.prefetch_buffer) == 0:
-                prefetch_data.run_prefetcher = False
-            else:  # Buffer is full, waiting for main thread to consume items
-                # TODO: Calculate sleep interval based on previous consumption speed
-                time.sleep(PRODUCER_SLEEP_INTERVAL)
+        cv = prefetch_data.cv
+        while True:
+            with cv:
+                # Buffer is full, waiting for main thread to consume items
+                cv.wait_for(
+                    lambda: len(prefetch_data.prefetch_buffer) < prefetch_data.buffer_size
+                    or not prefetch_data.run_prefetcher
+                )
+                if not prefetch_data.run_prefetcher:
+                    break
+            try:
+                item = next(itr)
+            except (StopIteration, communication.iter.InvalidStateResetRequired):
+                with cv:
+                    prefetch_data.stop_iteration = True
+                    cv.notify_all()
+                break
+            except communication.iter.TerminateRequired:
+                prefetch_data.stop()
+                break
+            except BaseException as e:
+                # Wake up the consumer, which would otherwise wait forever for the dead producer
+                with cv:
+                    prefetch_data.exception = e
+                    prefetch_data.stop_iteration = True
+                    cv.notify_all()
+                break
+            with cv:
+                prefetch_data.prefetch_buffer.append(item)
+                cv.notify_all()
 
     def __iter__(self):
         if self.buffer_size < 1:
@@ -91,14 +110,25 @@ class PrefetcherIterDataPipe(IterDataPipe):
                     target=PrefetcherIterDataPipe.thread_worker, args=(prefetch_data,), daemon=True
                 )
                 self.thread.start()
-                while prefetch_data.run_prefetcher:
-                    if len(prefetch_data.prefetch_buffer) > 0:
-                        yield prefetch_data.prefetch_buffer.popleft()
-                    else:
-                        # TODO: Calculate sleep interval based on previous availability speed
-                        time.sleep(CONSUMER_SLEEP_INTERVAL)
+                cv = prefetch_data.cv
+                while True:
+                    with cv:
+                        cv.wait_for(
+                            lambda: len(prefetch_data.prefetch_buffer) > 0
+                            or prefetch_data.stop_iteration
+                            or not prefetch_data.run_prefetcher
+                        )
+                        if not prefetch_data.run_prefetcher:
+                            break
+                        if len(prefetch_data.prefetch_buffer) == 0:
+                            if prefetch_data.exception is not None:
+                                raise prefetch_data.exception
+                            break
+                        item = prefetch_data.prefetch_buffer.popleft()
+                        cv.notify_all()
+                    yield item
             finally:
-                prefetch_data.run_prefetcher = False
+                prefetch_data.stop()
                 if self.thread is not None:
                     self.thread.join()
                     self.thread = None
@@ -122,5 +152,5 @@ class PrefetcherIterDataPipe(IterDataPipe):
 
     def reset(self):
         if self.thread is not None:
-            self.prefetch_data.run_prefetcher = False
+            self.prefetch_data.stop()
             self.thread.join()
@@ -8,13 +8,13 @@ import os
 import tarfile
 import warnings
 from io import BufferedIOBase
-from typing import cast, IO, Iterable, Iterator, Optional, Tuple
+from typing import cast, IO, Iterable, Iterator, Optional, Tuple, Union
 
 from torchdata.datapipes import functional_datapipe
 from torchdata.datapipes.iter import IterDataPipe
 
 from torchdata.datapipes.utils import StreamWrapper
-from torchdata.datapipes.utils.common import validate_pathname_binary_tuple
+from torchdata.datapipes.utils.common import _mmap_local_file, validate_pathname_binary_tuple
 
 
 @functional_datapipe("load_from_tar")
@@ -28,6 +28,8 @@ class TarArchiveLoaderIterDataPipe(IterDataPipe[Tuple[str, BufferedIOBase]]):
         mode: File mode used by `tarfile.open` to read file object.
             Mode has to be a string of the form `'filemode[:compression]'`
         length: a nominal length of the DataPipe
+        use_mmap: whether to yield a ``memoryview`` of the content of each file instead of a stream.
+            For uncompressed local tar files, it's a slice of the memory-mapped tar file, without any copy.
 
     Note:
         The opened file handles will be closed automatically if the default ``DecoderDataPipe``
@@ -44,16 +46,24 @@ class TarArchiveLoaderIterDataPipe(IterDataPipe[Tuple[str, BufferedIOBase]]):
         b'0123456789abcdef'
     """
 
-    def __init__(self, datapipe: Iterable[Tuple[str, BufferedIOBase]], mode: str = "r:*", length: int = -1) -> None:
+    def __init__(
+        self,
+        datapipe: Iterable[Tuple[str, BufferedIOBase]],
+        mode: str = "r:*",
+        length: int = -1,
+        use_mmap: bool = False,
+    ) -> None:
         super().__init__()
         self.datapipe: Iterable[Tuple[str, BufferedIOBase]] = datapipe
         self.mode: str = mode
         self.length: int = length
+        self.use_mmap = use_mmap
 
-    def __iter__(self) -> Iterator[Tuple[str, BufferedIOBase]]:
+    def __iter__(self) -> Iterator[Tuple[str, Union[BufferedIOBase, memoryview]]]:
         for data in self.datapipe:
             validate_pathname_binary_tuple(data)
             pathname, data_stream = data
+            mapped = None
             try:
                 if isinstance(data_stream, StreamWrapper) and isinstance(data_stream.file_obj, tarfile.TarFile):
                     tar = data_stream.file_obj
@@ -65,14 +75,24 @@ class TarArchiveLoaderIterDataPipe(IterDataPipe[Tuple[str, BufferedIOBase]]):
                     )
                     # typing.cast is used here to silence mypy's type checker
                     tar = tarfile.open(fileobj=cast(Optional[IO[bytes]], data_stream), mode=reading_mode)
+                    # The offsets of members are only those within the file when it isn't compressed
+                    if self.use_mmap and tar.fileobj is data_stream:
+                        mapped = _mmap_local_file(data_stream)
                 for tarinfo in tar:
                     if not tarinfo.isfile():
                         continue
+                    inner_pathname = os.path.normpath(os.path.join(pathname, tarinfo.name))
+                    if mapped is not None and not tarinfo.issparse():
+                        start = tarinfo.offset_data
+                        yield inner_pathname, memoryview(mapped)[start : start + tarinfo.size]
+                        continue
                     extracted_fobj = tar.extractfile(tarinfo)
                     if extracted_fobj is None:
                         warnings.warn(f"failed to extract file {tarinfo.name} from source tarfile {pathname}")
                         raise tarfile.ExtractError
-                    inner_pathname = os.path.normpath(os.path.join(pathname, tarinfo.name))
+                    if self.use_mmap:
+                        yield inner_pathname, memoryview(extracted_fobj.read())
+                        continue
                     yield inner_pathname, StreamWrapper(extracted_fobj, data_stream, name=inner_pathname)  # type: ignore[misc]
             except Exception as e:
                 warnings.warn(f"Unable to extract files from corrupted tarfile stream {pathname} due to: {e}, abort!")
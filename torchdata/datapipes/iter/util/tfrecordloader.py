@@ -4,18 +4,20 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import io
+import os
 import struct
 import warnings
 from functools import partial
 from io import BufferedIOBase
-from typing import Any, cast, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from typing import Any, cast, Container, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
 import torch
 
 from torchdata.datapipes import functional_datapipe
 from torchdata.datapipes.iter import IterDataPipe
 
-from torchdata.datapipes.utils.common import validate_pathname_binary_tuple
+from torchdata.datapipes.utils.common import _mmap_local_file, validate_pathname_binary_tuple
 
 try:
     from math import prod  # type: ignore
@@ -38,6 +40,20 @@ try:
 except ImportError:
     HAS_PROTOBUF = False
 
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ModuleNotFoundError:
+    HAS_NUMPY = False
+
+try:
+    import crc32c as _crc32c
+
+    HAS_CRC32C = True
+except ImportError:
+    HAS_CRC32C = False
+
 U = Union[bytes, bytearray, str]
 TFRecordFeatureSpec = Tuple[Tuple[int, ...], torch.dtype]
 TFRecordExampleSpec = Dict[str, TFRecordFeatureSpec]
@@ -49,6 +65,61 @@ TFRecordExampleSpec = Dict[str, TFRecordFeatureSpec]
 TFRecordBinaryData = Union[str, List[str], List[List[str]], List[List[List[Any]]]]
 TFRecordExampleFeature = Union[torch.Tensor, List[torch.Tensor], TFRecordBinaryData]
 TFRecordExample = Dict[str, TFRecordExampleFeature]
+# Values of all records of a batch concatenated, and the offset of each record's values, followed by the total
+TFRecordRaggedFeature = Tuple[torch.Tensor, torch.Tensor]
+
+
+# Number of records decoded together by the numeric fast path
+_DECODE_BATCH_SIZE = 64
+
+# Protobuf wire types, and the field numbers of `Feature` for each kind of list
+_WIRE_VARINT, _WIRE_FIXED64, _WIRE_LENGTH_DELIMITED, _WIRE_FIXED32 = 0, 1, 2, 5
+_BYTES_LIST, _FLOAT_LIST, _INT64_LIST = 1, 2, 3
+
+# Each record is framed by its length and the masked CRC of the length, followed by the masked CRC of the data
+_RECORD_HEADER_SIZE, _RECORD_FOOTER_SIZE = 12, 4
+_CRC_MASK_DELTA = 0xA282EAD8
+
+
+def _make_crc32c_table() -> List[int]:
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC32C_TABLE = _make_crc32c_table()
+
+
+def _crc32c_value(data) -> int:
+    if HAS_CRC32C:
+        return _crc32c.crc32c(data)
+    # Slow fallback when the native `crc32c` package isn't installed
+    crc = 0xFFFFFFFF
+    for b in bytes(data):
+        crc = _CRC32C_TABLE[(crc ^ b) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+_warned_slow_crc = False
+
+
+def _warn_slow_crc() -> None:
+    global _warned_slow_crc
+    if not HAS_CRC32C and not _warned_slow_crc:
+        _warned_slow_crc = True
+        warnings.warn(
+            "Verifying the CRC of tfrecord files in pure Python is slow. "
+            "Please use `pip install crc32c` to install the native implementation."
+        )
+
+
+def _masked_crc(data) -> int:
+    crc = _crc32c_value(data)
+    return (((crc >> 15) | (crc << 17)) + _CRC_MASK_DELTA) & 0xFFFFFFFF
 
 
 class SequenceExampleSpec(NamedTuple):
@@ -65,7 +136,9 @@ def _assert_protobuf() -> None:
         )
 
 
-def iterate_tfrecord_file(data: BufferedIOBase) -> Iterator[memoryview]:
+def iterate_tfrecord_file(data: BufferedIOBase, verify_crc: bool = False) -> Iterator[memoryview]:
+    if verify_crc:
+        _warn_slow_crc()
     length_bytes = bytearray(8)
     crc_bytes = bytearray(4)
     data_bytes = bytearray(1024)
@@ -78,6 +151,8 @@ def iterate_tfrecord_file(data: BufferedIOBase) -> Iterator[memoryview]:
             raise RuntimeError("Invalid tfrecord file: failed to read the record size.")
         if data.readinto(crc_bytes) != 4:
             raise RuntimeError("Invalid tfrecord file: failed to read the start token.")
+        if verify_crc and _masked_crc(length_bytes) != struct.unpack("<I", crc_bytes)[0]:
+            raise RuntimeError("Invalid tfrecord file: CRC mismatch of the record size.")
         (length,) = struct.unpack("<Q", length_bytes)
         if length > len(data_bytes):
             data_bytes = data_bytes.zfill(int(length * 1.5))
@@ -86,11 +161,353 @@ def iterate_tfrecord_file(data: BufferedIOBase) -> Iterator[memoryview]:
             raise RuntimeError("Invalid tfrecord file: failed to read the record.")
         if data.readinto(crc_bytes) != 4:
             raise RuntimeError("Invalid tfrecord file: failed to read the end token.")
+        if verify_crc and _masked_crc(data_bytes_view) != struct.unpack("<I", crc_bytes)[0]:
+            raise RuntimeError("Invalid tfrecord file: CRC mismatch of the record.")
 
-        # TODO(641): check CRC
         yield data_bytes_view
 
 
+def _iterate_tfrecord_buffer(buffer: memoryview, verify_crc: bool = False) -> Iterator[memoryview]:
+    # Same as `iterate_tfrecord_file`, yielding slices of ``buffer`` which aren't reused
+    if verify_crc:
+        _warn_slow_crc()
+    pos = 0
+    while pos < len(buffer):
+        if len(buffer) - pos < _RECORD_HEADER_SIZE:
+            raise RuntimeError("Invalid tfrecord file: failed to read the record size.")
+        if verify_crc and _masked_crc(buffer[pos : pos + 8]) != struct.unpack_from("<I", buffer, pos + 8)[0]:
+            raise RuntimeError("Invalid tfrecord file: CRC mismatch of the record size.")
+        (length,) = struct.unpack_from("<Q", buffer, pos)
+        start = pos + _RECORD_HEADER_SIZE
+        pos = start + length + _RECORD_FOOTER_SIZE
+        if pos > len(buffer):
+            raise RuntimeError("Invalid tfrecord file: failed to read the record.")
+        record = buffer[start : start + length]
+        if verify_crc and _masked_crc(record) != struct.unpack_from("<I", buffer, start + length)[0]:
+            raise RuntimeError("Invalid tfrecord file: CRC mismatch of the record.")
+        yield record
+
+
+def _map_tfrecord_stream(data_stream) -> Optional[memoryview]:
+    # Maps the rest of a local file, or the range of a split from `split_tfrecord`
+    split = data_stream.raw if isinstance(data_stream, io.BufferedReader) else None
+    mapped = _mmap_local_file(split.stream if isinstance(split, _StreamSlice) else data_stream)
+    if mapped is None:
+        return None
+    if isinstance(split, _StreamSlice):
+        return memoryview(mapped)[split.start : split.end]
+    return memoryview(mapped)[data_stream.tell() :]
+
+
+def build_tfrecord_index(data: BufferedIOBase) -> List[Tuple[int, int]]:
+    r"""
+    Returns the offset and size in bytes, framing included, of each record of a seekable tfrecord stream.
+    Only the headers are read, the records are skipped over.
+    """
+    index = []
+    length_bytes = bytearray(_RECORD_HEADER_SIZE)
+    offset = data.seek(0, io.SEEK_CUR)
+    while True:
+        bytes_read = data.readinto(length_bytes)
+        if bytes_read == 0:
+            break
+        elif bytes_read != _RECORD_HEADER_SIZE:
+            raise RuntimeError("Invalid tfrecord file: failed to read the record size.")
+        (length,) = struct.unpack_from("<Q", length_bytes)
+        size = _RECORD_HEADER_SIZE + length + _RECORD_FOOTER_SIZE
+        index.append((offset, size))
+        offset = data.seek(offset + size)
+    return index
+
+
+def read_tfrecord_index(index_path: str) -> List[Tuple[int, int]]:
+    r"""
+    Reads an index file with one ``offset size`` line per record, as written by ``write_tfrecord_index``.
+    """
+    with open(index_path) as f:
+        return [cast(Tuple[int, int], tuple(int(x) for x in line.split())) for line in f if line.strip()]
+
+
+def write_tfrecord_index(index: List[Tuple[int, int]], index_path: str) -> None:
+    # Multiple processes may write the same index, each of them writes to its own file
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.writelines(f"{offset} {size}\n" for offset, size in index)
+    os.replace(tmp_path, index_path)
+
+
+class _StreamSlice(io.RawIOBase):
+    r"""
+    Reads bytes ``[start, end)`` of a seekable stream. Slices of a stream share it, so each read seeks first.
+    """
+
+    def __init__(self, stream, start: int, end: int) -> None:
+        super().__init__()
+        self.stream = stream
+        self.start = start
+        self.end = end
+        self._pos = start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), self.end - self._pos)
+        if n <= 0:
+            return 0
+        self.stream.seek(self._pos)
+        bytes_read = self.stream.readinto(memoryview(b)[:n])
+        self._pos += bytes_read
+        return bytes_read
+
+
+def _read_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        if pos >= len(buf):
+            raise RuntimeError("Invalid tfrecord record: truncated varint.")
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _iter_fields(buf: bytes, start: int, end: int) -> Iterator[Tuple[int, int, int, int]]:
+    # Yields field number, wire type, and the range of the raw value of each field of a message
+    pos = start
+    while pos < end:
+        tag, pos = _read_varint(buf, pos)
+        field, wire_type = tag >> 3, tag & 7
+        if wire_type == _WIRE_VARINT:
+            _, value_end = _read_varint(buf, pos)
+        elif wire_type == _WIRE_LENGTH_DELIMITED:
+            length, pos = _read_varint(buf, pos)
+            value_end = pos + length
+        elif wire_type == _WIRE_FIXED32:
+            value_end = pos + 4
+        elif wire_type == _WIRE_FIXED64:
+            value_end = pos + 8
+        else:
+            raise RuntimeError(f"Invalid tfrecord record: unsupported wire type {wire_type}.")
+        if value_end > end:
+            raise RuntimeError("Invalid tfrecord record: truncated message.")
+        yield field, wire_type, pos, value_end
+        pos = value_end
+
+
+def _parse_raw_features(record: bytes, keys: Container[str]) -> Dict[str, Tuple[int, List[bytes]]]:
+    r"""
+    Walks the wire format of an ``Example``, or the context of a ``SequenceExample``, and returns the kind
+    of list and the raw encoded values of each feature in ``keys``, without decoding them.
+    """
+    features: Dict[str, Tuple[int, List[bytes]]] = {}
+    for field, wire_type, start, end in _iter_fields(record, 0, len(record)):
+        # `Example.features` and `SequenceExample.context` are both the first field
+        if field != 1 or wire_type != _WIRE_LENGTH_DELIMITED:
+            continue
+        for entry_field, entry_wire_type, entry_start, entry_end in _iter_fields(record, start, end):
+            if entry_field != 1 or entry_wire_type != _WIRE_LENGTH_DELIMITED:
+                continue
+            key, feature = "", None
+            for map_field, map_wire_type, map_start, map_end in _iter_fields(record, entry_start, entry_end):
+                if map_wire_type != _WIRE_LENGTH_DELIMITED:
+                    continue
+                if map_field == 1:
+                    key = str(record[map_start:map_end], "utf-8")
+                elif map_field == 2:
+                    feature = (map_start, map_end)
+            if key not in keys:
+                continue
+            kind, chunks = 0, []
+            if feature is not None:
+                for list_field, list_wire_type, list_start, list_end in _iter_fields(record, *feature):
+                    if list_wire_type != _WIRE_LENGTH_DELIMITED:
+                        continue
+                    if list_field != kind:
+                        kind, chunks = list_field, []
+                    for value_field, value_wire_type, value_start, value_end in _iter_fields(
+                        record, list_start, list_end
+                    ):
+                        if value_field != 1:
+                            continue
+                        # Packed and unpacked values are kept as they are, decoding is the same for both
+                        if kind == _FLOAT_LIST and value_wire_type == _WIRE_VARINT:
+                            raise RuntimeError("Invalid tfrecord record: float feature encoded as varint.")
+                        if kind == _INT64_LIST and value_wire_type == _WIRE_FIXED32:
+                            raise RuntimeError("Invalid tfrecord record: int64 feature encoded as fixed32.")
+                        chunks.append(record[value_start:value_end])
+            # Like protobuf, a duplicate key overrides the previous one
+            features[key] = (kind, chunks)
+    return features
+
+
+def _decode_varints(raw: "np.ndarray") -> "np.ndarray":
+    # Each varint ends with a byte without continuation bit, its 7-bit groups are little-endian
+    ends = np.flatnonzero(raw < 0x80)
+    if raw.size and (ends.size == 0 or ends[-1] != raw.size - 1):
+        raise RuntimeError("Invalid tfrecord record: truncated varint.")
+    starts = np.concatenate(([0], ends[:-1] + 1)) if ends.size else ends
+    lengths = ends - starts + 1
+    if lengths.size and lengths.max() > 10:
+        raise RuntimeError("Invalid tfrecord record: varint is longer than 10 bytes.")
+    shifts = (7 * (np.arange(raw.size) - np.repeat(starts, lengths))).astype(np.uint64)
+    groups = (raw & 0x7F).astype(np.uint64) << shifts
+    # Negative values are encoded in 10 bytes as two's complement, the overflow of the last group wraps around
+    return np.bitwise_or.reduceat(groups, starts).view(np.int64) if ends.size else np.empty(0, dtype=np.int64)
+
+
+def _is_numeric_spec(spec: Optional[TFRecordExampleSpec]) -> bool:
+    return (
+        spec is not None
+        and len(spec) > 0
+        and all(
+            isinstance(feature_spec, tuple) and isinstance(feature_spec[1], torch.dtype)
+            for feature_spec in spec.values()
+        )
+    )
+
+
+def _resolve_shape(shape: Optional[Tuple[int, ...]], numel: int) -> Optional[Tuple[int, ...]]:
+    if shape is None:
+        return (numel,)
+    if sum(1 for x in shape if x == -1) > 1:
+        return None
+    known = prod(x for x in shape if x != -1)
+    if -1 in shape and known != 0 and numel % known == 0:
+        shape = tuple(numel // known if x == -1 else x for x in shape)
+    return shape if prod(shape) == numel else None
+
+
+def _decode_numeric_examples(
+    records: List[bytes], spec: TFRecordExampleSpec, ragged: Optional[str] = None
+) -> Optional[Dict[str, Union[torch.Tensor, TFRecordRaggedFeature]]]:
+    r"""
+    Decodes the numeric features of ``spec`` from a batch of ``Example`` records into preallocated tensors of
+    shape ``(len(records), *shape)``. The values of each feature are decoded at once over the whole batch,
+    without intermediate Python objects.
+
+    Features whose dynamic dimension differs across records are padded with zeros when ``ragged`` is ``"pad"``.
+    When it's ``"offsets"``, features declared with a dynamic dimension are always returned as values and offsets.
+
+    Returns ``None`` when the records can't be decoded that way, e.g. a feature is missing, holds bytes, or
+    has a different number of values across records without ``ragged``. Those are left to the protobuf parser.
+    """
+    parsed = [_parse_raw_features(record, spec) for record in records]
+    if any(len(features) != len(spec) for features in parsed):
+        return None
+    batch: Dict[str, Union[torch.Tensor, TFRecordRaggedFeature]] = {}
+    for key, (shape, dtype) in spec.items():
+        kinds = {features[key][0] for features in parsed}
+        if len(kinds) != 1:
+            return None
+        kind = kinds.pop()
+        chunks = [features[key][1] for features in parsed]
+        # A bytearray keeps the buffer writable for `torch.from_numpy`
+        data = np.frombuffer(bytearray().join(chunk for record_chunks in chunks for chunk in record_chunks), np.uint8)
+        record_ends = np.cumsum([0] + [sum(len(chunk) for chunk in record_chunks) for record_chunks in chunks])
+        if kind == _FLOAT_LIST:
+            if data.size % 4 != 0:
+                raise RuntimeError("Invalid tfrecord record: truncated float feature.")
+            values = data.view("<f4")
+            counts = np.diff(record_ends) // 4
+        elif kind == _INT64_LIST:
+            values = _decode_varints(data)
+            # Number of varints within the first bytes of the batch
+            terminators = np.concatenate(([0], np.cumsum(data < 0x80)))
+            counts = np.diff(terminators[record_ends])
+        else:
+            return None
+        numel = counts[0]
+        if (ragged == "offsets" and _has_dynamic_dim(shape)) or (counts != numel).any():
+            if ragged is None:
+                return None
+            ragged_feature = _decode_ragged_feature(values, counts, shape, dtype, ragged)
+            if ragged_feature is None:
+                return None
+            batch[key] = ragged_feature
+            continue
+        feature_shape = _resolve_shape(shape, int(numel))
+        if feature_shape is None:
+            return None
+        out = torch.empty((len(records), *feature_shape), dtype=dtype)
+        out.view(-1).copy_(torch.from_numpy(values))
+        batch[key] = out
+    return batch
+
+
+def _decode_ragged_feature(
+    values: "np.ndarray", counts: "np.ndarray", shape: Optional[Tuple[int, ...]], dtype: torch.dtype, ragged: str
+) -> Optional[Union[torch.Tensor, TFRecordRaggedFeature]]:
+    shapes = [_resolve_shape(shape, int(count)) for count in counts]
+    if any(record_shape is None for record_shape in shapes):
+        return None
+    flat_values = torch.from_numpy(values)
+    if ragged == "offsets":
+        offsets = torch.from_numpy(np.concatenate(([0], np.cumsum(counts))).astype(np.int64))
+        return flat_values.to(dtype), offsets
+    max_shape = tuple(max(dims) for dims in zip(*shapes))  # type: ignore[misc]
+    out = torch.zeros((len(counts), *max_shape), dtype=dtype)
+    if shape is None or shape[0] == -1:
+        # Only the first dimension varies, the values of each record fill the beginning of its row
+        rows = out.view(len(counts), -1)
+        rows[torch.arange(rows.shape[1]) < torch.from_numpy(counts)[:, None]] = flat_values.to(dtype)
+        return out
+    start = 0
+    for i, (count, record_shape) in enumerate(zip(counts, shapes)):
+        out[(i, *(slice(0, d) for d in record_shape))] = flat_values[start : start + count].reshape(record_shape)
+        start += count
+    return out
+
+
+def _has_dynamic_dim(shape: Optional[Tuple[int, ...]]) -> bool:
+    return shape is not None and -1 in shape
+
+
+def _collate_feature(
+    values: List[Any], ragged: str, dynamic: bool = False
+) -> Union[TFRecordExampleFeature, TFRecordRaggedFeature]:
+    if not all(isinstance(value, torch.Tensor) for value in values):
+        return values
+    shapes = {value.shape for value in values}
+    if ragged == "offsets" and (dynamic or len(shapes) != 1):
+        # The type of a feature declared with a dynamic dimension doesn't depend on the records of the batch
+        counts = torch.tensor([0] + [value.numel() for value in values], dtype=torch.int64)
+        return torch.cat([value.reshape(-1) for value in values]), torch.cumsum(counts, 0)
+    if len(shapes) == 1:
+        return torch.stack(values)
+    if len({len(shape) for shape in shapes}) != 1:
+        raise RuntimeError(f"Cannot pad values with different numbers of dimensions: {sorted(shapes)}")
+    max_shape = tuple(max(dims) for dims in zip(*shapes))
+    out = values[0].new_zeros((len(values), *max_shape))
+    for i, value in enumerate(values):
+        out[(i, *(slice(0, d) for d in value.shape))] = value
+    return out
+
+
+def _collate_examples(
+    examples: List[TFRecordExample], ragged: str, spec: Optional[TFRecordExampleSpec] = None
+) -> Dict[str, Any]:
+    keys = examples[0].keys()
+    if any(example.keys() != keys for example in examples):
+        raise RuntimeError("Examples of a batch have different keys.")
+    dynamic = set() if spec is None else {key for key, (shape, _) in spec.items() if _has_dynamic_dim(shape)}
+    return {key: _collate_feature([example[key] for example in examples], ragged, key in dynamic) for key in keys}
+
+
+def _batch_records(records: Iterator[memoryview], batch_size: int, copy: bool = True) -> Iterator[List[bytes]]:
+    batch: List[bytes] = []
+    for record in records:
+        # The buffer of a record from a stream is reused for the next one
+        batch.append(bytes(record) if copy else record)  # type: ignore[arg-type]
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
 def process_feature(feature) -> torch.Tensor:
     # NOTE: We assume that each key in the example has only one field
     # (either "bytes_list", "float_list", or "int64_list")!
@@ -194,6 +611,73 @@ def parse_tfrecord_sequence_example(example, spec: Optional[TFRecordExampleSpec]
     return result
 
 
+@functional_datapipe("split_tfrecord")
+class TFRecordSplitterIterDataPipe(IterDataPipe[Tuple[str, BufferedIOBase]]):
+    r"""
+    Splits seekable tfrecord binary streams from an Iterable DataPipe into streams of consecutive records,
+    and yields tuples of path name and stream of each split (functional name: ``split_tfrecord``).
+    Followed by ``sharding_filter``, this shards large files across workers by ranges of records,
+    each worker only reading its own records.
+
+    The offsets of the records are read from an index next to the file when there is one, e.g. written by
+    ``write_tfrecord_index`` or with ``save_index``. Otherwise, they are found by skipping from header to header.
+
+    Args:
+        datapipe: Iterable DataPipe that provides tuples of path name and seekable tfrecord binary stream
+        records_per_split: the number of records within each split
+        index_suffix: suffix appended to the path name of a file to get the path of its index,
+            or ``None`` to always find the offsets from the file
+        save_index: whether to write the index of files without one
+
+    Example:
+        >>> from torchdata.datapipes.iter import FileLister, FileOpener
+        >>> datapipe1 = FileLister(".", "*.tfrecord")
+        >>> datapipe2 = FileOpener(datapipe1, mode="b")
+        >>> tfrecord_loader_dp = datapipe2.split_tfrecord(1024).sharding_filter().load_from_tfrecord()
+        >>> for example in tfrecord_loader_dp:
+        >>>     print(example)
+    """
+
+    def __init__(
+        self,
+        datapipe: Iterable[Tuple[str, BufferedIOBase]],
+        records_per_split: int = 1024,
+        index_suffix: Optional[str] = ".index",
+        save_index: bool = False,
+    ) -> None:
+        super().__init__()
+        if records_per_split <= 0:
+            raise ValueError(f"records_per_split should be a positive integer, but got {records_per_split}")
+        self.datapipe: Iterable[Tuple[str, BufferedIOBase]] = datapipe
+        self.records_per_split = records_per_split
+        self.index_suffix = index_suffix
+        self.save_index = save_index
+
+    def _load_index(self, pathname: str, data_stream: BufferedIOBase) -> List[Tuple[int, int]]:
+        file_size = data_stream.seek(0, io.SEEK_END)
+        index_path = None if self.index_suffix is None else pathname + self.index_suffix
+        if index_path is not None and os.path.exists(index_path):
+            index = read_tfrecord_index(index_path)
+            if (index[-1][0] + index[-1][1] if index else 0) == file_size:
+                return index
+            warnings.warn(f"Index {index_path} doesn't match the size of {pathname}, finding the offsets instead")
+        data_stream.seek(0)
+        index = build_tfrecord_index(data_stream)
+        if self.save_index and index_path is not None:
+            write_tfrecord_index(index, index_path)
+        return index
+
+    def __iter__(self) -> Iterator[Tuple[str, BufferedIOBase]]:
+        for data in self.datapipe:
+            validate_pathname_binary_tuple(data)
+            pathname, data_stream = data
+            index = self._load_index(pathname, data_stream)
+            for i in range(0, len(index), self.records_per_split):
+                split = index[i : i + self.records_per_split]
+                start, end = split[0][0], split[-1][0] + split[-1][1]
+                yield pathname, io.BufferedReader(_StreamSlice(data_stream, start, end))
+
+
 @functional_datapipe("load_from_tfrecord")
 class TFRecordLoaderIterDataPipe(IterDataPipe[TFRecordExample]):
     r"""
@@ -202,7 +686,26 @@ class TFRecordLoaderIterDataPipe(IterDataPipe[TFRecordExample]):
 
     Args:
         datapipe: Iterable DataPipe that provides tuples of path name and tfrecord binary stream
+        spec: a mapping from feature name to its shape and dtype, only the features within it are returned
         length: a nominal length of the DataPipe
+        verify_crc: whether to check the masked CRC32C of each record and raise an error on mismatches.
+            This is fast when the ``crc32c`` package is installed, e.g. with ``pip install torchdata[crc32c]``,
+            and warns once otherwise.
+        batch_size: if set, yields a dictionary of batched features for every ``batch_size`` records of a stream,
+            instead of one dictionary per record. The last batch of each stream may be smaller. Tensors are
+            stacked, while other features are lists with one element per record.
+        ragged: how to batch tensors with different shapes across records, either ``"pad"`` (default) to pad
+            them with zeros to the largest shape, or ``"offsets"`` to return a tuple of their flattened values
+            concatenated, and of the offsets of each record's values within them, followed by the total.
+            Features declared with a ``-1`` dimension in ``spec`` are always returned that way, even when all
+            records of a batch have the same shape.
+        use_mmap: whether to memory-map local files, and parse records straight from the mapped pages
+            instead of copying them into a buffer.
+
+    Note:
+        When every feature of ``spec`` has a ``torch.dtype`` and ``numpy`` is installed, records are decoded
+        in batches straight into tensors, skipping the protobuf parser. Records it can't handle, like ones
+        with feature lists of a ``SequenceExample``, fall back to the protobuf parser.
 
     Note:
         The opened file handles will be closed automatically if the default ``DecoderDataPipe``
@@ -223,13 +726,25 @@ class TFRecordLoaderIterDataPipe(IterDataPipe[TFRecordExample]):
         datapipe: Iterable[Tuple[str, BufferedIOBase]],
         spec: Optional[TFRecordExampleSpec] = None,
         length: int = -1,
+        verify_crc: bool = False,
+        batch_size: Optional[int] = None,
+        ragged: str = "pad",
+        use_mmap: bool = False,
     ) -> None:
         super().__init__()
         _assert_protobuf()
+        if batch_size is not None and batch_size <= 0:
+            raise ValueError(f"batch_size should be a positive integer, but got {batch_size}")
+        if ragged not in ("pad", "offsets"):
+            raise ValueError(f"Invalid ragged {ragged}, should be one of {('pad', 'offsets')}")
 
         self.datapipe: Iterable[Tuple[str, BufferedIOBase]] = datapipe
         self.length: int = length
         self.spec = spec
+        self.verify_crc = verify_crc
+        self.batch_size = batch_size
+        self.ragged = ragged
+        self.use_mmap = use_mmap
 
     def __iter__(self) -> Iterator[TFRecordExample]:
         # We assume that the "example.proto" and "feature.proto"
@@ -238,14 +753,41 @@ class TFRecordLoaderIterDataPipe(IterDataPipe[TFRecordExample]):
         # not be able to load older tfrecord datasets.
         from .protobuf_template import _tfrecord_example_pb2 as example_pb2
 
+        def parse(example_bytes) -> TFRecordExample:
+            example = example_pb2.SequenceExample()  # type: ignore
+            example.ParseFromString(example_bytes)  # type: ignore
+            return parse_tfrecord_sequence_example(example, self.spec)
+
         for data in self.datapipe:
             validate_pathname_binary_tuple(data)
             pathname, data_stream = data
             try:
-                for example_bytes in iterate_tfrecord_file(data_stream):
-                    example = example_pb2.SequenceExample()  # type: ignore
-                    example.ParseFromString(example_bytes)  # type: ignore
-                    yield parse_tfrecord_sequence_example(example, self.spec)
+                mapped = _map_tfrecord_stream(data_stream) if self.use_mmap else None
+                if mapped is None:
+                    example_iter = iterate_tfrecord_file(data_stream, self.verify_crc)
+                else:
+                    example_iter = _iterate_tfrecord_buffer(mapped, self.verify_crc)
+                decode = HAS_NUMPY and _is_numeric_spec(self.spec)
+                if not decode and self.batch_size is None:
+                    for example_bytes in example_iter:
+                        yield parse(example_bytes)
+                    continue
+                ragged = None if self.batch_size is None else self.ragged
+                for records in _batch_records(example_iter, self.batch_size or _DECODE_BATCH_SIZE, copy=mapped is None):
+                    batch = _decode_numeric_examples(records, self.spec, ragged) if decode else None  # type: ignore
+                    if batch is None:
+                        # Records of this stream not fitting the fast path are left to protobuf from now on
+                        decode = False
+                        if self.batch_size is None:
+                            for record in records:
+                                yield parse(record)
+                        else:
+                            yield _collate_examples([parse(record) for record in records], self.ragged, self.spec)
+                    elif self.batch_size is None:
+                        for i in range(len(records)):
+                            yield {key: value[i] for key, value in batch.items()}  # type: ignore[index]
+                    else:
+                        yield batch  # type: ignore[misc]
             except RuntimeError as e:
                 warnings.warn(f"Unable to read from corrupted tfrecord stream {pathname} due to: {e}, abort!")
                 raise e
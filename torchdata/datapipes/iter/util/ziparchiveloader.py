@@ -5,17 +5,34 @@
 # LICENSE file in the root directory of this source tree.
 
 import os
+import struct
 import sys
 import warnings
 import zipfile
 from io import BufferedIOBase
-from typing import cast, IO, Iterable, Iterator, Tuple
+from typing import cast, IO, Iterable, Iterator, Optional, Tuple, Union
 
 from torchdata.datapipes import functional_datapipe
 from torchdata.datapipes.iter import IterDataPipe
 
 from torchdata.datapipes.utils import StreamWrapper
-from torchdata.datapipes.utils.common import validate_pathname_binary_tuple
+from torchdata.datapipes.utils.common import _mmap_local_file, validate_pathname_binary_tuple
+
+# Size of the fixed part of a local file header, followed by the name and the extra field
+_LOCAL_HEADER_SIZE = 30
+
+
+def _stored_member_view(mapped, zipinfo: zipfile.ZipInfo) -> Optional[memoryview]:
+    # Only uncompressed and unencrypted members are laid out as they are within the archive
+    if zipinfo.compress_type != zipfile.ZIP_STORED or zipinfo.flag_bits & 0x1:
+        return None
+    offset = zipinfo.header_offset
+    if mapped[offset : offset + 4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad magic number for file header of {zipinfo.filename}")
+    # The extra field of the local header may differ from the one of the central directory
+    name_size, extra_size = struct.unpack_from("<HH", mapped, offset + 26)
+    start = offset + _LOCAL_HEADER_SIZE + name_size + extra_size
+    return memoryview(mapped)[start : start + zipinfo.compress_size]
 
 
 @functional_datapipe("load_from_zip")
@@ -27,6 +44,9 @@ class ZipArchiveLoaderIterDataPipe(IterDataPipe[Tuple[str, BufferedIOBase]]):
     Args:
         datapipe: Iterable DataPipe that provides tuples of path name and zip binary stream
         length: Nominal length of the DataPipe
+        use_mmap: whether to yield a ``memoryview`` of the content of each file instead of a stream.
+            For stored (uncompressed) members of local zip files, it's a slice of the memory-mapped zip file,
+            without any copy, and their CRC isn't checked.
 
     Note:
         The opened file handles will be closed automatically if the default ``DecoderDataPipe``
@@ -44,18 +64,22 @@ class ZipArchiveLoaderIterDataPipe(IterDataPipe[Tuple[str, BufferedIOBase]]):
         b'0123456789abcdef'
     """
 
-    def __init__(self, datapipe: Iterable[Tuple[str, BufferedIOBase]], length: int = -1) -> None:
+    def __init__(
+        self, datapipe: Iterable[Tuple[str, BufferedIOBase]], length: int = -1, use_mmap: bool = False
+    ) -> None:
         super().__init__()
         self.datapipe: Iterable[Tuple[str, BufferedIOBase]] = datapipe
         self.length: int = length
+        self.use_mmap = use_mmap
 
-    def __iter__(self) -> Iterator[Tuple[str, BufferedIOBase]]:
+    def __iter__(self) -> Iterator[Tuple[str, Union[BufferedIOBase, memoryview]]]:
         for data in self.datapipe:
             validate_pathname_binary_tuple(data)
             pathname, data_stream = data
             try:
                 # typing.cast is used here to silence mypy's type checker
                 zips = zipfile.ZipFile(cast(IO[bytes], data_stream))
+                mapped = _mmap_local_file(data_stream) if self.use_mmap else None
                 for zipinfo in zips.infolist():
                     # major version should always be 3 here.
                     if sys.version_info[1] >= 6:
@@ -63,8 +87,12 @@ class ZipArchiveLoaderIterDataPipe(IterDataPipe[Tuple[str, BufferedIOBase]]):
                             continue
                     elif zipinfo.filename.endswith("/"):
                         continue
-                    extracted_fobj = zips.open(zipinfo)
                     inner_pathname = os.path.normpath(os.path.join(pathname, zipinfo.filename))
+                    if self.use_mmap:
+                        member = None if mapped is None else _stored_member_view(mapped, zipinfo)
+                        yield inner_pathname, memoryview(zips.read(zipinfo)) if member is None else member
+                        continue
+                    extracted_fobj = zips.open(zipinfo)
                     yield inner_pathname, StreamWrapper(extracted_fobj, data_stream, name=inner_pathname)  # type: ignore[misc]
             except Exception as e:
                 warnings.warn(f"Unable to extract files from corrupted zipfile stream {pathname} due to: {e}, abort!")
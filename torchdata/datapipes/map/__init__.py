@@ -9,10 +9,12 @@ from torch.utils.data import MapDataPipe
 from torch.utils.data.datapipes.map import Batcher, Concater, Mapper, SequenceWrapper, Shuffler, Zipper
 
 from torchdata.datapipes.iter.util.converter import IterToMapConverterMapDataPipe as IterToMapConverter
+from torchdata.datapipes.map.util.archivereader import ArchiveReaderMapDataPipe as ArchiveReader
 from torchdata.datapipes.map.util.cacheholder import InMemoryCacheHolderMapDataPipe as InMemoryCacheHolder
 from torchdata.datapipes.map.util.unzipper import UnZipperMapDataPipe as UnZipper
 
 __all__ = [
+    "ArchiveReader",
     "Batcher",
     "Concater",
     "InMemoryCacheHolder",
@@ -0,0 +1,132 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from torchdata.datapipes.map import MapDataPipe
+from torchdata.datapipes.utils._archive_index import (
+    ArchiveMember,
+    build_archive_index,
+    read_archive_index,
+    read_member,
+    write_archive_index,
+)
+
+
+class ArchiveReaderMapDataPipe(MapDataPipe[Tuple[str, bytes]]):
+    r"""
+    Serves the files within local zip archives and uncompressed tar archives, by position or by path name,
+    as tuples of path name and content. The path name of a file is the one given by ``load_from_tar``
+    and ``load_from_zip``, i.e. the path of its archive joined with its name.
+
+    The offset and size of every file are indexed once, so that each of them is read with a single ``pread``,
+    without scanning the archive. This allows shuffled access and sharding archives across workers by file.
+    Compressed zip members are decompressed after being read, and zip members are checked against their CRC.
+
+    Args:
+        archives: path or sequence of paths of the archives
+        index_suffix: suffix appended to the path of an archive to get the path of its index, which is read
+            when it's up to date with the archive. ``None`` to always index the archives.
+        save_index: whether to write the index of archives without an up to date one
+
+    Example:
+        >>> from torchdata.datapipes.map import ArchiveReader
+        >>> archive_dp = ArchiveReader(["a.tar", "b.zip"], save_index=True)
+        >>> path, data = archive_dp["a.tar/0.txt"]
+        >>> path, data = archive_dp[len(archive_dp) - 1]
+    """
+
+    def __init__(
+        self,
+        archives: Union[str, Sequence[str]],
+        index_suffix: Optional[str] = ".index",
+        save_index: bool = False,
+    ) -> None:
+        self.archives: List[str] = [archives] if isinstance(archives, str) else list(archives)
+        self.index_suffix = index_suffix
+        self.save_index = save_index
+        self._members: Optional[List[Tuple[int, ArchiveMember]]] = None
+        self._keys: Dict[str, int] = {}
+        # File descriptors are opened lazily in each process
+        self._fds: Dict[int, int] = {}
+        self._pid: Optional[int] = None
+
+    def _load_index(self, path: str) -> List[ArchiveMember]:
+        index_path = None if self.index_suffix is None else path + self.index_suffix
+        members = None if index_path is None else read_archive_index(path, index_path)
+        if members is None:
+            members = build_archive_index(path)
+            if self.save_index and index_path is not None:
+                write_archive_index(path, index_path, members)
+        return members
+
+    def _load(self) -> List[Tuple[int, ArchiveMember]]:
+        if self._members is None:
+            members = []
+            for archive_id, path in enumerate(self.archives):
+                members.extend((archive_id, member) for member in self._load_index(path))
+            self._keys = {self._key(archive_id, member): i for i, (archive_id, member) in enumerate(members)}
+            self._members = members
+        return self._members
+
+    def _key(self, archive_id: int, member: ArchiveMember) -> str:
+        return os.path.normpath(os.path.join(self.archives[archive_id], member.name))
+
+    def _fd(self, archive_id: int) -> int:
+        if self._pid != os.getpid():
+            # Descriptors inherited through fork may have been closed by the parent, each process opens its own
+            self._fds, self._pid = {}, os.getpid()
+        if archive_id not in self._fds:
+            self._fds[archive_id] = os.open(self.archives[archive_id], os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        return self._fds[archive_id]
+
+    def __getitem__(self, index: Union[int, str]) -> Tuple[str, bytes]:
+        members = self._load()
+        if isinstance(index, str):
+            if index not in self._keys:
+                raise KeyError(f"Path name {index} is not within the archives of {type(self).__name__}.")
+            position = self._keys[index]
+        else:
+            position = index
+        if not -len(members) <= position < len(members):
+            raise IndexError(f"Index {index} is invalid for {type(self).__name__}.")
+        archive_id, member = members[position]
+        return self._key(archive_id, member), read_member(self._fd(archive_id), self.archives[archive_id], member)
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __getstate__(self):
+        # The index is sent along, so that other processes don't have to load it again
+        state = (
+            self.archives,
+            self.index_suffix,
+            self.save_index,
+            self._members,
+            self._keys,
+        )
+        if MapDataPipe.getstate_hook is not None:
+            return MapDataPipe.getstate_hook(state)
+        return state
+
+    def __setstate__(self, state):
+        (
+            self.archives,
+            self.index_suffix,
+            self.save_index,
+            self._members,
+            self._keys,
+        ) = state
+        self._fds = {}
+        self._pid = None
+
+    def __del__(self):
+        if self._pid == os.getpid():
+            for fd in self._fds.values():
+                os.close(fd)
+            self._fds.clear()
@@ -4,9 +4,13 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import Any, Dict, TypeVar
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from torch.utils.data.datapipes.utils.common import _check_unpickable_fn
 
 from torchdata.datapipes import functional_datapipe
+from torchdata.datapipes.iter.util.cacheholder import _payload_size
 from torchdata.datapipes.map import MapDataPipe
 
 
@@ -21,11 +25,20 @@ class InMemoryCacheHolderMapDataPipe(MapDataPipe[T_co]):
     ``MapDataPipe`` are lazily computed, this can be used to store the results from previous ``MapDataPipe`` and
     reduce the number of duplicate computations.
 
+    Items can be fetched in batches with ``__getitems__``, which is used by ``DataLoader`` for batched indices.
+    Each distinct index missing from the cache is requested once, with a single call to ``__getitems__`` of the
+    source DataPipe if it has one.
+
     Note:
         The default ``cache`` is a ``Dict``. If another data structure is more suitable as cache for your use
 
     Args:
         source_dp: source DataPipe from which elements are read and stored in memory
+        size: The maximum size (in megabytes) that this DataPipe can hold in memory. This defaults to unlimited.
+        size_fn: Function returning the size in bytes of an element. By default, the bytes held by tensors,
+            arrays, bytes and strings are counted, recursing into lists, tuples and dictionaries.
+        policy: Which items to evict once the cache is full, either the least recently used (``"lru"``, default)
+            or the least frequently used ones (``"lfu"``, the least recently used among those on ties)
 
     Example:
         >>> from torchdata.datapipes.map import SequenceWrapper
@@ -34,17 +47,112 @@ class InMemoryCacheHolderMapDataPipe(MapDataPipe[T_co]):
         >>> list(cache_dp)
         [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
     """
+    size: Optional[int] = None
 
-    def __init__(self, source_dp: MapDataPipe[T_co]) -> None:
+    def __init__(
+        self,
+        source_dp: MapDataPipe[T_co],
+        size: Optional[int] = None,
+        size_fn: Optional[Callable[[Any], int]] = None,
+        policy: str = "lru",
+    ) -> None:
         self.source_dp: MapDataPipe[T_co] = source_dp
-        self.cache: Dict[Any, T_co] = {}
+        # cache size in MB
+        if size is not None:
+            self.size = size * 1024 * 1024
+        if size_fn is not None:
+            _check_unpickable_fn(size_fn)
+        self.size_fn = size_fn
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Invalid policy {policy}, should be one of {('lru', 'lfu')}")
+        self.policy = policy
+        # Ordered from the least to the most recently used
+        self.cache: Dict[Any, T_co] = OrderedDict()
+        self._sizes: Dict[Any, int] = {}
+        self._total: int = 0
+        # LFU bookkeeping, keys of each frequency are ordered from the least to the most recently used
+        self._freqs: Dict[Any, int] = {}
+        self._buckets: Dict[int, Dict[Any, None]] = {}
+        self._min_freq: int = 0
+
+    def _touch(self, index) -> None:
+        if self.size is None:
+            return
+        if self.policy == "lru":
+            self.cache.move_to_end(index)  # type: ignore[attr-defined]
+            return
+        freq = self._freqs[index]
+        bucket = self._buckets[freq]
+        del bucket[index]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        self._freqs[index] = freq + 1
+        self._buckets.setdefault(freq + 1, OrderedDict())[index] = None
+
+    def _evict(self) -> None:
+        if self.policy == "lru":
+            index, _ = self.cache.popitem(last=False)  # type: ignore[call-arg]
+        else:
+            bucket = self._buckets[self._min_freq]
+            index, _ = bucket.popitem(last=False)  # type: ignore[call-arg]
+            if not bucket:
+                del self._buckets[self._min_freq]
+                self._min_freq = min(self._buckets, default=0)
+            del self._freqs[index]
+            del self.cache[index]
+        self._total -= self._sizes.pop(index)
+
+    def _insert(self, index, data: T_co) -> None:
+        if self.size is None:
+            self.cache[index] = data
+            return
+        data_size = (_payload_size if self.size_fn is None else self.size_fn)(data)
+        if data_size > self.size:
+            return
+        while self._total + data_size > self.size:
+            self._evict()
+        self.cache[index] = data
+        self._sizes[index] = data_size
+        self._total += data_size
+        if self.policy == "lfu":
+            self._freqs[index] = 1
+            self._buckets.setdefault(1, OrderedDict())[index] = None
+            self._min_freq = 1
 
     def __getitem__(self, index) -> T_co:
-        if index not in self.cache:
-            self.cache[index] = self.source_dp[index]  # type: ignore[index]
-        return self.cache[index]  # type: ignore[index]
+        if index in self.cache:
+            self._touch(index)
+            return self.cache[index]
+        data = self.source_dp[index]  # type: ignore[index]
+        self._insert(index, data)
+        return data
         # We can potentially remove `self.source_dp` to save memory once `len(self.cache) == len(self.source_dp)`
         # Be careful about how that may interact with and graph traversal and other features
 
+    def __getitems__(self, indices: List) -> List[T_co]:
+        fetched: Dict[Any, T_co] = {}
+        misses: Dict[Any, None] = {}
+        for index in indices:
+            if index in fetched or index in misses:
+                continue
+            if index in self.cache:
+                self._touch(index)
+                fetched[index] = self.cache[index]
+            else:
+                misses[index] = None
+        if misses:
+            missing = list(misses)
+            if hasattr(self.source_dp, "__getitems__"):
+                data = self.source_dp.__getitems__(missing)  # type: ignore[attr-defined]
+            else:
+                data = [self.source_dp[index] for index in missing]  # type: ignore[index]
+            for index, d in zip(missing, data):
+                # Returned even if the batch doesn't fit in the cache
+                fetched[index] = d
+                self._insert(index, d)
+        return [fetched[index] for index in indices]
+
     def __len__(self) -> int:
         return len(self.source_dp)
@@ -0,0 +1,154 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import json
+import os
+import struct
+import tarfile
+import threading
+import zipfile
+import zlib
+
+from typing import List, NamedTuple, Optional
+
+# The first line of an index is a JSON header, followed by one JSON list per member
+_INDEX_VERSION = 2
+
+# Size of the fixed part of a zip local file header, followed by the name and the extra field
+_ZIP_LOCAL_HEADER_SIZE = 30
+
+
+class ArchiveMember(NamedTuple):
+    r"""
+    A file within an archive, whose content is the ``size`` bytes at ``offset``, compressed with
+    ``compress_type`` (zip only) into ``size`` bytes from ``file_size`` ones. Zip members also carry
+    the ``crc`` of their uncompressed content, which is checked when they are read.
+    """
+    name: str
+    offset: int
+    size: int
+    compress_type: int = zipfile.ZIP_STORED
+    file_size: int = -1
+    crc: int = -1
+
+
+def _read_at(fd: int, size: int, offset: int) -> bytes:
+    if not hasattr(os, "pread"):
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, size)
+    data = os.pread(fd, size, offset)
+    # Large reads can be returned in several parts
+    while len(data) < size:
+        chunk = os.pread(fd, size - len(data), offset + len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _build_zip_index(path: str) -> List[ArchiveMember]:
+    members = []
+    with zipfile.ZipFile(path) as zips, open(path, "rb") as f:
+        for zipinfo in zips.infolist():
+            if zipinfo.is_dir():
+                continue
+            if zipinfo.flag_bits & 0x1:
+                raise ValueError(f"Encrypted file {zipinfo.filename} of {path} can't be indexed")
+            # The extra field of the local header may differ from the one of the central directory
+            f.seek(zipinfo.header_offset)
+            header = f.read(_ZIP_LOCAL_HEADER_SIZE)
+            if header[:4] != b"PK\x03\x04":
+                raise zipfile.BadZipFile(f"Bad magic number for file header of {zipinfo.filename}")
+            name_size, extra_size = struct.unpack_from("<HH", header, 26)
+            offset = zipinfo.header_offset + _ZIP_LOCAL_HEADER_SIZE + name_size + extra_size
+            members.append(
+                ArchiveMember(
+                    zipinfo.filename,
+                    offset,
+                    zipinfo.compress_size,
+                    zipinfo.compress_type,
+                    zipinfo.file_size,
+                    zipinfo.CRC,
+                )
+            )
+    return members
+
+
+def _build_tar_index(path: str) -> List[ArchiveMember]:
+    try:
+        # Only the headers are read, the content of the members is skipped over
+        tar = tarfile.open(path, mode="r:")
+    except tarfile.ReadError as e:
+        raise ValueError(f"{path} is neither a zip archive nor an uncompressed tar archive") from e
+    with tar:
+        return [
+            ArchiveMember(tarinfo.name, tarinfo.offset_data, tarinfo.size, zipfile.ZIP_STORED, tarinfo.size)
+            for tarinfo in tar
+            if tarinfo.isfile() and not tarinfo.issparse()
+        ]
+
+
+def build_archive_index(path: str) -> List[ArchiveMember]:
+    r"""
+    Returns the members of the zip archive or uncompressed tar archive at ``path``, with the location of their content.
+    """
+    if zipfile.is_zipfile(path):
+        return _build_zip_index(path)
+    return _build_tar_index(path)
+
+
+def _archive_stamp(path: str) -> dict:
+    stat = os.stat(path)
+    return {"version": _INDEX_VERSION, "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+def read_archive_index(path: str, index_path: str) -> Optional[List[ArchiveMember]]:
+    r"""
+    Returns the members stored in the index at ``index_path``, or ``None`` if there is none, or if the archive
+    at ``path`` has changed since it was written.
+    """
+    try:
+        with open(index_path) as f:
+            header = json.loads(f.readline())
+            if header != _archive_stamp(path):
+                return None
+            return [ArchiveMember(*json.loads(line)) for line in f]
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_archive_index(path: str, index_path: str, members: List[ArchiveMember]) -> None:
+    # Multiple processes may write the same index, each of them writes to its own file
+    tmp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps(_archive_stamp(path)) + "\n")
+            f.writelines(json.dumps(list(member)) + "\n" for member in members)
+        os.replace(tmp_path, index_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_member(fd: int, path: str, member: ArchiveMember) -> bytes:
+    r"""
+    Returns the content of ``member`` from the archive at ``path`` opened as ``fd``, with a single read.
+    """
+    if member.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        # Other compressions carry their own headers, which are left to zipfile
+        with zipfile.ZipFile(path) as zips:
+            return zips.read(member.name)
+    data = _read_at(fd, member.size, member.offset)
+    if len(data) != member.size:
+        raise RuntimeError(f"Unable to read {member.name} from {path}, the archive is truncated")
+    if member.compress_type == zipfile.ZIP_DEFLATED:
+        data = zlib.decompress(data, -zlib.MAX_WBITS)
+        if len(data) != member.file_size:
+            raise RuntimeError(f"Unable to read {member.name} from {path}, its uncompressed size doesn't match")
+    # As with zipfile, the content of zip members is checked against their CRC
+    if member.crc != -1 and zlib.crc32(data) != member.crc:
+        raise RuntimeError(f"Unable to read {member.name} from {path}, its CRC doesn't match")
+    return data
@@ -0,0 +1,456 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# States of an entry in the index. ``PENDING`` entries are claimed by the worker writing them,
+# the others mirror ``CacheState`` of ``OnDiskCacheHolder``.
+PENDING = -1
+CACHED_SINGLE_ENTITY = 1
+CACHED_MULTIPLE_ENTITIES = 2
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries "
+    "(filepath TEXT PRIMARY KEY, state INTEGER NOT NULL, owner TEXT, host TEXT, pid INTEGER, lease REAL, "
+    "size INTEGER NOT NULL DEFAULT 0, files INTEGER NOT NULL DEFAULT 0, atime REAL, shard TEXT, offset INTEGER)",
+    "CREATE INDEX IF NOT EXISTS entries_atime ON entries (atime)",
+    "CREATE INDEX IF NOT EXISTS entries_shard ON entries (shard)",
+    "CREATE TABLE IF NOT EXISTS members "
+    "(filepath TEXT NOT NULL, member TEXT NOT NULL, shard TEXT, offset INTEGER, size INTEGER)",
+    "CREATE INDEX IF NOT EXISTS members_filepath ON members (filepath)",
+    "CREATE INDEX IF NOT EXISTS members_shard ON members (shard)",
+    "CREATE TABLE IF NOT EXISTS shards (shard TEXT PRIMARY KEY, sealed INTEGER NOT NULL DEFAULT 0)",
+    "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+)
+
+# ``(shard, offset, size)`` of an item packed into a shard file
+Location = Tuple[str, int, int]
+
+_COUNTERS = ("hits", "misses", "evictions")
+
+_HOST = socket.gethostname()
+
+# Hits are counted in memory and added to the index at most once per this many seconds
+_HITS_FLUSH_INTERVAL = 1.0
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Owned by another user
+        pass
+    return True
+
+
+class CacheIndex:
+    r"""
+    Index of an on-disk cache stored in a single SQLite database at ``path``, keyed by the file path
+    of each cached item. It replaces the per-item promise and list files of ``OnDiskCacheHolder``,
+    so that checking and claiming an item is a single indexed lookup shared by all worker processes.
+
+    Each process opens its own connection lazily, so an index can be pickled and sent to workers.
+    ``path`` should be on a file system with working ``fcntl`` locks (e.g. a local disk).
+
+    If ``max_size`` (in bytes) or ``max_files`` is given, the least recently used entries are evicted,
+    together with their files, whenever an item is fulfilled and the cache exceeds either of them.
+    Pending entries are never evicted, neither are entries accessed within the last ``eviction_grace_period``
+    seconds, so that a file just served from the cache is still there when it's opened. The cache may
+    exceed its capacity in the meantime. Access times are only recorded when eviction is enabled,
+    otherwise lookups never write to the index.
+
+    Items can also be packed into shard files, in which case their location within the shard is stored
+    in the index. A shard is removed once it's sealed by its writer and none of its items is left.
+
+    A claim on a pending entry holds a lease, which a background thread of the claiming process renews
+    every ``lease_timeout / 4`` seconds until the entry is fulfilled. Other processes, possibly running
+    other pipelines or on other hosts, wait for a claimed entry and only take it over once its lease has
+    expired, or once its owner process has died on the same host.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        timeout: float = 60.0,
+        max_size: Optional[int] = None,
+        max_files: Optional[int] = None,
+        lease_timeout: float = 60.0,
+        eviction_grace_period: float = 10.0,
+    ):
+        if max_size is not None and max_size < 0:
+            raise ValueError(f"'max_size' is required to be a non-negative integer, but {max_size} is found.")
+        if max_files is not None and max_files < 0:
+            raise ValueError(f"'max_files' is required to be a non-negative integer, but {max_files} is found.")
+        self.path = path
+        self.timeout = timeout
+        self.max_size = max_size
+        self.max_files = max_files
+        self.lease_timeout = lease_timeout
+        self.eviction_grace_period = eviction_grace_period
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        # Pending entries claimed by this process, whose leases are renewed by the heartbeat thread
+        self._claims: Set[str] = set()
+        self._heartbeat: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        # Hits not yet added to the counter of the index
+        self._hits = 0
+        self._hits_flushed = time.monotonic()
+
+    def __getstate__(self):
+        return {
+            "path": self.path,
+            "timeout": self.timeout,
+            "max_size": self.max_size,
+            "max_files": self.max_files,
+            "lease_timeout": self.lease_timeout,
+            "eviction_grace_period": self.eviction_grace_period,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _connection(self) -> sqlite3.Connection:
+        # A connection must not be shared with a forked child
+        if self._conn is None or self._pid != os.getpid():
+            dirname = os.path.dirname(self.path)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.executemany("INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)", ((c,) for c in _COUNTERS))
+            self._conn, self._pid = conn, os.getpid()
+            # Claims, hits and the heartbeat thread of the parent process aren't inherited
+            self._claims = set()
+            self._heartbeat = None
+            self._hits = 0
+        return self._conn
+
+    def _is_claim_alive(self, host: Optional[str], pid: Optional[int], lease: Optional[float]) -> bool:
+        if lease is None or time.time() - lease > self.lease_timeout:
+            return False
+        # A process which died on this host doesn't need to wait for its lease to expire
+        return host != _HOST or pid is None or pid == os.getpid() or _is_process_alive(pid)
+
+    def _renew_leases(self, closed: threading.Event) -> None:
+        while not closed.wait(self.lease_timeout / 4):
+            with self._lock:
+                if not self._claims or self._conn is None or self._pid != os.getpid():
+                    self._heartbeat = None
+                    return
+                conn = self._conn
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        conn.executemany(
+                            "UPDATE entries SET lease = ? WHERE filepath = ? AND state = ? AND host = ? AND pid = ?",
+                            ((time.time(), filepath, PENDING, _HOST, self._pid) for filepath in self._claims),
+                        )
+                        conn.execute("COMMIT")
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+                except sqlite3.OperationalError:
+                    # The index is busy, leases are renewed well before they expire
+                    pass
+
+    @staticmethod
+    def _increment(conn: sqlite3.Connection, counter: str, value: int = 1) -> None:
+        conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (value, counter))
+
+    def _flush_hits(self, conn: sqlite3.Connection) -> None:
+        if self._hits > 0:
+            self._increment(conn, "hits", self._hits)
+            self._hits = 0
+        self._hits_flushed = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed.set()
+            if self._conn is not None and self._pid == os.getpid():
+                self._flush_hits(self._conn)
+                self._conn.close()
+            self._conn = None
+            self._heartbeat = None
+            self._closed = threading.Event()
+
+    def lookup(self, filepath: str) -> Optional[Tuple[int, Optional[str], bool]]:
+        r"""
+        Returns the ``(state, shard, claimed)`` of ``filepath``, or ``None`` if it isn't in the index.
+        ``shard`` is only set for a single item packed into a shard file. ``claimed`` tells whether a pending
+        entry is held by a live claim, rather than left over from an interrupted run.
+        """
+        with self._lock:
+            row = (
+                self._connection()
+                .execute("SELECT state, shard, host, pid, lease FROM entries WHERE filepath = ?", (filepath,))
+                .fetchone()
+            )
+        if row is None:
+            return None
+        state, shard, host, pid, lease = row
+        return state, shard, state == PENDING and self._is_claim_alive(host, pid, lease)
+
+    def hit(self, filepath: str) -> None:
+        r"""
+        Records that ``filepath`` has been served from the cache, and refreshes its access time when
+        eviction is enabled. Without eviction, hits are added to the index in batches.
+        """
+        with self._lock:
+            conn = self._connection()
+            self._hits += 1
+            if self.max_size is None and self.max_files is None:
+                if time.monotonic() - self._hits_flushed >= _HITS_FLUSH_INTERVAL:
+                    self._flush_hits(conn)
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("UPDATE entries SET atime = ? WHERE filepath = ?", (time.time(), filepath))
+                self._increment(conn, "hits", self._hits)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self._hits = 0
+
+    def claim(self, filepath: str, owner: str) -> bool:
+        r"""
+        Marks ``filepath`` as pending and claimed by this process on behalf of ``owner``. Returns ``False``
+        if it is held by a live claim in the meantime, in which case the caller should wait for it instead.
+        Claims whose lease has expired, or whose process has died, are taken over.
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT state, host, pid, lease FROM entries WHERE filepath = ?", (filepath,)
+                ).fetchone()
+                if row is not None and row[0] == PENDING and self._is_claim_alive(*row[1:]):
+                    claimed = False
+                else:
+                    now = time.time()
+                    conn.execute("DELETE FROM members WHERE filepath = ?", (filepath,))
+                    conn.execute(
+                        "INSERT OR REPLACE INTO entries (filepath, state, owner, host, pid, lease, atime) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (filepath, PENDING, owner, _HOST, self._pid, now, now),
+                    )
+                    self._increment(conn, "misses")
+                    claimed = True
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            if claimed:
+                self._claims.add(filepath)
+                if self._heartbeat is None:
+                    self._heartbeat = threading.Thread(target=self._renew_leases, args=(self._closed,), daemon=True)
+                    self._heartbeat.start()
+        return claimed
+
+    def fulfill(
+        self,
+        filepath: str,
+        owner: str,
+        members: Optional[List[str]] = None,
+        size: int = 0,
+        locations: Optional[List[Location]] = None,
+    ) -> bool:
+        r"""
+        Marks ``filepath`` claimed by this process on behalf of ``owner`` as cached, taking ``size`` bytes
+        on disk. If ``members`` is given, it is stored as the list of files that ``filepath`` has been
+        expanded into. For packed items, ``locations`` holds the location of ``filepath``, or of each of
+        the ``members``. Evicts least recently used entries if the cache is over capacity, except ``filepath``
+        itself. Returns ``False`` without any change if the claim has been taken over in the meantime.
+        """
+        state = CACHED_SINGLE_ENTITY if members is None else CACHED_MULTIPLE_ENTITIES
+        shard, offset = None, None
+        if members is None and locations:
+            shard, offset, _ = locations[0]
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.execute(
+                    "UPDATE entries SET state = ?, owner = NULL, host = NULL, pid = NULL, lease = NULL, "
+                    "size = ?, files = ?, atime = ?, shard = ?, offset = ? "
+                    "WHERE filepath = ? AND owner = ? AND host = ? AND pid = ?",
+                    (
+                        state,
+                        size,
+                        1 if members is None else len(members),
+                        time.time(),
+                        shard,
+                        offset,
+                        filepath,
+                        owner,
+                        _HOST,
+                        self._pid,
+                    ),
+                )
+                if cursor.rowcount == 0:
+                    # The lease expired and another process took the claim over, its result is kept instead
+                    conn.execute("ROLLBACK")
+                    self._claims.discard(filepath)
+                    return False
+                conn.execute("DELETE FROM members WHERE filepath = ?", (filepath,))
+                if members:
+                    member_locations: Iterable = (
+                        locations if locations is not None else ((None, None, None),) * len(members)
+                    )
+                    conn.executemany(
+                        "INSERT INTO members (filepath, member, shard, offset, size) VALUES (?, ?, ?, ?, ?)",
+                        ((filepath, m, *location) for m, location in zip(members, member_locations)),
+                    )
+                evicted = self._evict(conn, filepath)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self._claims.discard(filepath)
+        # Files are removed once they are out of the index, so nobody else can find them in the meantime
+        self._remove_files(evicted)
+        return True
+
+    @staticmethod
+    def _remove_files(filepaths: List[str]) -> None:
+        for filepath in filepaths:
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self, conn: sqlite3.Connection, keep: str) -> List[str]:
+        if self.max_size is None and self.max_files is None:
+            return []
+        total_size, total_files = conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(SUM(files), 0) FROM entries WHERE state != ?", (PENDING,)
+        ).fetchone()
+        evicted: List[str] = []
+        shards: Set[str] = set()
+        # Entries accessed recently may have just been served, their files are about to be opened
+        rows = conn.execute(
+            "SELECT filepath, state, size, files, shard FROM entries "
+            "WHERE state != ? AND filepath != ? AND atime <= ? ORDER BY atime",
+            (PENDING, keep, time.time() - self.eviction_grace_period),
+        ).fetchall()
+        for filepath, state, size, files, shard in rows:
+            if (self.max_size is None or total_size <= self.max_size) and (
+                self.max_files is None or total_files <= self.max_files
+            ):
+                break
+            if state == CACHED_MULTIPLE_ENTITIES:
+                for member, member_shard in conn.execute(
+                    "SELECT member, shard FROM members WHERE filepath = ?", (filepath,)
+                ).fetchall():
+                    if member_shard is None:
+                        evicted.append(member)
+                    else:
+                        shards.add(member_shard)
+                conn.execute("DELETE FROM members WHERE filepath = ?", (filepath,))
+            elif shard is None:
+                evicted.append(filepath)
+            else:
+                shards.add(shard)
+            conn.execute("DELETE FROM entries WHERE filepath = ?", (filepath,))
+            self._increment(conn, "evictions")
+            total_size -= size
+            total_files -= files
+        # Packed items can't be removed on their own, their shard goes once nothing is left in it
+        for shard in shards:
+            if self._is_shard_unused(conn, shard):
+                conn.execute("DELETE FROM shards WHERE shard = ?", (shard,))
+                evicted.append(shard)
+        return evicted
+
+    @staticmethod
+    def _is_shard_unused(conn: sqlite3.Connection, shard: str) -> bool:
+        return (
+            conn.execute("SELECT 1 FROM shards WHERE shard = ? AND sealed = 1", (shard,)).fetchone() is not None
+            and conn.execute("SELECT 1 FROM entries WHERE shard = ? LIMIT 1", (shard,)).fetchone() is None
+            and conn.execute("SELECT 1 FROM members WHERE shard = ? LIMIT 1", (shard,)).fetchone() is None
+        )
+
+    @staticmethod
+    def _members(conn: sqlite3.Connection, filepath: str) -> List[str]:
+        rows = conn.execute("SELECT member FROM members WHERE filepath = ? ORDER BY rowid", (filepath,)).fetchall()
+        return [row[0] for row in rows]
+
+    def members(self, filepath: str) -> List[str]:
+        with self._lock:
+            return self._members(self._connection(), filepath)
+
+    def locate(self, filepath: str) -> List[Tuple[str, Optional[str], Optional[int], Optional[int]]]:
+        r"""
+        Returns ``(name, shard, offset, size)`` for ``filepath``, or for each of its members if it has
+        been expanded into multiple files. ``shard`` is ``None`` for items that haven't been packed.
+        """
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT state, shard, offset, size FROM entries WHERE filepath = ?", (filepath,)
+            ).fetchone()
+            if row is None:
+                return []
+            state, shard, offset, size = row
+            if state != CACHED_MULTIPLE_ENTITIES:
+                return [(filepath, shard, offset, size)]
+            return conn.execute(
+                "SELECT member, shard, offset, size FROM members WHERE filepath = ? ORDER BY rowid", (filepath,)
+            ).fetchall()
+
+    def register_shard(self, shard: str) -> None:
+        r"""
+        Registers a new shard file, which is kept until its writer seals it.
+        """
+        with self._lock:
+            self._connection().execute("INSERT OR IGNORE INTO shards (shard, sealed) VALUES (?, 0)", (shard,))
+
+    def seal_shards(self, shards: List[str]) -> None:
+        r"""
+        Marks ``shards`` as complete, all of their items have been fulfilled and nothing else is appended.
+        Shards whose items have all been evicted in the meantime are removed.
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("UPDATE shards SET sealed = 1 WHERE shard = ?", ((s,) for s in shards))
+                unused = [shard for shard in shards if self._is_shard_unused(conn, shard)]
+                conn.executemany("DELETE FROM shards WHERE shard = ?", ((s,) for s in unused))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        self._remove_files(unused)
+
+    def stats(self) -> Dict[str, int]:
+        r"""
+        Returns the ``hits``, ``misses`` and ``evictions`` counted by all processes using the index,
+        along with the ``size`` in bytes and number of ``files`` currently cached. Hits of other processes
+        are only included once they have been added to the index in a batch.
+        """
+        with self._lock:
+            conn = self._connection()
+            self._flush_hits(conn)
+            result = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            result["size"], result["files"] = conn.execute(
+                "SELECT COALESCE(SUM(size), 0), COALESCE(SUM(files), 0) FROM entries WHERE state != ?", (PENDING,)
+            ).fetchone()
+        return result
@@ -0,0 +1,104 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+# The first line of a manifest is a JSON header, followed by one JSON ``[path, size, mtime]`` list per file,
+# so that paths containing tabs or newlines are escaped. Unknown sizes and mtimes are ``null``.
+_MANIFEST_VERSION = 2
+
+_ManifestEntry = Union[str, Tuple[str, Optional[Any], Optional[Any]]]
+
+
+def get_manifest_path(manifest_dir: str, root: str, masks: Union[str, List[str]]) -> str:
+    r"""
+    Returns the path of the manifest file within ``manifest_dir`` for the listing of ``root`` filtered
+    by ``masks``. Listers on different nodes sharing ``manifest_dir`` resolve to the same manifest.
+    """
+    key = json.dumps({"root": root, "masks": masks}, sort_keys=True)
+    return os.path.join(manifest_dir, hashlib.sha1(key.encode()).hexdigest() + ".manifest")
+
+
+def _open_manifest(manifest_path: str, root_mtime: Optional[str], ttl: Optional[float]) -> Optional[mmap.mmap]:
+    try:
+        with open(manifest_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+
+    try:
+        header = json.loads(mm.readline())
+    except ValueError:
+        header = None
+    if (
+        not isinstance(header, dict)
+        or header.get("version") != _MANIFEST_VERSION
+        or (ttl is not None and time.time() - header.get("created", 0) > ttl)
+        or (root_mtime is not None and header.get("root_mtime") != root_mtime)
+    ):
+        mm.close()
+        return None
+    return mm
+
+
+def _format_field(value: Optional[Any]) -> Optional[str]:
+    # Some filesystems report mtimes as objects that aren't serializable to JSON
+    return None if value is None else str(value)
+
+
+def iterate_with_manifest(
+    manifest_path: Optional[str],
+    list_fn: Callable[[], Iterable[_ManifestEntry]],
+    *,
+    root_mtime: Optional[str] = None,
+    ttl: Optional[float] = None,
+) -> Iterator[str]:
+    r"""
+    Yields the paths stored in the manifest file at ``manifest_path`` if it is still valid. Otherwise,
+    yields the paths from ``list_fn`` and writes the manifest once all of them have been listed, so
+    that a listing interrupted midway never leaves an incomplete manifest behind.
+
+    ``list_fn`` returns paths or ``(path, size, mtime)`` tuples. A manifest is invalidated when it's
+    older than ``ttl`` seconds, or when ``root_mtime`` differs from the one it was built with.
+    Without either, it's valid until removed.
+    """
+    if manifest_path is None:
+        for entry in list_fn():
+            yield entry if isinstance(entry, str) else entry[0]
+        return
+
+    mm = _open_manifest(manifest_path, root_mtime, ttl)
+    if mm is not None:
+        try:
+            for line in iter(mm.readline, b""):
+                yield json.loads(line)[0]
+        finally:
+            mm.close()
+        return
+
+    # Multiple processes may list at the same time, each of them writes to its own file
+    tmp_path = f"{manifest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            header = {"version": _MANIFEST_VERSION, "created": time.time(), "root_mtime": root_mtime}
+            f.write(json.dumps(header) + "\n")
+            for entry in list_fn():
+                path, size, mtime = (entry, None, None) if isinstance(entry, str) else entry
+                f.write(json.dumps([path, _format_field(size), _format_field(mtime)]) + "\n")
+                yield path
+        os.replace(tmp_path, manifest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
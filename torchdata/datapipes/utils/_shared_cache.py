@@ -0,0 +1,234 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import atexit
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import uuid
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import portalocker
+
+# Each element is stored as ``(segment, offset, length)`` of its payload within the data segment files
+_ENTRY = struct.Struct("<QQQ")
+
+# Number of data segments the size limit is split into, the oldest segment is evicted at once
+_SEGMENTS_PER_STORE = 8
+
+
+# Stores created by this process, which are removed when it exits
+_created_stores: List[Tuple[int, str]] = []
+
+
+@atexit.register
+def _remove_created_stores() -> None:
+    for pid, path in _created_stores:
+        # Forked processes inherit the list, but only its creator removes a store
+        if pid == os.getpid():
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def default_shared_dir() -> str:
+    r"""
+    Returns the directory shared stores are created in, backed by memory where available.
+    """
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+class SharedStore:
+    r"""
+    Append-only store of serialized elements in a directory shared by all processes of a node.
+
+    A single process at a time holds the write lock and appends elements, which can be read by position
+    from every other process as soon as they are published. Once the writer is done, it marks the
+    store as complete. If it stops before that, another process can acquire the lock and carry on.
+
+    Payloads are written to a sequence of segment files. When they exceed ``max_size`` bytes, the oldest
+    segments are removed, so that the store keeps the most recent elements and evicted ones read as ``None``.
+    """
+
+    def __init__(self, path: str, max_size: Optional[int] = None):
+        self.path = path
+        self.max_size = max_size
+        self._index: Optional[mmap.mmap] = None
+        self._data: Dict[int, mmap.mmap] = {}
+        self._lock_fh = None
+        self._index_fh = None
+        self._data_fh = None
+        # Writer state, ``[segment, first position, number of bytes]`` of the segments still stored
+        self._segments: Deque[List[int]] = deque()
+        self._total = 0
+        self._first = 0
+        self._published = 0
+
+    @classmethod
+    def create(cls, prefix: str, max_size: Optional[int] = None) -> "SharedStore":
+        r"""
+        Returns a new store within ``default_shared_dir()``, which lives until the current process exits.
+        """
+        path = os.path.join(default_shared_dir(), f"{prefix}_{uuid.uuid4().hex}")
+        _created_stores.append((os.getpid(), path))
+        return cls(path, max_size)
+
+    def __getstate__(self):
+        return {"path": self.path, "max_size": self.max_size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def published(self) -> int:
+        try:
+            return os.path.getsize(self._file("index")) // _ENTRY.size
+        except FileNotFoundError:
+            return 0
+
+    def first(self) -> int:
+        r"""
+        Returns the position of the oldest element which hasn't been evicted.
+        """
+        try:
+            with open(self._file("first")) as f:
+                return int(f.read())
+        except FileNotFoundError:
+            return 0
+
+    def completed(self) -> Optional[Tuple[int, int]]:
+        r"""
+        Returns the number of elements and the position of the oldest element kept once the store
+        is complete, or ``None`` before.
+        """
+        try:
+            with open(self._file("complete")) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        return state["count"], state["first"]
+
+    @staticmethod
+    def _remap(mm: Optional[mmap.mmap], filepath: str, end: int) -> mmap.mmap:
+        # The files only grow, so the mapping is renewed once it doesn't cover the requested range
+        if mm is None or len(mm) < end:
+            if mm is not None:
+                mm.close()
+            with open(filepath, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return mm
+
+    def read(self, i: int) -> Optional[bytes]:
+        r"""
+        Returns the payload of the element at position ``i``, or ``None`` if it has been evicted.
+        """
+        self._index = self._remap(self._index, self._file("index"), (i + 1) * _ENTRY.size)
+        segment, offset, length = _ENTRY.unpack_from(self._index, i * _ENTRY.size)
+        if length == 0:
+            return b""
+        # Elements are read in order, the mappings of older segments aren't needed anymore
+        for old in [s for s in self._data if s < segment]:
+            self._data.pop(old).close()
+        try:
+            # A mapping stays valid after its segment is removed
+            mm = self._remap(self._data.get(segment), self._file(f"data.{segment}"), offset + length)
+        except FileNotFoundError:
+            return None
+        self._data[segment] = mm
+        return mm[offset : offset + length]
+
+    def acquire(self) -> bool:
+        r"""
+        Tries to acquire the write lock without blocking. Returns ``True`` on success.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        fh = open(self._file("lock"), "a")
+        try:
+            portalocker.lock(fh, portalocker.LockFlags.EXCLUSIVE | portalocker.LockFlags.NON_BLOCKING)
+        except portalocker.exceptions.LockException:
+            fh.close()
+            return False
+        self._lock_fh = fh
+        self._index_fh = open(self._file("index"), "ab")
+        # Drops a partial entry left by a writer that died while appending it
+        self._published = self.published()
+        self._index_fh.truncate(self._published * _ENTRY.size)
+        # Carries on with the segments of a previous writer, appending to a new one
+        self._segments.clear()
+        self._total = 0
+        self._first = self.first()
+        with open(self._file("index"), "rb") as f:
+            for i in range(self._published):
+                segment, _, length = _ENTRY.unpack(f.read(_ENTRY.size))
+                if i < self._first:
+                    continue
+                if not self._segments or self._segments[-1][0] != segment:
+                    self._segments.append([segment, i, 0])
+                self._segments[-1][2] += length
+                self._total += length
+        self._new_segment()
+        return True
+
+    def release(self) -> None:
+        for fh in (self._index_fh, self._data_fh):
+            if fh is not None:
+                fh.close()
+        self._index_fh = self._data_fh = None
+        if self._lock_fh is not None:
+            portalocker.unlock(self._lock_fh)
+            self._lock_fh.close()
+            self._lock_fh = None
+
+    def _new_segment(self) -> None:
+        if self._data_fh is not None:
+            self._data_fh.close()
+        segment = self._segments[-1][0] + 1 if self._segments else self._published
+        self._segments.append([segment, self._published, 0])
+        self._data_fh = open(self._file(f"data.{segment}"), "ab")
+
+    def _evict(self) -> None:
+        assert self.max_size is not None
+        while self._segments and self._total > self.max_size:
+            segment, _, nbytes = self._segments.popleft()
+            self._total -= nbytes
+            self._first = self._segments[0][1] if self._segments else self._published
+            # Readers missing a segment look up the oldest element kept, which is updated first
+            tmp_path = self._file(f"first.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                f.write(str(self._first))
+            os.replace(tmp_path, self._file("first"))
+            os.remove(self._file(f"data.{segment}"))
+        if not self._segments:
+            self._new_segment()
+
+    def append(self, payload: bytes) -> None:
+        assert self._data_fh is not None and self._index_fh is not None, "The write lock is required to append"
+        current = self._segments[-1]
+        if self.max_size is not None and current[2] > 0 and current[2] >= self.max_size // _SEGMENTS_PER_STORE:
+            self._new_segment()
+            current = self._segments[-1]
+        offset = self._data_fh.tell()
+        self._data_fh.write(payload)
+        # The payload is flushed before its entry, readers never see an entry without its data
+        self._data_fh.flush()
+        self._index_fh.write(_ENTRY.pack(current[0], offset, len(payload)))
+        self._index_fh.flush()
+        self._published += 1
+        current[2] += len(payload)
+        self._total += len(payload)
+        if self.max_size is not None and self._total > self.max_size:
+            self._evict()
+
+    def complete(self, count: int) -> None:
+        tmp_path = self._file(f"complete.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"count": count, "first": self._first}, f)
+        os.replace(tmp_path, self._file("complete"))
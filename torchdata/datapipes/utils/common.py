@@ -4,8 +4,10 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import io
+import mmap
 from io import IOBase
-from typing import Tuple
+from typing import Optional, Tuple
 
 from torchdata.datapipes.utils import StreamWrapper
 
@@ -22,3 +24,18 @@ def validate_pathname_binary_tuple(data: Tuple[str, IOBase]):
             f"binary stream within the tuple should have IOBase or"
             f"its subclasses as type, but it is type {type(data[1])}"
         )
+
+
+def _mmap_local_file(data_stream) -> Optional[mmap.mmap]:
+    r"""
+    Maps the whole file behind ``data_stream`` read-only, if it's a plain local file opened in binary mode.
+    Returns ``None`` for other streams, like remote or decompressed ones, and for empty files.
+    """
+    file_obj = data_stream.file_obj if isinstance(data_stream, StreamWrapper) else data_stream
+    raw = file_obj.raw if isinstance(file_obj, io.BufferedReader) else file_obj
+    if not isinstance(raw, io.FileIO):
+        return None
+    try:
+        return mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None